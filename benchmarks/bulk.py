@@ -0,0 +1,139 @@
+"""
+Bulk write benchmark.
+
+Creates, updates and deletes `--items` rows of the forms service, once with one request per row and once
+with the `/bulk` endpoints, and reports the wall time, database statements and commits of each path.
+Each round starts from the same form, so rounds are independent. Run from `forms-management-service`
+against a database filled by `seed.py`: `python ../benchmarks/bulk.py objetivos --items 20`.
+Dependencies: FastAPI test client (httpx), SQLAlchemy, the forms service's application.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+
+sys.path.insert(0, os.getcwd())
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.database import engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+# Resource: (id field, body of the i-th item of a form, changed fields of an update).
+RESOURCES = {
+    "objetivos": ("id_objetivo", lambda form, i: {"id_formulario": form, "descripcion": f"Objetivo {i}", "tipo": "general"}, {"tipo": "especifico"}),
+    "participantes": ("id_participante", lambda form, i: {"id_formulario": form, "cargo": "Analista", "nombre": f"Participante {i}"}, {"cargo": "Líder"}),
+}
+
+
+class StatementCounter:
+    """Counts the statements and commits an engine runs while `counting()` is active."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = 0
+        self.commits = 0
+
+    def _statement(self, *args):
+        self.statements += 1
+
+    def _commit(self, *args):
+        self.commits += 1
+
+    @contextmanager
+    def counting(self):
+        self.statements = self.commits = 0
+        event.listen(self.engine, "before_cursor_execute", self._statement)
+        event.listen(self.engine, "commit", self._commit)
+        try:
+            yield self
+        finally:
+            event.remove(self.engine, "before_cursor_execute", self._statement)
+            event.remove(self.engine, "commit", self._commit)
+
+
+def _checked(response):
+    response.raise_for_status()
+    return response.json()
+
+
+def _one_at_a_time(client, resource, bodies, changes, id_field):
+    ids = [_checked(client.post(f"/{resource}/", json=body))[id_field] for body in bodies]
+    yield "create"
+    for obj_id, body in zip(ids, bodies):
+        _checked(client.put(f"/{resource}/{obj_id}", json={**body, **changes}))
+    yield "update"
+    for obj_id in ids:
+        _checked(client.delete(f"/{resource}/{obj_id}"))
+    yield "delete"
+
+
+def _bulk(client, resource, bodies, changes, id_field):
+    result = _checked(client.post(f"/{resource}/bulk", json=bodies))
+    if result["errors"]:
+        raise SystemExit(f"bulk create failed: {result['errors'][:3]}")
+    ids = [item[id_field] for item in result["items"]]
+    yield "create"
+    _checked(client.put(f"/{resource}/bulk", json=[{**body, **changes, id_field: obj_id} for obj_id, body in zip(ids, bodies)]))
+    yield "update"
+    _checked(client.delete(f"/{resource}/bulk", params={"ids": ids}))
+    yield "delete"
+
+
+def _run(path, counter, *args) -> dict:
+    """Time each phase of one round of `path`, which yields the name of each phase it completes."""
+    phases = {}
+    steps = path(*args)
+    while True:
+        with counter.counting():
+            start = time.perf_counter()
+            try:
+                phase = next(steps)
+            except StopIteration:
+                return phases
+            phases[phase] = {"ms": (time.perf_counter() - start) * 1000, "statements": counter.statements, "commits": counter.commits}
+
+
+def measure(resource: str, items: int, rounds: int) -> dict:
+    id_field, body, changes = RESOURCES[resource]
+    counter = StatementCounter(engine)
+    report = {"resource": resource, "items": items, "rounds": rounds, "paths": {}}
+    with TestClient(app) as client:
+        formulario = _checked(client.get("/formularios/", params={"limit": 1}))
+        if not formulario:
+            raise SystemExit("no formularios in the database; seed some first")
+        bodies = [body(formulario[0]["id_formulario"], i) for i in range(items)]
+        for name, path in (("one_at_a_time", _one_at_a_time), ("bulk", _bulk)):
+            _run(path, counter, client, resource, bodies, changes, id_field)
+            runs = [_run(path, counter, client, resource, bodies, changes, id_field) for _ in range(rounds)]
+            report["paths"][name] = {
+                phase: {
+                    "ms": round(statistics.median(run[phase]["ms"] for run in runs), 3),
+                    "statements": runs[-1][phase]["statements"],
+                    "commits": runs[-1][phase]["commits"],
+                }
+                for phase in runs[0]
+            }
+    single, bulk = report["paths"]["one_at_a_time"], report["paths"]["bulk"]
+    report["speedup"] = {phase: round(single[phase]["ms"] / bulk[phase]["ms"], 1) for phase in bulk if bulk[phase]["ms"]}
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("resource", choices=sorted(RESOURCES))
+    parser.add_argument("--items", type=int, default=20, help="Rows written per round.")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args(argv)
+    print(json.dumps(measure(args.resource, args.items, args.rounds), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
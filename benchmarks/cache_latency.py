@@ -0,0 +1,83 @@
+"""
+Read-through cache benchmark.
+
+Times `GET /<resource>/{id}` and the repository's `get` for rows served from the cache (hits) and for
+rows whose entry was invalidated right before each call (misses, loaded from the database), cycling over
+`--ids` rows. Run from a service directory against a database filled by `seed.py`:
+`python ../benchmarks/cache_latency.py metodologias`. Set `CACHE_URL` to measure the shared backend.
+Dependencies: FastAPI test client (httpx), calidad_core, the service's application.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import crud  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from run import summarize  # noqa: E402
+
+
+CACHED = [name for name in ("metodologias", "empresas", "usuarios") if getattr(getattr(crud, name, None), "cache", None) is not None]
+
+
+def _latencies(call, ids: list[int], iterations: int, invalidate=None) -> list[float]:
+    latencies = []
+    for obj_id in itertools.islice(itertools.cycle(ids), iterations):
+        if invalidate is not None:
+            invalidate(obj_id)
+        start = time.perf_counter()
+        call(obj_id)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def measure(resource: str, ids: int, iterations: int) -> dict:
+    repository = getattr(crud, resource)
+    with SessionLocal() as db:
+        selected = [getattr(row, repository.pk.key) for row in repository.paginate(db, limit=ids)]
+    if len(selected) < ids:
+        raise SystemExit(f"only {len(selected)} {resource} in the database; seed at least {ids}")
+    report = {"resource": resource, "backend": repository.cache.backend.name, "ids": ids, "iterations": iterations}
+    if report["backend"] == "none":
+        raise SystemExit("the cache is disabled (CACHE_ENABLED=false)")
+
+    with TestClient(app) as client:
+        def request(obj_id):
+            client.get(f"/{resource}/{obj_id}").raise_for_status()
+
+        with SessionLocal() as db:
+            def get(obj_id):
+                db.expunge_all()
+                repository.get(db, obj_id)
+
+            for call, name in ((request, "http"), (get, "repository")):
+                _latencies(call, selected, len(selected))
+                report[name] = {
+                    "hit_ms": summarize(_latencies(call, selected, iterations)),
+                    "miss_ms": summarize(_latencies(call, selected, iterations, invalidate=repository.invalidate)),
+                }
+                report[name]["miss_to_hit_p50"] = round(report[name]["miss_ms"]["p50"] / report[name]["hit_ms"]["p50"], 2)
+    report["stats"] = repository.cache.stats()
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("resource", choices=CACHED)
+    parser.add_argument("--ids", type=int, default=10, help="Distinct rows read in turn.")
+    parser.add_argument("--iterations", type=int, default=1000)
+    args = parser.parse_args(argv)
+    print(json.dumps(measure(args.resource, args.ids, args.iterations), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Cold-start benchmark.
+
+Migrates a database with `alembic upgrade head`, then starts the service with the production server
+once per run and schema mode (`DB_SCHEMA_MODE`), and measures the time from spawning the process to the
+first successful response. It also times `alembic upgrade head` on the up-to-date database, the pre-start
+step the `Procfile` runs on every release. Run from a service directory:
+`python ../benchmarks/coldstart.py --workers 4 --runs 5`.
+Dependencies: httpx, uvicorn, alembic, the service's requirements.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx  # noqa: E402
+
+from run import _free_port  # noqa: E402
+
+
+POLL_INTERVAL = 0.01
+
+
+def _migrate(env: dict) -> float:
+    start = time.perf_counter()
+    subprocess.run(["alembic", "upgrade", "head"], env=env, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def time_to_first_response(env: dict, path: str, timeout: float = 60) -> float:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}{path}"
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-m", "calidad_core.server"], env={**env, "HOST": "127.0.0.1", "PORT": str(port)})
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"service exited with code {process.returncode} before answering")
+            try:
+                if httpx.get(url, timeout=timeout).status_code == 200:
+                    return time.perf_counter() - start
+            except httpx.TransportError:
+                pass
+            time.sleep(POLL_INTERVAL)
+        raise RuntimeError(f"no successful response from {url} in {timeout} s")
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def _seconds(values: list[float]) -> dict:
+    return {
+        "median": round(statistics.median(values), 3),
+        "min": round(min(values), 3),
+        "max": round(max(values), 3),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", help="Database to migrate and start against. Default: a SQLite file in a temporary directory.")
+    parser.add_argument("--app-module", default="app.main", help="`app.main` (sync) or `app.main_async`.")
+    parser.add_argument("--workers", type=int, default=1, help="Server worker processes (`WEB_CONCURRENCY`).")
+    parser.add_argument("--modes", nargs="+", choices=["none", "create_all"], default=["create_all", "none"])
+    parser.add_argument("--path", default="/health/ready", help="Request that counts as the first response.")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_URL": args.database_url or f"sqlite:///{tmp}/coldstart.db",
+            "AUTH_REQUIRED": "false",
+            "PYTHONPATH": os.getcwd(),
+            "APP_MODULE": f"{args.app_module}:app",
+            "WEB_CONCURRENCY": str(args.workers),
+            "LOG_LEVEL": "warning",
+        }
+        report = {
+            "app_module": args.app_module,
+            "workers": args.workers,
+            "path": args.path,
+            "runs": args.runs,
+            "migrate_s": round(_migrate(env), 3),
+            "migrate_up_to_date_s": round(_migrate(env), 3),
+            "first_response_s": {},
+        }
+        for mode in args.modes:
+            mode_env = {**env, "DB_SCHEMA_MODE": mode}
+            report["first_response_s"][mode] = _seconds([time_to_first_response(mode_env, args.path) for _ in range(args.runs)])
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+"""
+Import throughput benchmark.
+
+Loads `--formularios` generated forms into the forms service, once through `POST /formularios/import`
+(a CSV or NDJSON upload) and once with one `POST /formularios/` per form plus one `POST /objetivos/` and
+`POST /participantes/` per child, and reports forms per second, rows per second, database statements
+and commits of each path. The rows written by each round are deleted afterwards, so rounds are
+independent. CSV rows carry no children, so `--format csv` compares forms alone. Run from
+`forms-management-service` against a migrated database: `python ../benchmarks/import.py --formularios 1000`.
+Dependencies: FastAPI test client (httpx), SQLAlchemy, the forms service's application.
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import delete, func, select  # noqa: E402
+
+from app import models  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from bulk import StatementCounter, _checked  # noqa: E402
+
+
+FORM_FIELDS = ["id_empresa", "fecha", "ciudad", "nombre_software", "id_usuario", "id_metodologia"]
+
+
+def formularios(count: int, objetivos: int, participantes: int) -> list[dict]:
+    return [
+        {
+            "id_empresa": i % 50 + 1,
+            "fecha": f"2023-{i % 12 + 1:02d}-{i % 28 + 1:02d}",
+            "ciudad": f"Ciudad {i % 20}",
+            "nombre_software": f"Software {i}",
+            "id_usuario": i % 100 + 1,
+            "id_metodologia": i % 10 + 1,
+            "objetivos": [{"descripcion": f"Objetivo {j} del formulario {i}", "tipo": "general"} for j in range(objetivos)],
+            "participantes": [{"cargo": "Analista", "nombre": f"Participante {j}"} for j in range(participantes)],
+        }
+        for i in range(count)
+    ]
+
+
+def encode(forms: list[dict], format: str) -> bytes:
+    if format == "ndjson":
+        return "".join(json.dumps(form) + "\n" for form in forms).encode()
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FORM_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    writer.writerows(forms)
+    return buffer.getvalue().encode()
+
+
+def _per_row(client, forms: list[dict], data: bytes, format: str):
+    for form in forms:
+        fields = {key: form[key] for key in FORM_FIELDS}
+        id_formulario = _checked(client.post("/formularios/", json=fields))["id_formulario"]
+        if format == "csv":
+            continue
+        for objetivo in form["objetivos"]:
+            _checked(client.post("/objetivos/", json={**objetivo, "id_formulario": id_formulario}))
+        for participante in form["participantes"]:
+            _checked(client.post("/participantes/", json={**participante, "id_formulario": id_formulario}))
+
+
+def _import(client, forms: list[dict], data: bytes, format: str):
+    result = _checked(client.post("/formularios/import", params={"format": format}, files={"archivo": (f"formularios.{format}", data)}))
+    if result["rejected"]:
+        raise SystemExit(f"import rejected rows: {result['errors'][:3]}")
+
+
+def _remove_after(id_formulario: int):
+    with engine.begin() as conn:
+        for model in (models.ObjetivoFormulario, models.ParticipanteFormulario, models.Formulario):
+            conn.execute(delete(model.__table__).where(model.__table__.c.id_formulario > id_formulario))
+
+
+def _run(path, counter, client, forms, data, format) -> dict:
+    with engine.connect() as conn:
+        last_id = conn.scalar(select(func.coalesce(func.max(models.Formulario.id_formulario), 0)))
+    try:
+        with counter.counting():
+            start = time.perf_counter()
+            path(client, forms, data, format)
+            elapsed = time.perf_counter() - start
+        return {"s": elapsed, "statements": counter.statements, "commits": counter.commits}
+    finally:
+        _remove_after(last_id)
+
+
+def measure(count: int, objetivos: int, participantes: int, format: str, rounds: int) -> dict:
+    if format == "csv":
+        objetivos = participantes = 0
+    forms = formularios(count, objetivos, participantes)
+    data = encode(forms, format)
+    rows = count * (1 + objetivos + participantes)
+    counter = StatementCounter(engine)
+    report = {
+        "format": format,
+        "formularios": count,
+        "objetivos_per_formulario": objetivos,
+        "participantes_per_formulario": participantes,
+        "rows": rows,
+        "file_bytes": len(data),
+        "rounds": rounds,
+        "paths": {},
+    }
+    with TestClient(app) as client:
+        for name, path in (("per_row_api", _per_row), ("import", _import)):
+            _run(path, counter, client, forms[:10], encode(forms[:10], format), format)
+            runs = [_run(path, counter, client, forms, data, format) for _ in range(rounds)]
+            seconds = statistics.median(run["s"] for run in runs)
+            report["paths"][name] = {
+                "s": round(seconds, 3),
+                "formularios_per_s": round(count / seconds, 1),
+                "rows_per_s": round(rows / seconds, 1),
+                "statements": runs[-1]["statements"],
+                "commits": runs[-1]["commits"],
+            }
+    per_row, bulk = report["paths"]["per_row_api"], report["paths"]["import"]
+    report["speedup"] = round(per_row["s"] / bulk["s"], 1) if bulk["s"] else None
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--formularios", type=int, default=1000, help="Forms loaded per round.")
+    parser.add_argument("--objetivos", type=int, default=3, help="Objectives per form (NDJSON only).")
+    parser.add_argument("--participantes", type=int, default=2, help="Participants per form (NDJSON only).")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+    print(json.dumps(measure(args.formularios, args.objetivos, args.participantes, args.format, args.rounds), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
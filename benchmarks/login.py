@@ -0,0 +1,137 @@
+"""
+Login throughput benchmark.
+
+Seeds `--usuarios` users sharing one password hashed with the current `PASSWORD_HASH_ITERATIONS`, starts
+users-companies-service with the production server and sends `--requests` logins at `--concurrency`.
+Meanwhile it probes `GET /health/live`, whose latency shows whether hashing stalls the event loop. It
+reports logins per second, login latency, probe latency and the cost of one hash in this process.
+Run from `users-companies-service`: `python ../benchmarks/login.py --concurrency 32`.
+Dependencies: httpx, uvicorn, calidad_core, the users service's models and database configuration.
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.getcwd())
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import httpx  # noqa: E402
+
+from calidad_core.passwords import PASSWORD_HASH_ITERATIONS, PASSWORD_HASH_WORKERS  # noqa: E402
+from run import SEED_SCRIPT, _free_port, _wait_until_ready, summarize  # noqa: E402
+
+
+PASSWORD = "benchmark-password"
+PROBE_INTERVAL = 0.05
+
+
+def _seed(env: dict, usuarios: int) -> float:
+    """Create the users with one shared hash; returns the seconds that hash took."""
+    subprocess.run([sys.executable, str(SEED_SCRIPT), json.dumps({"usuarios": usuarios})], env=env, check=True, capture_output=True)
+    code = f"""
+import json, time
+from sqlalchemy import update
+from calidad_core.passwords import hash_password
+from app import models
+from app.database import engine
+start = time.perf_counter()
+stored = hash_password({PASSWORD!r})
+elapsed = time.perf_counter() - start
+with engine.begin() as conn:
+    conn.execute(update(models.Usuario).values(contraseña=stored))
+print(json.dumps(elapsed))
+"""
+    result = subprocess.run([sys.executable, "-c", code], env=env, check=True, capture_output=True, text=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+async def drive(base_url: str, usuarios: int, requests: int, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency + 1, max_keepalive_connections=concurrency + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        pending = iter(range(requests))
+        logins, probes, errors = [], [], 0
+        done = asyncio.Event()
+
+        async def worker():
+            nonlocal errors
+            for i in pending:
+                body = {"correo": f"usuario{i % usuarios + 1}@example.com", "contraseña": PASSWORD}
+                start = time.perf_counter()
+                response = await client.post("/login", json=body)
+                logins.append(time.perf_counter() - start)
+                errors += response.status_code != 200
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/health/live")
+                probes.append(time.perf_counter() - start)
+                await asyncio.sleep(PROBE_INTERVAL)
+
+        prober = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+    return {
+        "logins": len(logins),
+        "errors": errors,
+        "duration_s": round(elapsed, 3),
+        "logins_per_s": round(len(logins) / elapsed, 1) if elapsed else 0.0,
+        "login_ms": summarize(logins),
+        "health_live_ms": summarize(probes),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", help="Database to use (its tables are dropped). Default: a SQLite file in a temporary directory.")
+    parser.add_argument("--app-module", default="app.main", help="`app.main` (sync) or `app.main_async`.")
+    parser.add_argument("--workers", type=int, default=1, help="Server worker processes (`WEB_CONCURRENCY`).")
+    parser.add_argument("--usuarios", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_URL": args.database_url or f"sqlite:///{tmp}/login.db",
+            "DB_SCHEMA_MODE": "none",
+            "AUTH_REQUIRED": "false",
+            "PYTHONPATH": os.getcwd(),
+            "APP_MODULE": f"{args.app_module}:app",
+            "WEB_CONCURRENCY": str(args.workers),
+            "LOG_LEVEL": "warning",
+        }
+        hash_seconds = _seed(env, args.usuarios)
+        port = _free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        process = subprocess.Popen([sys.executable, "-m", "calidad_core.server"], env={**env, "HOST": "127.0.0.1", "PORT": str(port)})
+        try:
+            _wait_until_ready(base_url, process)
+            result = asyncio.run(drive(base_url, args.usuarios, args.requests, args.concurrency))
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    report = {
+        "app_module": args.app_module,
+        "workers": args.workers,
+        "concurrency": args.concurrency,
+        "password_hash_iterations": PASSWORD_HASH_ITERATIONS,
+        "password_hash_workers": PASSWORD_HASH_WORKERS,
+        "hash_ms": round(hash_seconds * 1000, 3),
+        **result,
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
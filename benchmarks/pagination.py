@@ -0,0 +1,91 @@
+"""
+Deep page latency benchmark.
+
+Requests page N of a list endpoint for growing N, once with `skip`/`limit` and once with the keyset
+`cursor` of the row before the page, and reports the latency of each page and how much the last page
+costs relative to the first. With the cursor the ratio stays near 1; with offsets it grows with N because
+the database reads and discards the skipped rows. Run from a service directory against a database filled by
+`seed.py`: `python ../benchmarks/pagination.py formularios --pages 1 10 100 1000`.
+Dependencies: FastAPI test client (httpx), SQLAlchemy, calidad_core, the service's application.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from calidad_core.pagination import encode_cursor  # noqa: E402
+from app import crud  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from run import summarize  # noqa: E402
+from serialization import RESOURCES  # noqa: E402
+
+
+def time_calls(func, iterations: int) -> list[float]:
+    """Wall time in seconds of each of `iterations` calls of `func`, after one untimed call."""
+    func()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _checked(client: TestClient, path: str, **params):
+    response = client.get(path, params=params)
+    response.raise_for_status()
+    return response
+
+
+def measure(resource: str, pages: list[int], page_size: int, iterations: int) -> dict:
+    repository = getattr(crud, resource)
+    path = f"/{resource}/"
+    report = {"resource": resource, "page_size": page_size, "iterations": iterations, "pages": {}}
+    with SessionLocal() as db:
+        total = db.query(repository.model).count()
+    with TestClient(app) as client:
+        for page in pages:
+            skip = (page - 1) * page_size
+            if skip + page_size > total:
+                raise SystemExit(f"only {total} {resource} in the database; page {page} needs {skip + page_size}")
+            with SessionLocal() as db:
+                # Id of the last row of the previous page: the cursor a client walking the pages would hold.
+                after_id = db.scalar(select(repository.id_column).order_by(repository.id_column).offset(skip - 1).limit(1)) if skip else None
+            cursor = {"cursor": encode_cursor(after_id)} if after_id is not None else {}
+            offset_body = _checked(client, path, skip=skip, limit=page_size).content
+            if offset_body != _checked(client, path, limit=page_size, **cursor).content:
+                raise SystemExit(f"page {page}: offset and cursor pages differ")
+            report["pages"][page] = {
+                "skip": skip,
+                "offset_ms": summarize(time_calls(lambda: _checked(client, path, skip=skip, limit=page_size), iterations)),
+                "cursor_ms": summarize(time_calls(lambda: _checked(client, path, limit=page_size, **cursor), iterations)),
+            }
+    first, last = report["pages"][pages[0]], report["pages"][pages[-1]]
+    report["last_to_first_p50"] = {
+        mode: round(last[mode]["p50"] / first[mode]["p50"], 2) if first[mode]["p50"] else None
+        for mode in ("offset_ms", "cursor_ms")
+    }
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("resource", choices=[name for name in RESOURCES if hasattr(crud, name)])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 100, 1000], help="Page numbers, starting at 1.")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args(argv)
+    print(json.dumps(measure(args.resource, sorted(args.pages), args.page_size, args.iterations), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
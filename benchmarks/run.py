@@ -0,0 +1,351 @@
+"""
+Benchmark harness for the three services.
+
+Seeds each service's database, starts the service with the production server (`calidad_core.server`), drives a fixed, seeded mix of CRUD and
+list requests at a fixed concurrency, and writes throughput, p50/p95/p99 latency and database statements
+per request (read from the service's `/metrics`) to a JSON file so runs from different commits can be compared.
+`/metrics` is kept per worker, so statements per request are only reported for runs with one worker.
+Dependencies: httpx, uvicorn, and each service's requirements.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+import httpx
+
+
+ROOT = Path(__file__).resolve().parent.parent
+SEED_SCRIPT = Path(__file__).resolve().parent / "seed.py"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+PLAN_SEED = 15
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    method: str
+    route: str
+    weight: int
+    path: Callable
+    body: Callable | None = None
+
+
+def _empresa_body(rng, volumes):
+    return {"nombre": f"Empresa bench {rng.randint(1, 10**9)}", "telefono": "+57 300 0000000"}
+
+
+def _formulario_body(rng, volumes):
+    return {
+        "id_empresa": rng.randint(1, max(volumes["empresas"], 1)),
+        "fecha": "2024-06-01",
+        "ciudad": "Bogotá",
+        "nombre_software": "bench",
+        "id_usuario": rng.randint(1, max(volumes["usuarios"], 1)),
+        "id_metodologia": rng.randint(1, volumes["metodologias"]),
+    }
+
+
+def _pick(key):
+    return lambda rng, volumes: rng.randint(1, volumes[key])
+
+
+USERS_SCENARIOS = [
+    Scenario("list_empresas", "GET", "/empresas/", 2, lambda rng, v: f"/empresas/?limit=50&skip={rng.randint(0, max(v['empresas'] - 50, 0))}"),
+    Scenario("get_empresa", "GET", "/empresas/{empresa_id}", 4, lambda rng, v: f"/empresas/{_pick('empresas')(rng, v)}"),
+    Scenario("create_empresa", "POST", "/empresas/", 1, lambda rng, v: "/empresas/", _empresa_body),
+    Scenario("update_empresa", "PUT", "/empresas/{empresa_id}", 1, lambda rng, v: f"/empresas/{_pick('empresas')(rng, v)}", _empresa_body),
+    Scenario("list_usuarios", "GET", "/usuarios/", 2, lambda rng, v: f"/usuarios/?limit=50&skip={rng.randint(0, max(v['usuarios'] - 50, 0))}"),
+    Scenario("get_usuario", "GET", "/usuarios/{usuario_id}", 4, lambda rng, v: f"/usuarios/{_pick('usuarios')(rng, v)}"),
+    # PATCH without a password: the mix measures the data path, not PBKDF2.
+    Scenario("patch_usuario", "PATCH", "/usuarios/{usuario_id}", 1, lambda rng, v: f"/usuarios/{_pick('usuarios')(rng, v)}", lambda rng, v: {"nombre": f"Usuario {rng.randint(1, 10**6)}"}),
+]
+
+FORMS_SCENARIOS = [
+    Scenario("list_formularios", "GET", "/formularios/", 2, lambda rng, v: f"/formularios/?limit=50&skip={rng.randint(0, max(v['formularios'] - 50, 0))}"),
+    Scenario("filter_formularios", "GET", "/formularios/", 1, lambda rng, v: f"/formularios/?limit=50&id_empresa={rng.randint(1, max(v['empresas'], 1))}"),
+    Scenario("get_formulario", "GET", "/formularios/{formulario_id}", 4, lambda rng, v: f"/formularios/{_pick('formularios')(rng, v)}"),
+    Scenario("get_formulario_completo", "GET", "/formularios/{formulario_id}/completo", 2, lambda rng, v: f"/formularios/{_pick('formularios')(rng, v)}/completo"),
+    Scenario("create_formulario", "POST", "/formularios/", 1, lambda rng, v: "/formularios/", _formulario_body),
+    Scenario("update_formulario", "PUT", "/formularios/{formulario_id}", 1, lambda rng, v: f"/formularios/{_pick('formularios')(rng, v)}", _formulario_body),
+    Scenario("list_objetivos", "GET", "/objetivos/", 2, lambda rng, v: f"/objetivos/?id_formulario={_pick('formularios')(rng, v)}"),
+    Scenario("get_participante", "GET", "/participantes/{participante_id}", 2, lambda rng, v: f"/participantes/{rng.randint(1, max(v['participantes'], 1))}"),
+    Scenario("get_metodologia", "GET", "/metodologias/{metodologia_id}", 2, lambda rng, v: f"/metodologias/{_pick('metodologias')(rng, v)}"),
+]
+
+SERVICES = {
+    "users-companies-service": USERS_SCENARIOS,
+    # Read-only replica: its rows are written through users-companies-service.
+    "evaluation-service": [scenario for scenario in USERS_SCENARIOS if scenario.method == "GET"],
+    "forms-management-service": FORMS_SCENARIOS,
+}
+
+_METRIC_LINE = re.compile(r'^http_request_db_queries_(sum|count)\{method="([^"]+)",route="([^"]+)"\} (\S+)$')
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(fraction * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(latencies: list[float]) -> dict:
+    values = sorted(latencies)
+    return {
+        "p50": round(percentile(values, 0.50) * 1000, 3),
+        "p95": round(percentile(values, 0.95) * 1000, 3),
+        "p99": round(percentile(values, 0.99) * 1000, 3),
+        "mean": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "max": round(values[-1] * 1000, 3) if values else 0.0,
+    }
+
+
+def build_plan(scenarios: list[Scenario], volumes: dict, total: int) -> list[tuple]:
+    """The request sequence for a run; the fixed seed keeps it identical between commits."""
+    rng = random.Random(PLAN_SEED)
+    chosen = rng.choices(scenarios, weights=[scenario.weight for scenario in scenarios], k=total)
+    return [
+        (scenario, scenario.path(rng, volumes), scenario.body(rng, volumes) if scenario.body else None)
+        for scenario in chosen
+    ]
+
+
+async def read_db_queries(client: httpx.AsyncClient) -> dict:
+    """Per (method, route) running totals of `http_request_db_queries` from the service's `/metrics`."""
+    response = await client.get("/metrics")
+    totals = {}
+    for line in response.text.splitlines():
+        match = _METRIC_LINE.match(line)
+        if match:
+            kind, method, route, value = match.groups()
+            totals.setdefault((method, route), {"sum": 0.0, "count": 0.0})[kind] = float(value)
+    return totals
+
+
+async def drive(base_url: str, plan: list[tuple], concurrency: int, warmup: int, count_queries: bool = True) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        for scenario, path, body in plan[:warmup]:
+            await client.request(scenario.method, path, json=body)
+
+        before = await read_db_queries(client) if count_queries else {}
+        queue = iter(plan[warmup:])
+        samples = {}
+        errors = {}
+
+        async def worker():
+            for scenario, path, body in queue:
+                start = time.perf_counter()
+                try:
+                    response = await client.request(scenario.method, path, json=body)
+                    failed = response.status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                samples.setdefault(scenario, []).append(time.perf_counter() - start)
+                if failed:
+                    errors[scenario] = errors.get(scenario, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        after = await read_db_queries(client) if count_queries else {}
+
+    all_latencies = [latency for latencies in samples.values() for latency in latencies]
+    scenarios = {}
+    for scenario, latencies in sorted(samples.items(), key=lambda item: item[0].name):
+        key = (scenario.method, scenario.route)
+        delta_sum = after.get(key, {}).get("sum", 0.0) - before.get(key, {}).get("sum", 0.0)
+        delta_count = after.get(key, {}).get("count", 0.0) - before.get(key, {}).get("count", 0.0)
+        scenarios[scenario.name] = {
+            "method": scenario.method,
+            "route": scenario.route,
+            "requests": len(latencies),
+            "errors": errors.get(scenario, 0),
+            "latency_ms": summarize(latencies),
+            # Scenarios sharing a route (e.g. list and filter) report the route's combined average; None with
+            # several workers, whose counters are split between processes.
+            "db_queries_per_request": round(delta_sum / delta_count, 3) if delta_count else None,
+        }
+    return {
+        "requests": len(all_latencies),
+        "errors": sum(errors.values()),
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(all_latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": summarize(all_latencies),
+        "scenarios": scenarios,
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"service exited with code {process.returncode} before accepting requests")
+        try:
+            if httpx.get(base_url + "/health/ready", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"service at {base_url} did not become ready in {timeout} s")
+
+
+def run_service(service: str, args, volumes: dict, database_url: str) -> dict:
+    service_dir = ROOT / service
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "DB_SCHEMA_MODE": "none",
+        "AUTH_REQUIRED": "false",
+        "METRICS_ENABLED": "true",
+        "PYTHONPATH": str(service_dir),
+        "APP_MODULE": f"{args.app_module}:app",
+        "WEB_CONCURRENCY": str(args.workers),
+        "LOG_LEVEL": "warning",
+    }
+    seeded = json.loads(subprocess.run(
+        [sys.executable, str(SEED_SCRIPT), json.dumps(volumes)],
+        cwd=service_dir, env=env, check=True, capture_output=True, text=True,
+    ).stdout)
+    volumes = {**volumes, **seeded}
+
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "calidad_core.server"],
+        cwd=service_dir, env={**env, "HOST": "127.0.0.1", "PORT": str(port)},
+    )
+    try:
+        _wait_until_ready(base_url, process)
+        plan = build_plan(SERVICES[service], volumes, args.requests + args.warmup)
+        result = asyncio.run(drive(base_url, plan, args.concurrency, args.warmup, count_queries=args.workers == 1))
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return {"app_module": args.app_module, "workers": args.workers, "seeded": seeded, **result}
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list[str]:
+    """Lines describing throughput and p95 changes; entries past `threshold` are marked as regressions."""
+    lines = []
+    for service, result in current["services"].items():
+        old = baseline.get("services", {}).get(service)
+        if old is None:
+            continue
+        rows = [("total", old, result)] + [
+            (name, old["scenarios"][name], scenario)
+            for name, scenario in result["scenarios"].items() if name in old["scenarios"]
+        ]
+        for name, before, after in rows:
+            p95_change = (after["latency_ms"]["p95"] - before["latency_ms"]["p95"]) / before["latency_ms"]["p95"] if before["latency_ms"]["p95"] else 0.0
+            mark = "REGRESSION" if p95_change > threshold else ""
+            line = f"{service:26} {name:24} p95 {before['latency_ms']['p95']:9.2f} -> {after['latency_ms']['p95']:9.2f} ms ({p95_change:+.1%})"
+            if name == "total":
+                rps_change = (after["throughput_rps"] - before["throughput_rps"]) / before["throughput_rps"] if before["throughput_rps"] else 0.0
+                line += f"  rps {before['throughput_rps']:.1f} -> {after['throughput_rps']:.1f} ({rps_change:+.1%})"
+                if rps_change < -threshold:
+                    mark = "REGRESSION"
+            lines.append(f"{line}  {mark}".rstrip())
+    return lines
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--services", nargs="+", choices=sorted(SERVICES), default=sorted(SERVICES))
+    parser.add_argument("--database-url", help="Database for every service (its tables are dropped). Default: one SQLite file per service in a temporary directory.")
+    parser.add_argument("--app-module", default="app.main", help="`app.main` (sync) or `app.main_async`.")
+    parser.add_argument("--workers", type=int, default=1, help="Server worker processes (`WEB_CONCURRENCY`).")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=5000, help="Measured requests per service.")
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--empresas", type=int, default=1000)
+    parser.add_argument("--usuarios", type=int, default=1000)
+    parser.add_argument("--metodologias", type=int, default=10)
+    parser.add_argument("--formularios", type=int, default=10000)
+    parser.add_argument("--objetivos-per-formulario", type=int, default=3)
+    parser.add_argument("--participantes-per-formulario", type=int, default=3)
+    parser.add_argument("--output", type=Path, help="Result file. Default: benchmarks/results/<timestamp>-<commit>.json.")
+    parser.add_argument("--compare", type=Path, help="Earlier result file to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change reported as a regression (default 0.10).")
+    args = parser.parse_args(argv)
+
+    volumes = {
+        "empresas": args.empresas,
+        "usuarios": args.usuarios,
+        "metodologias": args.metodologias,
+        "formularios": args.formularios,
+        "objetivos_per_formulario": args.objetivos_per_formulario,
+        "participantes_per_formulario": args.participantes_per_formulario,
+    }
+    commit = _git_commit()
+    report = {
+        "commit": commit,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "app_module": args.app_module,
+            "workers": args.workers,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "database": "sqlite" if args.database_url is None else args.database_url.split("://", 1)[0],
+            "volumes": volumes,
+        },
+        "services": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        for service in args.services:
+            database_url = args.database_url or f"sqlite:///{workdir}/{service}.db"
+            print(f"benchmarking {service} ...", file=sys.stderr)
+            result = run_service(service, args, volumes, database_url)
+            report["services"][service] = result
+            print(
+                f"{service}: {result['throughput_rps']} req/s, p50 {result['latency_ms']['p50']} ms, "
+                f"p95 {result['latency_ms']['p95']} ms, p99 {result['latency_ms']['p99']} ms, {result['errors']} errors",
+                file=sys.stderr,
+            )
+
+    output = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{(commit or 'nocommit')[:8]}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+    print(f"results written to {output}", file=sys.stderr)
+
+    if args.compare:
+        lines = compare(json.loads(args.compare.read_text()), report, args.threshold)
+        print("\n".join(lines))
+        if any(line.endswith("REGRESSION") for line in lines):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Worker scaling benchmark.
+
+Runs the `run.py` load once per worker count and reports throughput and p95 latency against the first count:
+`python benchmarks/scaling.py --workers 1 2 4 -- --concurrency 32 --services forms-management-service`.
+Arguments after `--` are passed to `run.py`. Measure on a PostgreSQL `--database-url`: SQLite serializes
+writers across processes, and the machine needs at least as many free cores as the largest count.
+Dependencies: the `run.py` harness.
+"""
+import argparse
+import json
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import run  # noqa: E402
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    run_args = argv[argv.index("--") + 1:] if "--" in argv else []
+    own_args = argv[:argv.index("--")] if "--" in argv else argv
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--output", type=Path, help="Result file. Default: benchmarks/results/<timestamp>-<commit>-scaling.json.")
+    args = parser.parse_args(own_args)
+
+    reports = {}
+    with tempfile.TemporaryDirectory(prefix="scaling-") as workdir:
+        for workers in args.workers:
+            output = Path(workdir) / f"{workers}.json"
+            run.main([*run_args, "--workers", str(workers), "--output", str(output)])
+            reports[workers] = json.loads(output.read_text())
+
+    base = reports[args.workers[0]]
+    summary = {"commit": base["commit"], "config": {**base["config"], "workers": args.workers}, "services": {}}
+    for service in base["services"]:
+        rows = []
+        for workers, report in reports.items():
+            result = report["services"][service]
+            rows.append({
+                "workers": workers,
+                "throughput_rps": result["throughput_rps"],
+                "speedup": round(result["throughput_rps"] / base["services"][service]["throughput_rps"], 2),
+                "p95_ms": result["latency_ms"]["p95"],
+                "errors": result["errors"],
+            })
+            print(f"{service:26} {workers:3} workers  {rows[-1]['throughput_rps']:8.1f} req/s  x{rows[-1]['speedup']:<5}  p95 {rows[-1]['p95_ms']:8.2f} ms  {rows[-1]['errors']} errors")
+        summary["services"][service] = rows
+
+    output = args.output or run.RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{(base['commit'] or 'nocommit')[:8]}-scaling.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(summary, indent=2, ensure_ascii=False) + "\n")
+    print(f"results written to {output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Search latency benchmark.
+
+Times `/buscar` queries of different selectivity through the forms service's search module, and on
+databases other than PostgreSQL the time and memory to build the in-process index. Run from
+`forms-management-service` against a database filled by `seed.py`, e.g. with 10^6 objectives:
+`python ../benchmarks/seed.py '{"formularios": 200000, "objetivos_per_formulario": 5}'`
+then `python ../benchmarks/search.py`.
+Dependencies: SQLAlchemy, the forms service's search module and database configuration.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.getcwd())
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import search  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from run import summarize  # noqa: E402
+
+
+# (name, q, tipo): from one matching row to most of the table.
+QUERIES = [
+    ("software_exacto", "Software 123456", "formulario"),
+    ("numero_raro", "4242", None),
+    ("tres_palabras", "seguridad api pagos", None),
+    ("dos_palabras", "usabilidad facturacion", None),
+    ("una_palabra", "rendimiento", None),
+    ("muy_comun", "evaluar", "objetivo"),
+    ("sin_resultados", "blockchain", None),
+]
+
+
+def _timed(func, iterations: int) -> tuple[dict, int]:
+    results = func()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies), len(results)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--memory", action="store_true", help="Trace the index memory; makes the build several times slower.")
+    args = parser.parse_args(argv)
+
+    index = search.SearchIndex(SessionLocal)
+    report = {"iterations": args.iterations, "limit": args.limit, "queries": {}}
+    with SessionLocal() as db:
+        report["dialect"] = db.get_bind().dialect.name
+        report["objetivos"] = db.query(search.Objetivo).count()
+        if report["dialect"] != "postgresql":
+            if args.memory:
+                tracemalloc.start()
+            start = time.perf_counter()
+            index.rebuild(db)
+            report["build_s"] = round(time.perf_counter() - start, 3)
+            if args.memory:
+                report["index_memory_mb"] = round(tracemalloc.get_traced_memory()[0] / 2**20, 1)
+                tracemalloc.stop()
+            report["terms"] = len(index.index.postings)
+        for name, q, tipo in QUERIES:
+            latency, results = _timed(lambda: index.search(db, q, tipo, 0, args.limit), args.iterations)
+            report["queries"][name] = {"q": q, "tipo": tipo, "results": results, **latency}
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
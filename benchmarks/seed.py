@@ -0,0 +1,110 @@
+"""
+Benchmark data seeder.
+
+Recreates the tables of one service and fills them with a deterministic data set.
+Run from a service directory so `app` resolves to that service, with `DATABASE_URL` pointing at the
+benchmark database: `python ../benchmarks/seed.py '{"empresas": 1000, ...}'`. The tables are dropped first.
+Dependencies: SQLAlchemy, the service's models and database configuration.
+"""
+import json
+import os
+import random
+import sys
+from datetime import date, timedelta
+
+sys.path.insert(0, os.getcwd())
+
+from sqlalchemy import insert  # noqa: E402
+
+from app import models  # noqa: E402
+from app.database import engine  # noqa: E402
+
+
+BATCH_SIZE = 5000
+SEED = 15
+
+# Objective descriptions are drawn from these phrases so searches match realistic shares of the rows.
+VERBOS = ["Evaluar", "Medir", "Mejorar", "Verificar", "Documentar", "Reducir", "Validar", "Analizar"]
+ATRIBUTOS = [
+    "la usabilidad", "el rendimiento", "la seguridad", "la mantenibilidad",
+    "la fiabilidad", "la portabilidad", "la compatibilidad", "la accesibilidad",
+]
+COMPONENTES = [
+    "del módulo de facturación", "de la interfaz web", "de la aplicación móvil", "del sistema de inventario",
+    "de la API de pagos", "del portal de clientes", "del motor de reportes", "de la integración contable",
+]
+
+
+def _objetivo(rng: random.Random) -> str:
+    return f"{rng.choice(VERBOS)} {rng.choice(ATRIBUTOS)} {rng.choice(COMPONENTES)} ({rng.randint(1, 100000)})"
+
+
+def _insert(conn, model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn.execute(insert(model), rows[start:start + BATCH_SIZE])
+
+
+def seed(volumes: dict) -> dict:
+    rng = random.Random(SEED)
+    models.Base.metadata.drop_all(engine)
+    models.Base.metadata.create_all(engine)
+    seeded = {}
+    with engine.begin() as conn:
+        if hasattr(models, "Empresa"):
+            empresas = volumes.get("empresas", 0)
+            _insert(conn, models.Empresa, [
+                {"nombre": f"Empresa {i}", "telefono": f"+57 300 {i:07d}"} for i in range(1, empresas + 1)
+            ])
+            usuarios = volumes.get("usuarios", 0)
+            rows = [
+                {"correo": f"usuario{i}@example.com", "nombre": f"Usuario {i}", "rol": "usuario"}
+                for i in range(1, usuarios + 1)
+            ]
+            # One precomputed hash for every row: seeding must not pay PBKDF2 per user. The evaluation
+            # service's replica keeps no hashes.
+            if "contraseña" in models.Usuario.__table__.c:
+                for row in rows:
+                    row["contraseña"] = "pbkdf2_sha256$1$seed$seed"
+            _insert(conn, models.Usuario, rows)
+            seeded.update(empresas=empresas, usuarios=usuarios)
+        if hasattr(models, "Formulario"):
+            metodologias = volumes.get("metodologias", 10)
+            formularios = volumes.get("formularios", 0)
+            objetivos = volumes.get("objetivos_per_formulario", 0)
+            participantes = volumes.get("participantes_per_formulario", 0)
+            empresas = max(volumes.get("empresas", 0), 1)
+            usuarios = max(volumes.get("usuarios", 0), 1)
+            ciudades = ["Bogotá", "Medellín", "Cali", "Barranquilla", "Bucaramanga"]
+            _insert(conn, models.Metodologia, [
+                {"nombre": f"Metodología {i}", "descripcion": f"Descripción {i}"} for i in range(1, metodologias + 1)
+            ])
+            _insert(conn, models.Formulario, [
+                {
+                    "id_empresa": rng.randint(1, empresas),
+                    "fecha": date(2020, 1, 1) + timedelta(days=rng.randint(0, 1800)),
+                    "ciudad": rng.choice(ciudades),
+                    "nombre_software": f"Software {i}",
+                    "id_usuario": rng.randint(1, usuarios),
+                    "id_metodologia": rng.randint(1, metodologias),
+                }
+                for i in range(1, formularios + 1)
+            ])
+            _insert(conn, models.ObjetivoFormulario, [
+                {"id_formulario": f, "descripcion": _objetivo(rng), "tipo": rng.choice(["general", "especifico"])}
+                for f in range(1, formularios + 1) for j in range(objetivos)
+            ])
+            _insert(conn, models.ParticipanteFormulario, [
+                {"id_formulario": f, "cargo": "Evaluador", "nombre": f"Participante {j}", "firma_hash": None}
+                for f in range(1, formularios + 1) for j in range(participantes)
+            ])
+            seeded.update(
+                metodologias=metodologias,
+                formularios=formularios,
+                objetivos=formularios * objetivos,
+                participantes=formularios * participantes,
+            )
+    return seeded
+
+
+if __name__ == "__main__":
+    print(json.dumps(seed(json.loads(sys.argv[1]))))
@@ -0,0 +1,97 @@
+"""
+List serialization benchmark.
+
+Measures the CPU time spent per page of a list endpoint on the two response paths: ORM objects validated
+against the `response_model` and dumped by Pydantic, as FastAPI does for the endpoints returning objects,
+and rows selected with `Repository.paginate_rows` rendered by `FastJSONResponse`. Run from a service directory
+against a database filled by `seed.py`: `python ../benchmarks/serialization.py formularios --page-size 100`.
+Dependencies: SQLAlchemy, Pydantic, calidad_core, the service's crud, schemas and database configuration.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from calidad_core import responses  # noqa: E402
+from app import crud, schemas  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+
+
+RESOURCES = {
+    "empresas": "Empresa",
+    "usuarios": "Usuario",
+    "formularios": "Formulario",
+    "objetivos": "ObjetivoFormulario",
+    "participantes": "ParticipanteFormulario",
+    "metodologias": "Metodologia",
+}
+
+
+def _cpu_per_call(func, iterations: int) -> float:
+    """Mean process CPU time of `func` in milliseconds."""
+    func()
+    start = time.process_time()
+    for _ in range(iterations):
+        func()
+    return (time.process_time() - start) / iterations * 1000
+
+
+def measure(resource: str, page_size: int, iterations: int) -> dict:
+    repository = getattr(crud, resource)
+    schema = getattr(schemas, RESOURCES[resource])
+    # The validate-then-dump pass FastAPI runs for `response_model=list[schema]` with its default response class.
+    adapter = TypeAdapter(list[schema])
+
+    def validated(objects):
+        return adapter.dump_json(adapter.validate_python(objects, from_attributes=True))
+
+    def rows(items):
+        return responses.FastJSONResponse(items).body
+
+    with SessionLocal() as db:
+        objects = repository.paginate(db, limit=page_size)
+        items = repository.paginate_rows(db, limit=page_size, schema=schema)
+        if len(objects) < page_size:
+            raise SystemExit(f"only {len(objects)} {resource} in the database; seed at least {page_size}")
+        if json.loads(validated(objects)) != json.loads(rows(items)):
+            raise SystemExit("the two paths disagree on the response body")
+
+        def orm_page():
+            db.expunge_all()
+            return validated(repository.paginate(db, limit=page_size))
+
+        def rows_page():
+            return rows(repository.paginate_rows(db, limit=page_size, schema=schema))
+
+        return {
+            "resource": resource,
+            "page_size": page_size,
+            "iterations": iterations,
+            "orjson": responses.orjson is not None,
+            "response_bytes": len(rows(items)),
+            "cpu_ms_per_page": {
+                "serialize_validated": round(_cpu_per_call(lambda: validated(objects), iterations), 4),
+                "serialize_rows": round(_cpu_per_call(lambda: rows(items), iterations), 4),
+                "fetch_and_serialize_validated": round(_cpu_per_call(orm_page, iterations), 4),
+                "fetch_and_serialize_rows": round(_cpu_per_call(rows_page, iterations), 4),
+            },
+        }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("resource", choices=[name for name in RESOURCES if hasattr(crud, name)])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args(argv)
+    print(json.dumps(measure(args.resource, args.page_size, args.iterations), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Statistics latency benchmark.
+
+Times the forms statistics queries read straight from `formulario` and from the `resumen_formularios`
+summary, and the time to rebuild the summary. Run from `forms-management-service` against a database
+filled by `seed.py`, e.g. with 10^6 forms:
+`python ../benchmarks/seed.py '{"formularios": 1000000, "empresas": 1000, "objetivos_per_formulario": 1}'`
+then `python ../benchmarks/stats.py`.
+Dependencies: SQLAlchemy, the forms service's stats module and database configuration.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import schemas, stats  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from run import summarize  # noqa: E402
+
+
+QUERIES = [
+    ("por_empresa", "empresa", {}),
+    ("por_metodologia", "metodologia", {}),
+    ("por_ciudad", "ciudad", {}),
+    ("por_mes", "mes", {}),
+    ("por_mes_de_una_empresa", "mes", {"id_empresa": 1}),
+    ("por_empresa_en_2023", "empresa", {"desde": "2023-01-01", "hasta": "2023-12-31"}),
+]
+
+
+def _timed(func, iterations: int) -> dict:
+    func()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    report = {"iterations": args.iterations, "queries": {}}
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        stats.refresh_summary(db)
+        report["refresh_s"] = round(time.perf_counter() - start, 3)
+        report["summary_rows"] = db.query(stats.Resumen).count()
+        report["formularios"] = db.query(stats.Formulario).count()
+        for name, por, filters in QUERIES:
+            filtros = schemas.FormularioFiltro(**filters)
+            report["queries"][name] = {
+                fuente: _timed(lambda: stats.formularios_por(db, por, filtros, fuente), args.iterations)
+                for fuente in ("directo", "resumen")
+            }
+        report["queries"]["objetivos_por_formulario"] = {
+            "directo": _timed(lambda: stats.objetivos_por_formulario(db, schemas.FormularioFiltro()), args.iterations),
+        }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""
+Response size benchmark.
+
+Measures the bytes on the wire and the CPU time per page of a list endpoint for the full rows and for a
+`?fields=` subset, each sent as is, gzip- and brotli-compressed as `CompressionMiddleware` does. The CPU time
+covers the query, the JSON rendering and the compression. Run from a service directory against a database
+filled by `seed.py`: `python ../benchmarks/wire.py metodologias --page-size 100`.
+Dependencies: SQLAlchemy, calidad_core, the service's crud, schemas and database configuration, brotli (optional).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from calidad_core import compression, responses  # noqa: E402
+from app import crud, schemas  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from serialization import RESOURCES, _cpu_per_call  # noqa: E402
+
+
+# The fields a client listing ids and names asks for.
+DEFAULT_FIELDS = {
+    "empresas": "nombre",
+    "usuarios": "correo,nombre",
+    "formularios": "fecha,nombre_software",
+    "objetivos": "id_formulario,tipo",
+    "participantes": "nombre,cargo",
+    "metodologias": "nombre",
+}
+
+
+def measure(resource: str, fields: list[str], page_size: int, iterations: int) -> dict:
+    repository = getattr(crud, resource)
+    schema = getattr(schemas, RESOURCES[resource])
+    encodings = (None, *reversed(compression.supported_encodings()))
+    report = {"resource": resource, "page_size": page_size, "iterations": iterations, "fields": fields, "variants": {}}
+    with SessionLocal() as db:
+        if len(repository.paginate_rows(db, limit=page_size, schema=schema)) < page_size:
+            raise SystemExit(f"fewer than {page_size} {resource} in the database; seed more")
+        for selection, selected in (("all_fields", None), ("fields", fields)):
+            for encoding in encodings:
+
+                def page():
+                    body = responses.FastJSONResponse(repository.paginate_rows(db, limit=page_size, schema=schema, fields=selected)).body
+                    return compression.compress(body, encoding) if encoding else body
+
+                report["variants"][f"{selection}_{encoding or 'identity'}"] = {
+                    "bytes": len(page()),
+                    "cpu_ms_per_page": round(_cpu_per_call(page, iterations), 4),
+                }
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("resource", choices=[name for name in RESOURCES if hasattr(crud, name)])
+    parser.add_argument("--fields", help="Comma-separated fields; defaults to a typical id-and-name selection.")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args(argv)
+    fields = (args.fields or DEFAULT_FIELDS[args.resource]).split(",")
+    print(json.dumps(measure(args.resource, fields, args.page_size, args.iterations), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
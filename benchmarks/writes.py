@@ -0,0 +1,107 @@
+"""
+Single-row write benchmark.
+
+Compares the repository's writes with the read-before-write path they replaced: load the row,
+change it, commit and refresh it (update), or load it, delete it and commit (delete). The fast path
+runs one `UPDATE ... RETURNING` for a full update (PUT) or a partial one (PATCH, only the changed column
+is sent) and one `DELETE ... RETURNING` for a delete. Reports the statements and latency per write.
+Run from `forms-management-service` against a database filled by `seed.py`:
+`python ../benchmarks/writes.py objetivos --iterations 500`.
+Dependencies: SQLAlchemy, the forms service's crud and database configuration.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.getcwd())
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import String, select  # noqa: E402
+
+from app import crud  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from bulk import StatementCounter  # noqa: E402
+from run import summarize  # noqa: E402
+
+
+RESOURCES = ["formularios", "objetivos", "participantes", "metodologias"]
+MARK = " *"
+
+
+def legacy_update(db, repository, obj_id, values: dict):
+    db_obj = db.query(repository.model).filter(repository.id_column == obj_id).first()
+    for key, value in values.items():
+        setattr(db_obj, key, value)
+    db.commit()
+    db.refresh(db_obj)
+    return db_obj
+
+
+def legacy_delete(db, repository, obj_id):
+    db_obj = db.query(repository.model).filter(repository.id_column == obj_id).first()
+    db.delete(db_obj)
+    db.commit()
+    return db_obj
+
+
+def _per_write(counter, db, write, ids: list, values) -> dict:
+    """Run `write(db, obj_id, values(i))` once per id, counting statements and timing each write."""
+    latencies = []
+    with counter.counting():
+        for i, obj_id in enumerate(ids):
+            db.expunge_all()
+            start = time.perf_counter()
+            write(db, obj_id, values(i))
+            latencies.append(time.perf_counter() - start)
+    return {"statements_per_write": round(counter.statements / len(ids), 2), "latency_ms": summarize(latencies)}
+
+
+def measure(resource: str, iterations: int) -> dict:
+    repository = getattr(crud, resource)
+    table = repository.table
+    # A text column to toggle, so every write really changes the row.
+    column = next(c.key for c in table.c if isinstance(c.type, String) and not c.primary_key and not c.unique)
+    counter = StatementCounter(engine)
+    with SessionLocal() as db:
+        row = db.execute(select(table).order_by(repository.pk).limit(1)).mappings().first()
+        if row is None:
+            raise SystemExit(f"no {resource} in the database; seed some first")
+        obj_id, base = row[repository.pk.key], {key: value for key, value in row.items() if key != repository.pk.key}
+        original = base[column] or ""
+
+        def full(i):
+            return {**base, column: original + MARK if i % 2 == 0 else original}
+
+        def partial(i):
+            return {column: original + MARK if i % 2 == 0 else original}
+
+        def new_rows():
+            created = db.execute(table.insert().returning(repository.pk), [base] * iterations).scalars().all()
+            db.commit()
+            return created
+
+        same = [obj_id] * iterations
+        report = {"resource": resource, "iterations": iterations, "column": column, "paths": {
+            "update_read_before_write": _per_write(counter, db, lambda db, i, v: legacy_update(db, repository, i, v), same, full),
+            "update_returning": _per_write(counter, db, repository.update, same, full),
+            "patch_returning": _per_write(counter, db, repository.update, same, partial),
+            "delete_read_before_write": _per_write(counter, db, lambda db, i, v: legacy_delete(db, repository, i), new_rows(), lambda i: None),
+            "delete_returning": _per_write(counter, db, lambda db, i, v: repository.delete(db, i), new_rows(), lambda i: None),
+        }}
+        repository.update(db, obj_id, {column: row[column]})
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("resource", choices=RESOURCES)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args(argv)
+    print(json.dumps(measure(args.resource, args.iterations), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,13 @@
+"""
+Shared core of the back_calidad services.
+
+Engine factory and session dependencies (`database`), generic repositories (`repository`), read-through
+cache (`cache`), cursor pagination (`pagination`), token authentication (`auth`), password hashing
+(`passwords`), conditional requests (`etag`), request metrics (`metrics`), fast JSON responses (`responses`),
+health probes (`health`), the cross-service client (`client`) and the production server (`server`).
+Dependencies: FastAPI, SQLAlchemy, Pydantic.
+"""
+from .database import create_async_engine, create_engine
+from .repository import AsyncRepository, Repository
+
+__all__ = ["AsyncRepository", "Repository", "create_async_engine", "create_engine"]
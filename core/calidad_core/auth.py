@@ -0,0 +1,124 @@
+"""
+Token authentication module.
+
+Issues and verifies signed stateless tokens (JWT, HS256) so every service can authenticate requests
+locally with the shared `AUTH_SECRET`, without calling back to the service that issued them.
+Enforcement is opt-in through `AUTH_REQUIRED`.
+Dependencies: FastAPI, standard library.
+"""
+import base64
+import binascii
+import functools
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+
+AUTH_REQUIRED = os.getenv("AUTH_REQUIRED", "false").lower() in ("1", "true", "yes")
+AUTH_TOKEN_TTL = int(os.getenv("AUTH_TOKEN_TTL", "3600"))
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+PUBLIC_PATHS = {"/", "/login", "/health/live", "/health/ready"}
+
+logger = logging.getLogger(__name__)
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+@functools.lru_cache(maxsize=1)
+def _signing_key() -> bytes:
+    secret = os.getenv("AUTH_SECRET")
+    if not secret:
+        logger.warning("AUTH_SECRET is not set; tokens are signed with a per-process key")
+        secret = secrets.token_urlsafe(32)
+    return secret.encode()
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(signing_input: str) -> str:
+    return _b64encode(hmac.new(_signing_key(), signing_input.encode(), hashlib.sha256).digest())
+
+
+_HEADER = _b64encode(json.dumps({"alg": "HS256", "typ": "JWT"}, separators=(",", ":")).encode())
+
+
+def create_token(claims: dict) -> str:
+    now = int(time.time())
+    payload = {**claims, "iat": now, "exp": now + AUTH_TOKEN_TTL}
+    signing_input = f"{_HEADER}.{_b64encode(json.dumps(payload, separators=(',', ':')).encode())}"
+    return f"{signing_input}.{_sign(signing_input)}"
+
+
+@functools.lru_cache(maxsize=AUTH_TOKEN_CACHE_SIZE)
+def _verified_claims(token: str) -> dict | None:
+    """Check the signature and decode the claims; repeated tokens are answered from the cache."""
+    try:
+        header, payload, signature = token.split(".")
+        if header != _HEADER or not hmac.compare_digest(_sign(f"{header}.{payload}"), signature):
+            return None
+        return json.loads(_b64decode(payload))
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+
+def verify_token(token: str) -> dict | None:
+    claims = _verified_claims(token)
+    if claims is None or claims.get("exp", 0) < time.time():
+        return None
+    return dict(claims)
+
+
+def require_token(request: Request, credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme)) -> dict | None:
+    """App-wide dependency: returns the token claims, or rejects the request when `AUTH_REQUIRED` is set."""
+    if not AUTH_REQUIRED or request.url.path in PUBLIC_PATHS:
+        return None
+    claims = verify_token(credentials.credentials) if credentials else None
+    if claims is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido o ausente",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return claims
+
+
+def request_claims(credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme)) -> dict | None:
+    """Route dependency: the claims of a valid bearer token, or None. Independent of `AUTH_REQUIRED`."""
+    return verify_token(credentials.credentials) if credentials else None
+
+
+def has_role(claims: dict | None, *roles: str) -> bool:
+    return claims is not None and claims.get("rol") in roles
+
+
+def require_role(*roles: str):
+    """
+    Route dependency for administrative operations: a valid token whose `rol` is one of `roles`.
+
+    Enforced even when `AUTH_REQUIRED` is off, so destructive endpoints never run unauthenticated.
+    """
+
+    def dependency(claims: dict | None = Depends(request_claims)) -> dict:
+        if claims is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token inválido o ausente",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        if not has_role(claims, *roles):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Permisos insuficientes")
+        return claims
+
+    return dependency
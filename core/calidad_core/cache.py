@@ -0,0 +1,163 @@
+"""
+Read-through cache module.
+
+Caches rarely changing rows in front of the repositories' `get` method.
+The default backend is an in-process LRU with a TTL; setting `CACHE_URL` switches to a shared
+Redis backend so every worker sees the same entries and invalidations. With `CACHE_ENABLED` off every lookup
+goes to the loader; `calidad_core.server` turns it off when it runs several workers without `CACHE_URL`.
+Dependencies: standard library, `redis` for the shared backend.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+CACHE_URL = os.getenv("CACHE_URL")
+CACHE_TTL = float(os.getenv("CACHE_TTL", "300"))
+CACHE_MAX_ITEMS = int(os.getenv("CACHE_MAX_ITEMS", "1024"))
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+class LRUCacheBackend:
+    """Thread-safe in-process cache evicting the least recently used entry once full."""
+
+    name = "lru"
+
+    def __init__(self, max_items: int, ttl: float):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_items:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class SharedCacheBackend:
+    """
+    Cache stored in a Redis-compatible client shared by every worker.
+
+    Any object with `get`, `set(key, value, ex=...)` and `delete` works as client, so tests can pass a local stand-in.
+    """
+
+    name = "shared"
+
+    def __init__(self, client, ttl: float, prefix: str):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key: str):
+        value = self.client.get(f"{self.prefix}:{key}")
+        return json.loads(value) if value is not None else None
+
+    def set(self, key: str, value: dict):
+        self.client.set(f"{self.prefix}:{key}", json.dumps(value, default=str), ex=max(int(self.ttl), 1))
+
+    def delete(self, key: str):
+        self.client.delete(f"{self.prefix}:{key}")
+
+    def size(self) -> int | None:
+        return None
+
+
+class NullCacheBackend:
+    """Stores nothing: every lookup is a miss served by the loader."""
+
+    name = "none"
+
+    def get(self, key: str):
+        return None
+
+    def set(self, key: str, value: dict):
+        pass
+
+    def delete(self, key: str):
+        pass
+
+    def size(self) -> int:
+        return 0
+
+
+class ReadThroughCache:
+    """Looks values up in a backend, loading and storing them on a miss, and counts hits and misses."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_load(self, key: str, loader):
+        value = self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = loader()
+        if value is not None:
+            self.backend.set(key, value)
+        return value
+
+    async def get_or_load_async(self, key: str, loader):
+        value = self.backend.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = await loader()
+        if value is not None:
+            self.backend.set(key, value)
+        return value
+
+    def invalidate(self, key: str):
+        self.backend.delete(key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "size": self.backend.size(),
+        }
+
+
+def create_cache(prefix: str) -> ReadThroughCache:
+    """
+    Cache for one service, configured from the environment.
+
+    `prefix` namespaces the keys in the shared backend so services pointing at the same Redis do not collide.
+    """
+    if not CACHE_ENABLED:
+        return ReadThroughCache(NullCacheBackend())
+    if CACHE_URL:
+        import redis
+
+        return ReadThroughCache(SharedCacheBackend(redis.Redis.from_url(CACHE_URL), CACHE_TTL, prefix))
+    return ReadThroughCache(LRUCacheBackend(CACHE_MAX_ITEMS, CACHE_TTL))
@@ -0,0 +1,151 @@
+"""
+Cross-service client.
+
+Async HTTP client for reading another service's rows by id. Each client keeps one keep-alive connection
+pool, coalesces the lookups made during the same event loop iteration into batched `GET /<resource>/?ids=`
+requests, and answers repeated lookups from a short-TTL in-process cache.
+Dependencies: httpx, calidad_core.auth (service tokens).
+"""
+import asyncio
+import os
+import time
+from collections.abc import Iterable
+
+import httpx
+
+from .auth import AUTH_TOKEN_TTL, create_token
+from .cache import LRUCacheBackend
+from .pagination import IDS_MAX
+
+
+SERVICE_TIMEOUT = float(os.getenv("SERVICE_TIMEOUT", "2"))
+SERVICE_MAX_CONNECTIONS = int(os.getenv("SERVICE_MAX_CONNECTIONS", "20"))
+SERVICE_CACHE_TTL = float(os.getenv("SERVICE_CACHE_TTL", "30"))
+SERVICE_CACHE_MAX_ITEMS = int(os.getenv("SERVICE_CACHE_MAX_ITEMS", "10000"))
+
+
+class ServiceUnavailable(Exception):
+    """The other service could not be reached or answered with an error."""
+
+
+class ServiceClient:
+    """
+    Batched, cached reads of `resource` rows from the service at `base_url`.
+
+    `id_fields` maps each resource to the field holding its id, e.g. `{"empresas": "id_empresa"}`.
+    `fields` optionally lists the fields to request per resource (`?fields=`); the rest are not sent.
+    Requests carry a token signed with the shared `AUTH_SECRET`, so they pass `AUTH_REQUIRED`.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        id_fields: dict[str, str],
+        *,
+        service_name: str,
+        timeout: float = SERVICE_TIMEOUT,
+        max_connections: int = SERVICE_MAX_CONNECTIONS,
+        cache_ttl: float = SERVICE_CACHE_TTL,
+        cache_max_items: int = SERVICE_CACHE_MAX_ITEMS,
+        batch_size: int = IDS_MAX,
+        fields: dict[str, Iterable[str]] | None = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.id_fields = id_fields
+        self.service_name = service_name
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.batch_size = batch_size
+        self.fields = {resource: ",".join(names) for resource, names in (fields or {}).items()}
+        self.cache = LRUCacheBackend(cache_max_items, cache_ttl)
+        self.requests = 0
+        self.cache_hits = 0
+        self._http = None
+        self._loop = None
+        self._pending = {}
+        self._tasks = set()
+        self._token = None
+        self._token_expires = 0.0
+
+    def _client(self) -> httpx.AsyncClient:
+        # The pool and the pending lookups belong to one event loop; a new loop (e.g. in tests) starts afresh.
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._loop is not loop:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+            )
+            self._loop = loop
+            self._pending = {}
+        return self._http
+
+    def _headers(self) -> dict:
+        if self._token is None or self._token_expires - 60 < time.time():
+            self._token = create_token({"sub": f"service:{self.service_name}", "rol": "servicio"})
+            self._token_expires = time.time() + AUTH_TOKEN_TTL
+        return {"Authorization": f"Bearer {self._token}"}
+
+    async def get(self, resource: str, obj_id: int) -> dict | None:
+        """One row, or None when the other service does not know the id."""
+        cached = self.cache.get(f"{resource}:{obj_id}")
+        if cached is not None:
+            self.cache_hits += 1
+            return cached
+        self._client()
+        pending = self._pending.setdefault(resource, {})
+        future = pending.get(obj_id)
+        if future is None:
+            future = pending[obj_id] = self._loop.create_future()
+            if len(pending) == 1:
+                # Runs after the lookups already scheduled for this iteration, which join the same batch.
+                self._loop.call_soon(self._flush, resource)
+        return await future
+
+    async def get_many(self, resource: str, ids: Iterable[int]) -> dict[int, dict]:
+        """Rows by id; ids the other service does not know are left out."""
+        ids = list(dict.fromkeys(ids))
+        rows = await asyncio.gather(*(self.get(resource, obj_id) for obj_id in ids))
+        return {obj_id: row for obj_id, row in zip(ids, rows) if row is not None}
+
+    def _flush(self, resource: str):
+        batch = self._pending.pop(resource, None)
+        if batch:
+            task = self._loop.create_task(self._fetch(resource, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, resource: str, batch: dict):
+        id_field = self.id_fields[resource]
+        ids = list(batch)
+        try:
+            rows = {}
+            for start in range(0, len(ids), self.batch_size):
+                chunk = ids[start:start + self.batch_size]
+                self.requests += 1
+                params = {"ids": ",".join(map(str, chunk))}
+                if resource in self.fields:
+                    params["fields"] = self.fields[resource]
+                response = await self._client().get(f"/{resource}/", params=params, headers=self._headers())
+                response.raise_for_status()
+                rows.update((row[id_field], row) for row in response.json())
+        except (httpx.HTTPError, ValueError, KeyError) as exc:
+            error = ServiceUnavailable(f"{self.base_url}/{resource}/: {exc}")
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(error)
+            return
+        for obj_id, future in batch.items():
+            row = rows.get(obj_id)
+            if row is not None:
+                self.cache.set(f"{resource}:{obj_id}", row)
+            if not future.done():
+                future.set_result(row)
+
+    def stats(self) -> dict:
+        return {"requests": self.requests, "cache_hits": self.cache_hits, "cache_size": self.cache.size()}
+
+    async def aclose(self):
+        if self._http is not None and self._loop is asyncio.get_running_loop():
+            await self._http.aclose()
+        self._http = None
@@ -0,0 +1,148 @@
+"""
+Response compression middleware.
+
+Compresses JSON, CSV, NDJSON and text responses with brotli or gzip, whichever the request's
+`Accept-Encoding` prefers, when the body is at least `COMPRESSION_MIN_SIZE` bytes. Streamed responses
+(exports) are compressed chunk by chunk and flushed as they go.
+Dependencies: Starlette, brotli (optional; only gzip is offered without it).
+"""
+import os
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Fast settings: list pages are compressed on every request, not once ahead of time.
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def supported_encodings() -> tuple[str, ...]:
+    """Encodings offered, preferred first."""
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str | None) -> str | None:
+    """The supported encoding with the highest `q` in `Accept-Encoding`, or None to send the body as is."""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for coding in supported_encodings():
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+class _Encoder:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            self.compress, self.flush, self.finish = self._compressor.process, self._compressor.flush, self._compressor.finish
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+            self.compress = self._compressor.compress
+            self.flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self.finish = self._compressor.flush
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    encoder = _Encoder(encoding)
+    return encoder.compress(body) + encoder.finish()
+
+
+def _compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return "content-encoding" not in headers and content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware; it sits outside `ETagMiddleware` so the ETag is computed on the plain body.
+
+    A compressed response carries the weak form of that ETag (`W/"..."`), which conditional requests
+    still match. Bodies with a `Content-Length` below `minimum_size` are sent as they are.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        start_message = None
+        body_parts = []
+        encoder = None
+
+        async def send_compressed(message):
+            nonlocal start_message, encoder
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if message["status"] in (204, 304) or not _compressible(headers):
+                    await send(message)
+                    return
+                headers.add_vary_header("Accept-Encoding")
+                content_length = headers.get("content-length")
+                if encoding is None or (content_length is not None and int(content_length) < self.minimum_size):
+                    await send(message)
+                    return
+                start_message = message
+                if content_length is None:
+                    # Streamed: compress each chunk as it comes.
+                    encoder = _Encoder(encoding)
+                    self._mark_encoded(headers, encoding)
+                    await send(message)
+                return
+            if start_message is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is not None:
+                chunk = encoder.compress(body) + (encoder.flush() if more_body else encoder.finish())
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+                return
+            body_parts.append(body)
+            if more_body:
+                return
+            body = compress(b"".join(body_parts), encoding)
+            headers = MutableHeaders(scope=start_message)
+            self._mark_encoded(headers, encoding)
+            headers["Content-Length"] = str(len(body))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _mark_encoded(headers: MutableHeaders, encoding: str):
+        headers["Content-Encoding"] = encoding
+        if "content-length" in headers:
+            del headers["content-length"]
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = "W/" + etag
@@ -0,0 +1,172 @@
+"""
+Database engine factory.
+
+Builds the SQLAlchemy engines shared by every service: pool settings read from environment variables,
+connection checkout timing, statement instrumentation, and the sync to async URL translation.
+Pools are never shared across processes: a forked child drops the connections it inherited.
+Also provides the per-request session dependencies, the optional `create_all` startup hook and the
+shutdown hook that closes the pool.
+Dependencies: SQLAlchemy (asyncio extension for the async engine).
+"""
+import os
+import threading
+import time
+import weakref
+
+import sqlalchemy
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine as sqlalchemy_create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .metrics import instrument_engine, record_pool_wait
+
+
+# "none" leaves the schema to `alembic upgrade head`; "create_all" restores the old startup behaviour.
+SCHEMA_MODE = os.getenv("DB_SCHEMA_MODE", "none")
+
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+POOL_OPTIONS = {
+    "pool_size": POOL_SIZE,
+    "max_overflow": MAX_OVERFLOW,
+    "pool_timeout": POOL_TIMEOUT,
+    "pool_recycle": POOL_RECYCLE,
+    "pool_pre_ping": POOL_PRE_PING,
+}
+
+
+class _CheckoutTimingMixin:
+    """Records how long callers wait to check out a connection, including opening new ones."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._timing_lock = threading.Lock()
+        self.checkout_count = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - start
+            record_pool_wait(elapsed)
+            with self._timing_lock:
+                self.checkout_count += 1
+                self.checkout_wait_total += elapsed
+                self.checkout_wait_max = max(self.checkout_wait_max, elapsed)
+
+
+class TimedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(pool) -> dict:
+    """Snapshot of a connection pool's usage for the debug endpoint."""
+    status = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": MAX_OVERFLOW,
+    }
+    if isinstance(pool, _CheckoutTimingMixin):
+        status["checkouts"] = pool.checkout_count
+        status["wait_time_total_ms"] = round(pool.checkout_wait_total * 1000, 3)
+        status["wait_time_max_ms"] = round(pool.checkout_wait_max * 1000, 3)
+    return status
+
+
+_engines = weakref.WeakSet()
+
+
+def _drop_inherited_connections():
+    """
+    Runs in a forked child: replace every pool without closing the parent's connections.
+
+    The child opens its own connections on first use (the pattern documented by SQLAlchemy for multiprocessing).
+    """
+    for engine in list(_engines):
+        engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_drop_inherited_connections)
+
+
+def to_async_url(url: str) -> str:
+    """Translate a sync database URL to its async driver equivalent."""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    url = url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    # asyncpg takes `ssl` instead of libpq's `sslmode`.
+    return url.replace("sslmode=", "ssl=")
+
+
+def create_engine(url: str, **options):
+    """Instrumented engine with the timed pool; `options` override the environment pool settings."""
+    engine = sqlalchemy.create_engine(url, poolclass=TimedQueuePool, **{**POOL_OPTIONS, **options})
+    instrument_engine(engine)
+    _engines.add(engine)
+    return engine
+
+
+def create_async_engine(url: str, **options) -> AsyncEngine:
+    """Async counterpart of `create_engine`; `url` may be given in its sync form."""
+    engine = sqlalchemy_create_async_engine(to_async_url(url), poolclass=TimedAsyncAdaptedQueuePool, **{**POOL_OPTIONS, **options})
+    instrument_engine(engine.sync_engine)
+    _engines.add(engine.sync_engine)
+    return engine
+
+
+def session_dependency(session_factory):
+    """FastAPI dependency yielding one session per request."""
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    return get_db
+
+
+def async_session_dependency(session_factory):
+    async def get_async_db():
+        async with session_factory() as db:
+            yield db
+
+    return get_async_db
+
+
+def register_create_all(app, metadata, engine):
+    """Create missing tables when the application starts, only if `DB_SCHEMA_MODE=create_all`."""
+    if SCHEMA_MODE != "create_all":
+        return
+    if isinstance(engine, AsyncEngine):
+        async def create_all():
+            async with engine.begin() as conn:
+                await conn.run_sync(metadata.create_all)
+    else:
+        def create_all():
+            metadata.create_all(bind=engine)
+    app.router.add_event_handler("startup", create_all)
+
+
+def register_dispose(app, engine):
+    """Close the pooled connections once the server has drained its requests and shuts the application down."""
+    if isinstance(engine, AsyncEngine):
+        async def dispose():
+            await engine.dispose()
+    else:
+        def dispose():
+            engine.dispose()
+    app.router.add_event_handler("shutdown", dispose)
@@ -0,0 +1,72 @@
+"""
+Conditional request middleware.
+
+Adds an ETag computed from the response body to successful GET responses and answers matching
+`If-None-Match` requests with `304 Not Modified`, so clients skip re-downloading unchanged payloads.
+Dependencies: Starlette.
+"""
+import hashlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+
+def compute_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in if_none_match.split(","))
+    return etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+
+class ETagMiddleware:
+    """
+    Pure ASGI middleware so the body is only buffered when it is eligible for an ETag.
+
+    Only `200` GET responses with a `Content-Length` are hashed; streamed responses pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        start_message = None
+        body_parts = []
+
+        async def send_with_etag(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if message["status"] == 200 and "content-length" in headers and "etag" not in headers:
+                    start_message = message
+                    return
+                await send(message)
+                return
+            if start_message is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body_parts.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            body = b"".join(body_parts)
+            etag = compute_etag(body)
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["ETag"] = etag
+            if if_none_match and etag_matches(if_none_match, etag):
+                del headers["content-length"]
+                del headers["content-type"]
+                await send({**start_message, "status": 304})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_with_etag)
@@ -0,0 +1,125 @@
+"""
+Health probes.
+
+Liveness and readiness for orchestrators. Readiness checks the database with `SELECT 1` under a short
+timeout and caches the outcome for a few seconds, so frequent probes do not take pool slots, and fails
+while the connection pool is saturated so an overloaded worker is taken out of rotation (load shedding).
+Dependencies: SQLAlchemy, Starlette.
+"""
+import asyncio
+import os
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+from starlette.responses import JSONResponse
+
+from .database import pool_status
+
+
+HEALTH_CACHE_SECONDS = float(os.getenv("HEALTH_CACHE_SECONDS", "5"))
+HEALTH_DB_TIMEOUT = float(os.getenv("HEALTH_DB_TIMEOUT", "2"))
+# Share of `DB_POOL_SIZE + DB_MAX_OVERFLOW` checked out at which the worker reports itself not ready.
+READY_MAX_POOL_UTILIZATION = float(os.getenv("READY_MAX_POOL_UTILIZATION", "0.9"))
+
+NO_STORE = {"Cache-Control": "no-store"}
+
+
+def liveness_response() -> JSONResponse:
+    """The process is up and serving its event loop; no I/O."""
+    return JSONResponse({"status": "alive"}, headers=NO_STORE)
+
+
+class ReadinessProbe:
+    """Cached database probe and pool saturation check for one engine (sync or async)."""
+
+    def __init__(
+        self,
+        engine,
+        *,
+        cache_seconds: float = HEALTH_CACHE_SECONDS,
+        timeout: float = HEALTH_DB_TIMEOUT,
+        max_pool_utilization: float = READY_MAX_POOL_UTILIZATION,
+    ):
+        self.engine = engine
+        self.cache_seconds = cache_seconds
+        self.timeout = timeout
+        self.max_pool_utilization = max_pool_utilization
+        self._last = None
+        self._lock = None
+
+    @property
+    def pool(self):
+        engine = self.engine.sync_engine if isinstance(self.engine, AsyncEngine) else self.engine
+        return engine.pool
+
+    def _select_one(self):
+        with self.engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    async def _probe(self):
+        if isinstance(self.engine, AsyncEngine):
+            async with self.engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        else:
+            await asyncio.get_running_loop().run_in_executor(None, self._select_one)
+
+    def _cached(self) -> dict | None:
+        if self._last is not None and time.monotonic() - self._last[0] < self.cache_seconds:
+            return self._last[1]
+        return None
+
+    async def database(self) -> dict:
+        """Outcome of the last probe younger than `cache_seconds`, probing again (one caller at a time) otherwise."""
+        result = self._cached()
+        if result is not None:
+            return result
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            result = self._cached()
+            if result is not None:
+                return result
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(self._probe(), self.timeout)
+                result = {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 3)}
+            except asyncio.TimeoutError:
+                result = {"ok": False, "error": f"sin respuesta en {self.timeout} s"}
+            except Exception as exc:
+                result = {"ok": False, "error": type(exc).__name__}
+            self._last = (time.monotonic(), result)
+            return result
+
+    def pool_saturation(self) -> dict | None:
+        """Pool usage with its utilization; None for pools without a fixed capacity."""
+        pool = self.pool
+        if not isinstance(pool, QueuePool):
+            return None
+        status = pool_status(pool)
+        if status["max_overflow"] < 0:
+            return None
+        capacity = status["size"] + status["max_overflow"]
+        status["utilization"] = round(status["checked_out"] / capacity, 3) if capacity else 1.0
+        status["saturated"] = status["utilization"] >= self.max_pool_utilization
+        return status
+
+    async def check(self) -> tuple[bool, dict]:
+        checks = {}
+        pool = self.pool_saturation()
+        if pool is not None:
+            checks["pool"] = pool
+        if pool is not None and pool["saturated"]:
+            # Probing would wait for a pool slot; the saturation alone is the answer.
+            checks["database"] = self._cached() or {"ok": None}
+            return False, checks
+        checks["database"] = await self.database()
+        return checks["database"]["ok"] is True, checks
+
+    async def response(self) -> JSONResponse:
+        """200 when ready, 503 with the failed checks otherwise."""
+        ready, checks = await self.check()
+        body = {"status": "ready" if ready else "unavailable", "checks": checks}
+        headers = NO_STORE if ready else {**NO_STORE, "Retry-After": str(max(int(self.cache_seconds), 1))}
+        return JSONResponse(body, status_code=200 if ready else 503, headers=headers)
@@ -0,0 +1,211 @@
+"""
+Request instrumentation.
+
+Records per-route latency, database statement count and time, connection pool wait and response size,
+exposes them in the Prometheus text format for `/metrics`, and reports each request's breakdown in a
+`Server-Timing` header. Statements slower than `SLOW_QUERY_MS` are logged.
+Dependencies: Starlette, SQLAlchemy.
+"""
+import bisect
+import contextvars
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "pool_wait")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.pool_wait = 0.0
+
+    def server_timing(self, elapsed: float) -> str:
+        return (
+            f"app;dur={elapsed * 1000:.2f}, "
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries", '
+            f"pool;dur={self.pool_wait * 1000:.2f}"
+        )
+
+
+_request_stats: contextvars.ContextVar[RequestStats | None] = contextvars.ContextVar("request_stats", default=None)
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labels: tuple, buckets: tuple):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_values: tuple, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(values, list(counts), total) for values, (counts, total) in self._series.items()]
+        for values, counts, total in sorted(snapshot):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, values)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, values)} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self):
+        with self._lock:
+            self.value += 1
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter", f"{self.name} {self.value}"]
+
+
+class Gauge:
+    """A value read when the metrics are rendered, e.g. `Gauge("queue_size", "...", lambda: len(queue))`."""
+
+    def __init__(self, name: str, documentation: str, read):
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge", f"{self.name} {self.read()}"]
+
+
+REQUEST_LABELS = ("method", "route")
+
+REQUEST_DURATION = Histogram("http_request_duration_seconds", "Time to serve a request.", REQUEST_LABELS + ("status",), LATENCY_BUCKETS)
+RESPONSE_SIZE = Histogram("http_response_size_bytes", "Response body size.", REQUEST_LABELS, SIZE_BUCKETS)
+REQUEST_QUERIES = Histogram("http_request_db_queries", "Database statements executed per request.", REQUEST_LABELS, QUERY_BUCKETS)
+REQUEST_DB_TIME = Histogram("http_request_db_duration_seconds", "Time spent executing database statements per request.", REQUEST_LABELS, LATENCY_BUCKETS)
+REQUEST_POOL_WAIT = Histogram("http_request_pool_wait_seconds", "Time spent waiting for a pooled connection per request.", REQUEST_LABELS, LATENCY_BUCKETS)
+SLOW_QUERIES = Counter("db_slow_queries_total", "Statements slower than SLOW_QUERY_MS.")
+
+METRICS = [REQUEST_DURATION, RESPONSE_SIZE, REQUEST_QUERIES, REQUEST_DB_TIME, REQUEST_POOL_WAIT, SLOW_QUERIES]
+
+
+def register(*metrics):
+    """Add service-specific metrics to `/metrics`."""
+    METRICS.extend(metrics)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+
+def record_pool_wait(elapsed: float):
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.pool_wait += elapsed
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_start"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop("query_start", time.perf_counter())
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += elapsed
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        SLOW_QUERIES.inc()
+        # Parameters are left out on purpose: they may carry credentials.
+        logger.warning("slow query (%.1f ms): %s", elapsed * 1000, statement)
+
+
+def instrument_engine(engine):
+    """Count and time every statement run by `engine` (pass `async_engine.sync_engine` for async engines)."""
+    if not METRICS_ENABLED:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware that times each request and attributes database work to its route.
+
+    Routes are labelled by their path template, so ids do not create new series; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+        size = 0
+
+        async def send_with_timing(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing(time.perf_counter() - start))
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            elapsed = time.perf_counter() - start
+            route = scope.get("route")
+            labels = (scope["method"], getattr(route, "path", "unmatched"))
+            REQUEST_DURATION.observe(labels + (str(status_code),), elapsed)
+            RESPONSE_SIZE.observe(labels, size)
+            REQUEST_QUERIES.observe(labels, stats.queries)
+            REQUEST_DB_TIME.observe(labels, stats.db_time)
+            REQUEST_POOL_WAIT.observe(labels, stats.pool_wait)
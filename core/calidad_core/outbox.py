@@ -0,0 +1,200 @@
+"""
+Transactional outbox and change feed.
+
+Records row changes in an outbox table in the same transaction as the write (through the repositories'
+`publish` hook) and reads them back in id order; the id is the feed offset consumers resume from. On
+PostgreSQL every recorded batch also sends a `NOTIFY` on `OUTBOX_CHANNEL`, delivered on commit, which
+`ChangeListener` turns into wake-ups for the long polls of the feed endpoint in every worker; other
+databases are polled every `OUTBOX_POLL_INTERVAL` seconds. Consumers advance their offset past every id they
+read, so ids must become visible in order: on PostgreSQL recording takes a transaction-level advisory lock
+before the insert, so concurrent writers draw ids and commit in the same order; SQLite serializes writers.
+Dependencies: SQLAlchemy, FastAPI (JSON encoding), psycopg2 (LISTEN on PostgreSQL).
+"""
+import asyncio
+import logging
+import os
+import time
+import zlib
+from collections.abc import Iterable
+from datetime import datetime, timezone
+
+import anyio
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session, aliased
+
+
+OUTBOX_CHANNEL = os.getenv("OUTBOX_CHANNEL", "cambios")
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "1"))
+# Seconds between attempts to reopen a lost LISTEN connection; long polls fall back to polling meanwhile.
+LISTEN_RETRY_SECONDS = 5.0
+OUTBOX_HEAD_HEADER = "X-Outbox-Head"
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+logger = logging.getLogger(__name__)
+
+
+class Outbox:
+    """
+    Change log kept in `model`'s table.
+
+    The table has an autoincrement `id`, `recurso`, `operacion` (`upsert` or `delete`), `id_objeto`, the row
+    as JSON in `datos` and the `creado` timestamp.
+    """
+
+    def __init__(self, model, channel: str = OUTBOX_CHANNEL):
+        self.model = model
+        self.table = model.__table__
+        self.channel = channel
+        self.lock_key = zlib.crc32(f"outbox:{self.table.name}".encode())
+
+    def publisher(self, recurso: str, id_field: str, exclude: Iterable[str] = ()):
+        """`Repository(publish=...)` hook recording the rows of `recurso` without the `exclude` fields."""
+        exclude = frozenset(exclude)
+
+        def publish(db: Session, operation: str, rows: list[dict]):
+            self.record(db, recurso, operation, [{key: value for key, value in row.items() if key not in exclude} for row in rows], id_field)
+
+        return publish
+
+    def record(self, db: Session, recurso: str, operation: str, rows: list[dict], id_field: str):
+        """Append one change per row; the caller commits, which also delivers the notification."""
+        postgresql = db.get_bind().dialect.name == "postgresql"
+        if postgresql:
+            # Held until commit: a later id cannot become visible before an earlier one.
+            db.execute(select(func.pg_advisory_xact_lock(self.lock_key)))
+        creado = datetime.now(timezone.utc)
+        db.execute(self.table.insert(), [
+            {"recurso": recurso, "operacion": operation, "id_objeto": row[id_field], "datos": jsonable_encoder(row), "creado": creado}
+            for row in rows
+        ])
+        if postgresql:
+            db.execute(select(func.pg_notify(self.channel, recurso)))
+
+    def changes(self, db: Session, after: int, limit: int) -> list[dict]:
+        query = select(self.table).where(self.table.c.id > after).order_by(self.table.c.id).limit(limit)
+        return [dict(row) for row in db.execute(query).mappings()]
+
+    def head(self, db: Session) -> int:
+        """Offset of the latest change, 0 when the log is empty."""
+        return db.scalar(select(func.coalesce(func.max(self.table.c.id), 0)))
+
+    def compact(self, db: Session) -> int:
+        """
+        Delete every change superseded by a later one for the same row; returns how many.
+
+        Replaying the compacted log from any offset still ends in the same state, so it is safe while
+        consumers are following it. Deletes are kept as tombstones.
+        """
+        later = aliased(self.table)
+        superseded = (
+            select(later.c.id)
+            .where(later.c.recurso == self.table.c.recurso, later.c.id_objeto == self.table.c.id_objeto, later.c.id > self.table.c.id)
+            .exists()
+        )
+        result = db.execute(delete(self.table).where(superseded))
+        db.commit()
+        return result.rowcount
+
+
+class ChangeListener:
+    """
+    Wakes the feed's long polls when the outbox changes.
+
+    On PostgreSQL it keeps one psycopg2 connection per worker in `LISTEN` mode, read from the event loop;
+    each notification sets the current event and starts a new one. Elsewhere, waits last one poll interval.
+    """
+
+    def __init__(self, engine, channel: str = OUTBOX_CHANNEL):
+        self.engine = engine
+        self.channel = channel
+        self._connection = None
+        self._event = None
+        self._loop = None
+        self._retry_at = 0.0
+
+    @property
+    def listening(self) -> bool:
+        return self._connection is not None
+
+    async def start(self):
+        if self.engine.dialect.name != "postgresql":
+            return
+        self._loop = asyncio.get_running_loop()
+        self._event = asyncio.Event()
+        try:
+            self._connection = await anyio.to_thread.run_sync(self._listen)
+        except Exception:
+            logger.exception("LISTEN %s failed; polling the outbox", self.channel)
+            self._retry_at = time.monotonic() + LISTEN_RETRY_SECONDS
+            return
+        self._loop.add_reader(self._connection.driver_connection.fileno(), self._on_readable)
+
+    def _listen(self):
+        connection = self.engine.raw_connection()
+        dbapi_connection = connection.driver_connection
+        dbapi_connection.autocommit = True
+        with dbapi_connection.cursor() as cursor:
+            cursor.execute(f'LISTEN "{self.channel}"')
+        return connection
+
+    def _on_readable(self):
+        dbapi_connection = self._connection.driver_connection
+        try:
+            dbapi_connection.poll()
+        except Exception:
+            logger.exception("LISTEN connection lost; polling the outbox")
+            self._close()
+            self._retry_at = time.monotonic() + LISTEN_RETRY_SECONDS
+            self._wake()
+            return
+        if dbapi_connection.notifies:
+            dbapi_connection.notifies.clear()
+            self._wake()
+
+    def _wake(self):
+        event, self._event = self._event, asyncio.Event()
+        event.set()
+
+    def current(self) -> asyncio.Event | None:
+        """The event the next change sets; take it before reading the outbox so no change slips in between."""
+        return self._event if self.listening else None
+
+    async def wait(self, event: asyncio.Event | None, timeout: float):
+        if event is None:
+            if self._loop is not None and not self.listening and time.monotonic() >= self._retry_at:
+                await self.start()
+            await asyncio.sleep(min(timeout, OUTBOX_POLL_INTERVAL))
+            return
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def poll(self, read, wait: float):
+        """Long poll: run `read()` (sync, in a thread) until it returns `(changes, head)` with changes or `wait` seconds pass."""
+        deadline = time.monotonic() + wait
+        while True:
+            event = self.current()
+            changes, head = await anyio.to_thread.run_sync(read)
+            remaining = deadline - time.monotonic()
+            if changes or remaining <= 0:
+                return changes, head
+            await self.wait(event, remaining)
+
+    def _close(self):
+        if self._connection is None:
+            return
+        try:
+            self._loop.remove_reader(self._connection.driver_connection.fileno())
+            self._connection.invalidate()
+        except Exception:
+            pass
+        self._connection = None
+
+    async def stop(self):
+        self._close()
+        if self._event is not None:
+            self._event.set()
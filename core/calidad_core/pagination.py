@@ -0,0 +1,76 @@
+"""
+Cursor pagination helpers.
+
+Encodes and decodes the opaque cursors used by the list endpoints for keyset pagination on the primary key,
+and parses the `?ids=` parameter of batch lookups and the `?fields=` parameter of sparse fieldsets.
+Dependencies: FastAPI.
+"""
+import base64
+import binascii
+from collections.abc import Mapping
+
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+IDS_MAX = 1000
+
+
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str | None) -> int | None:
+    if cursor is None:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def set_next_cursor(response: Response, items: list, id_attr: str, limit: int) -> None:
+    """
+    Add the cursor of the next page to the response headers.
+
+    The header is only sent when the page is full, so its absence marks the last page.
+    `items` may hold objects or row dicts.
+    """
+    if limit > 0 and len(items) == limit:
+        last = items[-1]
+        last_id = last[id_attr] if isinstance(last, Mapping) else getattr(last, id_attr)
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last_id)
+
+
+def ids_query(ids: str | None = Query(None, description="Ids separados por comas; devuelve esas filas en lugar de una página.")) -> list[int] | None:
+    """Dependency parsing `?ids=1,2,3` into distinct ids, in request order."""
+    if ids is None:
+        return None
+    try:
+        values = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids inválidos")
+    if len(values) > IDS_MAX:
+        raise HTTPException(status_code=413, detail=f"Máximo {IDS_MAX} ids por consulta")
+    return list(dict.fromkeys(values))
+
+
+def fields_query(schema: type[BaseModel]):
+    """
+    Dependency factory parsing `?fields=a,b` into field names of `schema`, in schema order.
+
+    Without the parameter the dependency returns None (every field); unknown names are a `400`.
+    """
+    names = list(schema.__fields__)
+
+    def dependency(fields: str | None = Query(None, description=f"Campos separados por comas; el id siempre se incluye. Disponibles: {', '.join(names)}.")) -> list[str] | None:
+        if fields is None:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = requested.difference(names)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Campos desconocidos: {', '.join(sorted(unknown))}")
+        return [name for name in names if name in requested]
+
+    return dependency
@@ -0,0 +1,71 @@
+"""
+Password hashing module.
+
+Hashes credentials with PBKDF2-SHA256 and a tunable work factor, and runs the hashing in a bounded
+worker pool so login spikes neither block the event loop nor exhaust the shared threadpool.
+Dependencies: standard library.
+"""
+import asyncio
+import base64
+import contextvars
+import functools
+import hashlib
+import hmac
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+
+
+ALGORITHM = "pbkdf2_sha256"
+PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", "600000"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode().rstrip("=")
+
+
+def _pbkdf2(password: str, salt: str, iterations: int) -> str:
+    return _b64encode(hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), iterations))
+
+
+def hash_password(password: str) -> str:
+    """Return the password as `pbkdf2_sha256$<iterations>$<salt>$<hash>`."""
+    salt = secrets.token_urlsafe(16)
+    return f"{ALGORITHM}${PASSWORD_HASH_ITERATIONS}${salt}${_pbkdf2(password, salt, PASSWORD_HASH_ITERATIONS)}"
+
+
+def is_hashed(stored: str) -> bool:
+    return stored.startswith(f"{ALGORITHM}$")
+
+
+def verify_password(password: str, stored: str) -> bool:
+    """
+    Check a password against its stored value.
+
+    Values stored before hashing was introduced are plaintext and compared in constant time, so they
+    keep working until the next successful login rehashes them.
+    """
+    if not is_hashed(stored):
+        return hmac.compare_digest(password.encode(), stored.encode())
+    _, iterations, salt, expected = stored.split("$", 3)
+    return hmac.compare_digest(_pbkdf2(password, salt, int(iterations)), expected)
+
+
+def needs_rehash(stored: str) -> bool:
+    return not is_hashed(stored) or int(stored.split("$", 2)[1]) != PASSWORD_HASH_ITERATIONS
+
+
+@functools.lru_cache(maxsize=1)
+def dummy_hash() -> str:
+    """Hash verified against when the email is unknown, so both failure paths cost the same."""
+    return hash_password(secrets.token_urlsafe(16))
+
+
+async def run_in_hash_pool(func, *args):
+    """Run `func(*args)` in the bounded hashing pool, keeping the caller's context variables."""
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(hash_executor, functools.partial(context.run, func, *args))
@@ -0,0 +1,384 @@
+"""
+Generic repositories.
+
+Implements the CRUD shape every service repeats once per model: cached reads, offset or keyset
+pagination on the primary key, single-statement `UPDATE ... RETURNING` / `DELETE ... RETURNING` writes,
+partial updates and validated bulk operations, for sync (`Repository`) and async (`AsyncRepository`) sessions.
+Dependencies: SQLAlchemy, Pydantic.
+"""
+from collections.abc import Callable
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .cache import ReadThroughCache
+
+
+ModelT = TypeVar("ModelT")
+
+
+def format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors())
+
+
+def validate_items(schema: type[BaseModel], items: list[dict]):
+    """Validate raw bulk items one by one, splitting them into valid objects and per-item errors."""
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.parse_obj(item)))
+        except ValidationError as exc:
+            errors.append({"index": index, "detail": format_validation_error(exc)})
+    return valid, errors
+
+
+class _RepositoryBase(Generic[ModelT]):
+    def __init__(
+        self,
+        model: type[ModelT],
+        *,
+        not_found: str = "Registro no encontrado",
+        cache: ReadThroughCache | None = None,
+        cache_schema: type[BaseModel] | None = None,
+        cache_namespace: str | None = None,
+        prepare: Callable[[Session, list[dict]], list[dict]] | None = None,
+        publish: Callable[[Session, str, list[dict]], None] | None = None,
+    ):
+        """
+        `not_found` is the per-item error of bulk updates and deletes.
+        With `cache`, `get` serves rows as `cache_schema` instances under `"<cache_namespace>:<id>"` keys.
+        `prepare(db, rows)` turns validated input into column values before every create and update, single
+        or bulk, in the same transaction (e.g. to move a payload to a side table); async repositories run it
+        through `AsyncSession.run_sync`.
+        `publish(db, operation, rows)` receives the rows written (`"upsert"`) or deleted (`"delete"`) by every
+        write, single or bulk, before it commits, so it can record them in the same transaction (an outbox).
+        """
+        self.model = model
+        self.table = model.__table__
+        (self.pk,) = self.table.primary_key.columns
+        self.id_column = getattr(model, self.pk.key)
+        self.not_found = not_found
+        self.cache = cache
+        self.cache_schema = cache_schema
+        self.cache_namespace = cache_namespace
+        self.prepare = prepare
+        self.publish = publish
+
+    def _options(self) -> dict:
+        return {
+            "not_found": self.not_found,
+            "cache": self.cache,
+            "cache_schema": self.cache_schema,
+            "cache_namespace": self.cache_namespace,
+            "prepare": self.prepare,
+            "publish": self.publish,
+        }
+
+    def cache_key(self, obj_id) -> str:
+        return f"{self.cache_namespace}:{obj_id}"
+
+    def invalidate(self, obj_id):
+        if self.cache is not None:
+            self.cache.invalidate(self.cache_key(obj_id))
+
+    def _from_cache(self, data: dict | None):
+        return self.cache_schema(**data) if data is not None else None
+
+    def _row_data(self, db_obj) -> dict | None:
+        if db_obj is None:
+            return None
+        return {column.key: getattr(db_obj, column.key) for column in self.table.columns}
+
+    def patch_values(self, patch: BaseModel) -> dict:
+        """Fields set in a partial update; nulls sent for non-nullable columns are ignored."""
+        columns = self.table.c
+        return {
+            key: value
+            for key, value in patch.dict(exclude_unset=True).items()
+            # Fields that are not columns are left to `prepare`.
+            if value is not None or key not in columns or columns[key].nullable
+        }
+
+    def _list_query(self, skip: int, limit: int, after_id: int | None, conditions):
+        """
+        Offset or keyset pagination on the primary key.
+
+        When `after_id` is given the page starts right after that id and `skip` is ignored.
+        """
+        query = select(self.model).where(*conditions).order_by(self.id_column)
+        if after_id is not None:
+            query = query.where(self.id_column > after_id)
+        else:
+            query = query.offset(skip)
+        return query.limit(limit)
+
+    def _rows_query(self, skip: int, limit: int, after_id: int | None, conditions, schema: type[BaseModel] | None, fields: list[str] | None = None):
+        """
+        `_list_query` selecting only the columns of `schema` (all of them by default), as plain rows.
+
+        `fields` narrows them further (see `pagination.fields_query`); the primary key is always selected.
+        """
+        if fields is not None:
+            names = [self.pk.key, *(name for name in fields if name != self.pk.key)]
+        else:
+            names = list(schema.__fields__) if schema is not None else None
+        columns = [self.table.c[name] for name in names] if names is not None else list(self.table.c)
+        return self._list_query(skip, limit, after_id, conditions).with_only_columns(*columns)
+
+    def _select_row(self, obj_id):
+        return select(self.table).where(self.pk == obj_id)
+
+    def _update_row(self, obj_id, values: dict):
+        return update(self.table).where(self.pk == obj_id).values(values).returning(*self.table.c)
+
+    def _obj_row(self, db_obj) -> dict:
+        return {column.key: getattr(db_obj, column.key) for column in self.table.c}
+
+    def _delete_row(self, obj_id):
+        return delete(self.table).where(self.pk == obj_id).returning(*self.table.c)
+
+    def _bulk_insert(self, rows: list[dict]):
+        return insert(self.table).values(rows).returning(*self.table.c)
+
+    def _existing_rows(self, valid: list, existing: set, errors: list) -> list[dict]:
+        pk = self.pk.key
+        rows = []
+        for index, obj in valid:
+            if getattr(obj, pk) in existing:
+                rows.append(obj.dict())
+            else:
+                errors.append({"index": index, "detail": self.not_found})
+        return rows
+
+    @staticmethod
+    def _bulk_update_params(rows: list[dict]) -> list[dict]:
+        return [{f"b_{key}": value for key, value in row.items()} for row in rows]
+
+    def _bulk_update_statement(self, params: list[dict]):
+        pk = self.pk.key
+        columns = [key[2:] for key in params[0] if key != f"b_{pk}"]
+        return (
+            update(self.table)
+            .where(self.pk == bindparam(f"b_{pk}"))
+            .values({key: bindparam(f"b_{key}") for key in columns})
+        )
+
+    def _delete_errors(self, ids: list, deleted: list[dict]) -> list[dict]:
+        found = {row[self.pk.key] for row in deleted}
+        return [{"index": index, "detail": self.not_found} for index, obj_id in enumerate(ids) if obj_id not in found]
+
+
+class Repository(_RepositoryBase[ModelT]):
+    """CRUD operations on one model through a sync `Session`."""
+
+    def as_async(self) -> "AsyncRepository[ModelT]":
+        """An `AsyncRepository` for the same model, messages and cache."""
+        return AsyncRepository(self.model, **self._options())
+
+    def get(self, db: Session, obj_id) -> ModelT | None:
+        if self.cache is not None:
+            data = self.cache.get_or_load(self.cache_key(obj_id), lambda: self._row_data(db.get(self.model, obj_id)))
+            return self._from_cache(data)
+        return db.get(self.model, obj_id)
+
+    def paginate(self, db: Session, skip: int = 0, limit: int = 100, after_id: int | None = None, conditions=()) -> list[ModelT]:
+        return db.scalars(self._list_query(skip, limit, after_id, conditions)).all()
+
+    def paginate_rows(self, db: Session, skip: int = 0, limit: int = 100, after_id: int | None = None, conditions=(), schema: type[BaseModel] | None = None, fields: list[str] | None = None) -> list[dict]:
+        """
+        `paginate` as dicts of the `schema` columns, or of the primary key and `fields`, without loading ORM objects.
+
+        The rows are trusted database output, ready to be serialized without another validation pass.
+        """
+        return [dict(row) for row in db.execute(self._rows_query(skip, limit, after_id, conditions, schema, fields)).mappings()]
+
+    def rows_by_ids(self, db: Session, ids: list, schema: type[BaseModel] | None = None, fields: list[str] | None = None) -> list[dict]:
+        """The rows of `ids` that exist, ordered by id, with a single `IN` query."""
+        return self.paginate_rows(db, limit=len(ids), conditions=[self.pk.in_(ids)], schema=schema, fields=fields)
+
+    def _prepared(self, db: Session, rows: list[dict]) -> list[dict]:
+        return self.prepare(db, rows) if self.prepare is not None else rows
+
+    def _published(self, db: Session, operation: str, rows: list[dict]):
+        if self.publish is not None and rows:
+            self.publish(db, operation, rows)
+
+    def create(self, db: Session, values: dict) -> ModelT:
+        (values,) = self._prepared(db, [values])
+        db_obj = self.model(**values)
+        db.add(db_obj)
+        if self.publish is not None:
+            db.flush()
+            self._published(db, "upsert", [self._obj_row(db_obj)])
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def update(self, db: Session, obj_id, values: dict):
+        """Apply `values` with a single UPDATE ... RETURNING; returns None when the id does not exist."""
+        if not values:
+            return db.execute(self._select_row(obj_id)).first()
+        (values,) = self._prepared(db, [values])
+        row = db.execute(self._update_row(obj_id, values)).first()
+        if row is not None:
+            self._published(db, "upsert", [dict(row._mapping)])
+        db.commit()
+        if row is not None:
+            self.invalidate(obj_id)
+        return row
+
+    def delete(self, db: Session, obj_id):
+        """Delete with a single DELETE ... RETURNING; returns None when the id does not exist."""
+        row = db.execute(self._delete_row(obj_id)).first()
+        if row is not None:
+            self._published(db, "delete", [dict(row._mapping)])
+        db.commit()
+        if row is not None:
+            self.invalidate(obj_id)
+        return row
+
+    def create_many(self, db: Session, schema: type[BaseModel], items: list[dict]) -> dict:
+        """Insert every valid item with a single multi-row INSERT ... RETURNING."""
+        valid, errors = validate_items(schema, items)
+        created = []
+        if valid:
+            rows = self._prepared(db, [obj.dict() for _, obj in valid])
+            created = [dict(row._mapping) for row in db.execute(self._bulk_insert(rows))]
+            self._published(db, "upsert", created)
+            db.commit()
+        return {"items": created, "errors": errors}
+
+    def update_many(self, db: Session, schema: type[BaseModel], items: list[dict]) -> dict:
+        """Update every valid, existing item in one transaction with a single executemany UPDATE."""
+        valid, errors = validate_items(schema, items)
+        updated = []
+        if valid:
+            ids = [getattr(obj, self.pk.key) for _, obj in valid]
+            existing = set(db.scalars(select(self.pk).where(self.pk.in_(ids))))
+            rows = self._existing_rows(valid, existing, errors)
+            if rows:
+                params = self._bulk_update_params(self._prepared(db, rows))
+                db.execute(self._bulk_update_statement(params), params)
+                updated_ids = [param[f"b_{self.pk.key}"] for param in params]
+                rows = db.execute(select(self.table).where(self.pk.in_(updated_ids)).order_by(self.pk))
+                updated = [dict(row._mapping) for row in rows]
+                self._published(db, "upsert", updated)
+                db.commit()
+                for obj_id in updated_ids:
+                    self.invalidate(obj_id)
+        errors.sort(key=lambda error: error["index"])
+        return {"items": updated, "errors": errors}
+
+    def delete_many(self, db: Session, ids: list) -> dict:
+        """Delete every listed id with a single DELETE ... RETURNING."""
+        rows = db.execute(delete(self.table).where(self.pk.in_(ids)).returning(*self.table.c))
+        deleted = [dict(row._mapping) for row in rows]
+        self._published(db, "delete", deleted)
+        db.commit()
+        for row in deleted:
+            self.invalidate(row[self.pk.key])
+        return {"items": deleted, "errors": self._delete_errors(ids, deleted)}
+
+
+class AsyncRepository(_RepositoryBase[ModelT]):
+    """`Repository` on top of an `AsyncSession`."""
+
+    async def get(self, db: AsyncSession, obj_id) -> ModelT | None:
+        if self.cache is not None:
+            async def load():
+                return self._row_data(await db.get(self.model, obj_id))
+
+            return self._from_cache(await self.cache.get_or_load_async(self.cache_key(obj_id), load))
+        return await db.get(self.model, obj_id)
+
+    async def paginate(self, db: AsyncSession, skip: int = 0, limit: int = 100, after_id: int | None = None, conditions=()) -> list[ModelT]:
+        result = await db.scalars(self._list_query(skip, limit, after_id, conditions))
+        return result.all()
+
+    async def paginate_rows(self, db: AsyncSession, skip: int = 0, limit: int = 100, after_id: int | None = None, conditions=(), schema: type[BaseModel] | None = None, fields: list[str] | None = None) -> list[dict]:
+        result = await db.execute(self._rows_query(skip, limit, after_id, conditions, schema, fields))
+        return [dict(row) for row in result.mappings()]
+
+    async def rows_by_ids(self, db: AsyncSession, ids: list, schema: type[BaseModel] | None = None, fields: list[str] | None = None) -> list[dict]:
+        return await self.paginate_rows(db, limit=len(ids), conditions=[self.pk.in_(ids)], schema=schema, fields=fields)
+
+    async def _prepared(self, db: AsyncSession, rows: list[dict]) -> list[dict]:
+        return await db.run_sync(self.prepare, rows) if self.prepare is not None else rows
+
+    async def _published(self, db: AsyncSession, operation: str, rows: list[dict]):
+        if self.publish is not None and rows:
+            await db.run_sync(self.publish, operation, rows)
+
+    async def create(self, db: AsyncSession, values: dict) -> ModelT:
+        (values,) = await self._prepared(db, [values])
+        db_obj = self.model(**values)
+        db.add(db_obj)
+        if self.publish is not None:
+            await db.flush()
+            await self._published(db, "upsert", [self._obj_row(db_obj)])
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update(self, db: AsyncSession, obj_id, values: dict):
+        if not values:
+            return (await db.execute(self._select_row(obj_id))).first()
+        (values,) = await self._prepared(db, [values])
+        row = (await db.execute(self._update_row(obj_id, values))).first()
+        if row is not None:
+            await self._published(db, "upsert", [dict(row._mapping)])
+        await db.commit()
+        if row is not None:
+            self.invalidate(obj_id)
+        return row
+
+    async def delete(self, db: AsyncSession, obj_id):
+        row = (await db.execute(self._delete_row(obj_id))).first()
+        if row is not None:
+            await self._published(db, "delete", [dict(row._mapping)])
+        await db.commit()
+        if row is not None:
+            self.invalidate(obj_id)
+        return row
+
+    async def create_many(self, db: AsyncSession, schema: type[BaseModel], items: list[dict]) -> dict:
+        valid, errors = validate_items(schema, items)
+        created = []
+        if valid:
+            rows = await self._prepared(db, [obj.dict() for _, obj in valid])
+            created = [dict(row._mapping) for row in await db.execute(self._bulk_insert(rows))]
+            await self._published(db, "upsert", created)
+            await db.commit()
+        return {"items": created, "errors": errors}
+
+    async def update_many(self, db: AsyncSession, schema: type[BaseModel], items: list[dict]) -> dict:
+        valid, errors = validate_items(schema, items)
+        updated = []
+        if valid:
+            ids = [getattr(obj, self.pk.key) for _, obj in valid]
+            existing = set(await db.scalars(select(self.pk).where(self.pk.in_(ids))))
+            rows = self._existing_rows(valid, existing, errors)
+            if rows:
+                params = self._bulk_update_params(await self._prepared(db, rows))
+                await db.execute(self._bulk_update_statement(params), params)
+                updated_ids = [param[f"b_{self.pk.key}"] for param in params]
+                rows = await db.execute(select(self.table).where(self.pk.in_(updated_ids)).order_by(self.pk))
+                updated = [dict(row._mapping) for row in rows]
+                await self._published(db, "upsert", updated)
+                await db.commit()
+                for obj_id in updated_ids:
+                    self.invalidate(obj_id)
+        errors.sort(key=lambda error: error["index"])
+        return {"items": updated, "errors": errors}
+
+    async def delete_many(self, db: AsyncSession, ids: list) -> dict:
+        rows = await db.execute(delete(self.table).where(self.pk.in_(ids)).returning(*self.table.c))
+        deleted = [dict(row._mapping) for row in rows]
+        await self._published(db, "delete", deleted)
+        await db.commit()
+        for row in deleted:
+            self.invalidate(row[self.pk.key])
+        return {"items": deleted, "errors": self._delete_errors(ids, deleted)}
@@ -0,0 +1,44 @@
+"""
+Fast JSON responses.
+
+Response class rendering with orjson when it is installed, used to serialize database rows directly
+without building ORM objects or validating trusted output a second time.
+Dependencies: Starlette, orjson (optional; falls back to the standard library).
+"""
+import json
+from datetime import date, datetime, time
+from typing import Any
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON, byte-identical between the orjson and the standard library paths."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    `JSONResponse` rendered with orjson.
+
+    List endpoints return it directly with the rows of `Repository.paginate_rows`, which skips the
+    `response_model` pass; the model stays on the route for the OpenAPI schema. It is not set as the
+    application's default class: FastAPI only dumps validated models straight to JSON with the default one.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
@@ -0,0 +1,66 @@
+"""
+Production server.
+
+Runs a service under uvicorn with the multi-process profile used by the `Procfile`s: one worker process per
+CPU (or `WEB_CONCURRENCY`), uvloop and httptools when they are installed, keep-alive and listen backlog tuning,
+and a graceful drain of in-flight requests on SIGTERM. Workers are spawned and import the application
+themselves, so every worker builds its own engines and connection pools. With more than one worker and no
+`CACHE_URL` the read-through cache is turned off, because an in-process cache would keep serving rows that
+another worker has changed.
+Usage, from a service directory: `python -m calidad_core.server`.
+Dependencies: uvicorn (`uvicorn[standard]` for uvloop and httptools).
+"""
+import logging
+import os
+
+import uvicorn
+
+
+APP_MODULE = os.getenv("APP_MODULE", "app.main:app")
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+# 0 means one worker per CPU available to this process.
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "0"))
+KEEPALIVE_TIMEOUT = int(os.getenv("KEEPALIVE_TIMEOUT", "5"))
+BACKLOG = int(os.getenv("BACKLOG", "2048"))
+# Seconds a worker waits for in-flight requests after SIGTERM before closing them.
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
+
+logger = logging.getLogger(__name__)
+
+
+def worker_count() -> int:
+    if WEB_CONCURRENCY > 0:
+        return WEB_CONCURRENCY
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not available on every platform
+        return os.cpu_count() or 1
+
+
+def main():
+    workers = worker_count()
+    if workers > 1 and not os.getenv("CACHE_URL"):
+        # Read by `calidad_core.cache` in every worker, which inherits this environment.
+        os.environ["CACHE_ENABLED"] = "false"
+        logger.warning("%s workers without CACHE_URL: the in-process cache is disabled", workers)
+    uvicorn.run(
+        APP_MODULE,
+        host=HOST,
+        port=PORT,
+        workers=workers,
+        # "auto" picks uvloop and httptools when installed and falls back to asyncio and h11.
+        loop="auto",
+        http="auto",
+        backlog=BACKLOG,
+        timeout_keep_alive=KEEPALIVE_TIMEOUT,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+        proxy_headers=True,
+        forwarded_allow_ips=os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1"),
+        log_level=LOG_LEVEL,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""
+Test configuration.
+
+Puts the core directory on the import path, so the suite runs with `python -m pytest` from `core/`
+without installing the package, and signs tokens with a fixed secret.
+"""
+import os
+import sys
+from pathlib import Path
+
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("AUTH_SECRET", "test-secret")
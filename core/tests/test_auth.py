@@ -0,0 +1,85 @@
+"""Token issuing and verification and the route dependencies."""
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from calidad_core import auth
+
+
+def bearer(claims: dict) -> dict:
+    return {"Authorization": f"Bearer {auth.create_token(claims)}"}
+
+
+def test_token_round_trip():
+    claims = auth.verify_token(auth.create_token({"sub": "7", "rol": "admin"}))
+    assert claims["sub"] == "7"
+    assert claims["rol"] == "admin"
+    assert claims["exp"] - claims["iat"] == auth.AUTH_TOKEN_TTL
+
+
+def test_tampered_and_malformed_tokens_are_rejected():
+    header, payload, signature = auth.create_token({"sub": "7"}).split(".")
+    forged = auth._b64encode(b'{"sub":"1","exp":9999999999}')
+    assert auth.verify_token(f"{header}.{forged}.{signature}") is None
+    assert auth.verify_token(f"{header}.{payload}.{signature[:-2]}xx") is None
+    assert auth.verify_token("not-a-token") is None
+    assert auth.verify_token("a.b.c") is None
+
+
+def test_expired_tokens_are_rejected(monkeypatch):
+    token = auth.create_token({"sub": "7"})
+    assert auth.verify_token(token) is not None
+    later = time.time() + auth.AUTH_TOKEN_TTL + 1
+    monkeypatch.setattr(auth, "time", SimpleNamespace(time=lambda: later))
+    assert auth.verify_token(token) is None
+
+
+def test_verified_claims_are_copies():
+    token = auth.create_token({"sub": "7"})
+    auth.verify_token(token)["sub"] = "8"
+    assert auth.verify_token(token)["sub"] == "7"
+
+
+@pytest.fixture
+def client():
+    app = FastAPI(dependencies=[Depends(auth.require_token)])
+
+    @app.get("/login")
+    def public():
+        return {}
+
+    @app.get("/privado")
+    def private():
+        return {}
+
+    @app.post("/admin", dependencies=[Depends(auth.require_role("admin"))])
+    def admin():
+        return {}
+
+    return TestClient(app)
+
+
+def test_require_token_is_opt_in(client, monkeypatch):
+    monkeypatch.setattr(auth, "AUTH_REQUIRED", False)
+    assert client.get("/privado").status_code == 200
+
+
+def test_require_token_rejects_missing_tokens_except_on_public_paths(client, monkeypatch):
+    monkeypatch.setattr(auth, "AUTH_REQUIRED", True)
+    response = client.get("/privado")
+    assert response.status_code == 401
+    assert response.headers["www-authenticate"] == "Bearer"
+    assert client.get("/privado", headers={"Authorization": "Bearer basura"}).status_code == 401
+    assert client.get("/privado", headers=bearer({"sub": "7"})).status_code == 200
+    assert client.get("/login").status_code == 200
+
+
+@pytest.mark.parametrize("required", [False, True])
+def test_require_role_is_always_enforced(client, monkeypatch, required):
+    monkeypatch.setattr(auth, "AUTH_REQUIRED", required)
+    assert client.post("/admin").status_code == 401
+    assert client.post("/admin", headers=bearer({"sub": "7", "rol": "usuario"})).status_code == 403
+    assert client.post("/admin", headers=bearer({"sub": "7", "rol": "admin"})).status_code == 200
@@ -0,0 +1,124 @@
+"""Read-through cache and its backends."""
+import asyncio
+
+import pytest
+
+from calidad_core import cache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+class FakeRedis:
+    """The subset of the redis client the shared backend uses."""
+
+    def __init__(self):
+        self.values = {}
+        self.expirations = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value.encode()
+        self.expirations[key] = ex
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", clock)
+    return clock
+
+
+def test_lru_evicts_least_recently_used(clock):
+    backend = cache.LRUCacheBackend(max_items=2, ttl=60)
+    backend.set("a", {"v": 1})
+    backend.set("b", {"v": 2})
+    assert backend.get("a") == {"v": 1}
+    backend.set("c", {"v": 3})
+    assert backend.get("b") is None
+    assert backend.get("a") == {"v": 1}
+    assert backend.size() == 2
+
+
+def test_lru_entries_expire_after_ttl(clock):
+    backend = cache.LRUCacheBackend(max_items=10, ttl=60)
+    backend.set("a", {"v": 1})
+    clock.now += 59
+    assert backend.get("a") == {"v": 1}
+    clock.now += 2
+    assert backend.get("a") is None
+    assert backend.size() == 0
+
+
+def test_get_or_load_counts_hits_and_misses(clock):
+    loads = []
+    read_through = cache.ReadThroughCache(cache.LRUCacheBackend(max_items=10, ttl=60))
+
+    def loader():
+        loads.append(1)
+        return {"id": 1}
+
+    assert read_through.get_or_load("k", loader) == {"id": 1}
+    assert read_through.get_or_load("k", loader) == {"id": 1}
+    assert len(loads) == 1
+    assert read_through.stats() == {"backend": "lru", "hits": 1, "misses": 1, "hit_ratio": 0.5, "size": 1}
+
+
+def test_missing_rows_are_not_cached(clock):
+    read_through = cache.ReadThroughCache(cache.LRUCacheBackend(max_items=10, ttl=60))
+    assert read_through.get_or_load("k", lambda: None) is None
+    assert read_through.get_or_load("k", lambda: {"id": 1}) == {"id": 1}
+    assert read_through.misses == 2
+
+
+def test_invalidate_forces_a_reload(clock):
+    read_through = cache.ReadThroughCache(cache.LRUCacheBackend(max_items=10, ttl=60))
+    read_through.get_or_load("k", lambda: {"nombre": "antes"})
+    read_through.invalidate("k")
+    assert read_through.get_or_load("k", lambda: {"nombre": "después"}) == {"nombre": "después"}
+
+
+def test_get_or_load_async(clock):
+    read_through = cache.ReadThroughCache(cache.LRUCacheBackend(max_items=10, ttl=60))
+
+    async def loader():
+        return {"id": 2}
+
+    assert asyncio.run(read_through.get_or_load_async("k", loader)) == {"id": 2}
+    assert asyncio.run(read_through.get_or_load_async("k", loader)) == {"id": 2}
+    assert (read_through.hits, read_through.misses) == (1, 1)
+
+
+def test_shared_backend_prefixes_keys_and_round_trips_json():
+    client = FakeRedis()
+    backend = cache.SharedCacheBackend(client, ttl=30, prefix="svc")
+    backend.set("empresa:1", {"id_empresa": 1, "nombre": "Acme"})
+    assert list(client.values) == ["svc:empresa:1"]
+    assert client.expirations["svc:empresa:1"] == 30
+    assert backend.get("empresa:1") == {"id_empresa": 1, "nombre": "Acme"}
+    backend.delete("empresa:1")
+    assert backend.get("empresa:1") is None
+
+
+def test_null_backend_always_misses():
+    read_through = cache.ReadThroughCache(cache.NullCacheBackend())
+    assert read_through.get_or_load("k", lambda: {"id": 1}) == {"id": 1}
+    assert read_through.get_or_load("k", lambda: {"id": 1}) == {"id": 1}
+    assert read_through.stats()["hits"] == 0
+
+
+@pytest.mark.parametrize("enabled, backend", [(True, "lru"), (False, "none")])
+def test_create_cache_honours_cache_enabled(monkeypatch, enabled, backend):
+    monkeypatch.setattr(cache, "CACHE_URL", None)
+    monkeypatch.setattr(cache, "CACHE_ENABLED", enabled)
+    assert cache.create_cache("svc").backend.name == backend
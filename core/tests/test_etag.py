@@ -0,0 +1,74 @@
+"""ETag computation, If-None-Match matching and the conditional request middleware."""
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from calidad_core.etag import ETagMiddleware, compute_etag, etag_matches
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(ETagMiddleware)
+
+    @app.get("/items")
+    def items():
+        return [{"id": 1}]
+
+    @app.post("/items")
+    def create():
+        return {"id": 2}
+
+    @app.get("/missing")
+    def missing():
+        return JSONResponse({"detail": "no"}, status_code=404)
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse(iter([b"a", b"b"]))
+
+    return TestClient(app)
+
+
+def test_compute_etag_is_a_quoted_stable_digest():
+    assert compute_etag(b"body") == compute_etag(b"body")
+    assert compute_etag(b"body") != compute_etag(b"other")
+    assert compute_etag(b"body").startswith('"') and compute_etag(b"body").endswith('"')
+
+
+@pytest.mark.parametrize("if_none_match, matches", [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"x", "abc"', True),
+    ("*", True),
+    ('"x"', False),
+    ("abc", False),
+])
+def test_etag_matches(if_none_match, matches):
+    assert etag_matches(if_none_match, '"abc"') is matches
+
+
+def test_get_carries_an_etag_and_revalidates_with_304(client):
+    response = client.get("/items")
+    etag = response.headers["etag"]
+    assert etag == compute_etag(response.content)
+
+    cached = client.get("/items", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+
+
+def test_changed_resource_is_sent_again(client):
+    response = client.get("/items", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert response.json() == [{"id": 1}]
+
+
+def test_only_successful_gets_with_a_length_get_an_etag(client):
+    assert "etag" not in client.post("/items").headers
+    assert "etag" not in client.get("/missing").headers
+    streamed = client.get("/stream")
+    assert streamed.content == b"ab"
+    assert "etag" not in streamed.headers
@@ -0,0 +1,126 @@
+"""Transactional outbox, compaction and the long poll fallback."""
+import asyncio
+import time
+from datetime import date
+
+import pytest
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Integer, String, create_engine, event
+from sqlalchemy.orm import Session, declarative_base
+
+from calidad_core import outbox
+from calidad_core.outbox import DELETE, UPSERT, ChangeListener, Outbox
+
+
+Base = declarative_base()
+
+
+class Cambio(Base):
+    __tablename__ = "cambios"
+    id = Column(BigInteger().with_variant(Integer(), "sqlite"), primary_key=True)
+    recurso = Column(String(50), nullable=False)
+    operacion = Column(String(10), nullable=False)
+    id_objeto = Column(Integer, nullable=False)
+    datos = Column(JSON, nullable=False)
+    creado = Column(DateTime(timezone=True), nullable=False)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/outbox.db")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    with Session(engine) as session:
+        yield session
+
+
+def write(db, log: Outbox, operation: str, *rows: dict, recurso: str = "usuarios"):
+    log.record(db, recurso, operation, list(rows), "id_usuario")
+    db.commit()
+
+
+def replay(changes: list[dict], state: dict | None = None) -> dict:
+    """The state a consumer applying `changes` in order, starting from `state`, ends with."""
+    state = dict(state or {})
+    for change in changes:
+        key = (change["recurso"], change["id_objeto"])
+        if change["operacion"] == DELETE:
+            state.pop(key, None)
+        else:
+            state[key] = change["datos"]
+    return state
+
+
+def test_publisher_records_rows_without_excluded_fields(db):
+    log = Outbox(Cambio)
+    publish = log.publisher("usuarios", "id_usuario", exclude={"contraseña"})
+    publish(db, UPSERT, [{"id_usuario": 1, "correo": "a@x", "contraseña": "hash", "alta": date(2024, 1, 2)}])
+    db.commit()
+    (change,) = log.changes(db, 0, 10)
+    assert change["recurso"] == "usuarios"
+    assert change["operacion"] == UPSERT
+    assert change["id_objeto"] == 1
+    assert change["datos"] == {"id_usuario": 1, "correo": "a@x", "alta": "2024-01-02"}
+
+
+def test_changes_are_read_in_id_order_from_an_offset(db):
+    log = Outbox(Cambio)
+    assert log.head(db) == 0
+    for i in range(1, 6):
+        write(db, log, UPSERT, {"id_usuario": i})
+    assert [change["id_objeto"] for change in log.changes(db, 0, 3)] == [1, 2, 3]
+    assert [change["id"] for change in log.changes(db, 3, 10)] == [4, 5]
+    assert log.changes(db, 5, 10) == []
+    assert log.head(db) == 5
+
+
+def test_recording_on_sqlite_takes_no_advisory_lock(engine, db):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *args: statements.append(statement))
+    write(db, Outbox(Cambio), UPSERT, {"id_usuario": 1})
+    assert not any("pg_" in statement for statement in statements)
+
+
+def test_compaction_keeps_the_state_seen_from_any_offset(db):
+    log = Outbox(Cambio)
+    write(db, log, UPSERT, {"id_usuario": 1, "correo": "a@x"})
+    write(db, log, UPSERT, {"id_usuario": 2, "correo": "b@x"})
+    write(db, log, UPSERT, {"id_usuario": 1, "correo": "c@x"})
+    write(db, log, DELETE, {"id_usuario": 2})
+    write(db, log, UPSERT, {"id_usuario": 3, "correo": "d@x"}, recurso="empresas")
+    before = log.changes(db, 0, 100)
+
+    assert log.compact(db) == 2
+    after = log.changes(db, 0, 100)
+    assert [(change["operacion"], change["id_objeto"]) for change in after] == [(UPSERT, 1), (DELETE, 2), (UPSERT, 3)]
+    final = replay(before)
+    for offset in range(0, log.head(db) + 1):
+        # A consumer that read the original log up to `offset` and then follows the compacted one.
+        consumed = replay([change for change in before if change["id"] <= offset])
+        assert replay([change for change in after if change["id"] > offset], consumed) == final
+
+
+def test_long_poll_returns_as_soon_as_changes_arrive(engine, monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_POLL_INTERVAL", 0.01)
+    listener = ChangeListener(engine)
+    reads = []
+
+    def read():
+        reads.append(1)
+        return (["cambio"], 1) if len(reads) == 3 else ([], 0)
+
+    started = time.monotonic()
+    assert asyncio.run(listener.poll(read, wait=5)) == (["cambio"], 1)
+    assert len(reads) == 3
+    assert time.monotonic() - started < 1
+
+
+def test_long_poll_gives_up_after_the_wait(engine, monkeypatch):
+    monkeypatch.setattr(outbox, "OUTBOX_POLL_INTERVAL", 0.01)
+    listener = ChangeListener(engine)
+    asyncio.run(listener.start())
+    assert not listener.listening
+    assert asyncio.run(listener.poll(lambda: ([], 7), wait=0.05)) == ([], 7)
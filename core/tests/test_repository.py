@@ -0,0 +1,159 @@
+"""Generic repository against an in-memory SQLite database."""
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import Session, declarative_base
+from sqlalchemy.pool import StaticPool
+
+from calidad_core.cache import LRUCacheBackend, ReadThroughCache
+from calidad_core.repository import Repository
+
+
+Base = declarative_base()
+
+
+class Item(Base):
+    __tablename__ = "items"
+    id_item = Column(Integer, primary_key=True)
+    nombre = Column(String(50), nullable=False)
+    nota = Column(String(50))
+
+
+class ItemSchema(BaseModel):
+    id_item: int
+    nombre: str
+    nota: str | None = None
+
+
+class ItemCreate(BaseModel):
+    nombre: str
+    nota: str | None = None
+
+
+class ItemUpdate(BaseModel):
+    nombre: str | None = None
+    nota: str | None = None
+
+
+class ItemBulkUpdate(ItemCreate):
+    id_item: int
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def items(db):
+    repository = Repository(Item, not_found="Item no encontrado")
+    for i in range(1, 6):
+        repository.create(db, {"nombre": f"item {i}"})
+    return repository
+
+
+def test_create_and_get(db, items):
+    assert items.get(db, 3).nombre == "item 3"
+    assert items.get(db, 99) is None
+
+
+def test_offset_and_keyset_pagination(db, items):
+    assert [item.id_item for item in items.paginate(db, skip=1, limit=2)] == [2, 3]
+    assert [item.id_item for item in items.paginate(db, skip=4, limit=2, after_id=3)] == [4, 5]
+    assert [item.id_item for item in items.paginate(db, conditions=[Item.nombre == "item 2"])] == [2]
+
+
+def test_paginate_rows_selects_schema_columns_or_fields(db, items):
+    assert items.paginate_rows(db, limit=1, schema=ItemSchema) == [{"id_item": 1, "nombre": "item 1", "nota": None}]
+    assert items.paginate_rows(db, limit=1, schema=ItemSchema, fields=["nota"]) == [{"id_item": 1, "nota": None}]
+    assert [row["id_item"] for row in items.rows_by_ids(db, [4, 2, 42])] == [2, 4]
+
+
+def test_update_and_delete_return_the_row_or_none(db, items):
+    assert items.update(db, 2, {"nota": "x"})._mapping == {"id_item": 2, "nombre": "item 2", "nota": "x"}
+    assert items.update(db, 2, {}).nota == "x"
+    assert items.update(db, 99, {"nota": "x"}) is None
+    assert items.delete(db, 2).id_item == 2
+    assert items.delete(db, 2) is None
+    assert items.get(db, 2) is None
+
+
+def test_patch_values_skips_nulls_for_required_columns(items):
+    assert items.patch_values(ItemUpdate(nombre=None, nota=None)) == {"nota": None}
+    assert items.patch_values(ItemUpdate(nombre="n")) == {"nombre": "n"}
+
+
+def test_bulk_operations_report_errors_per_item(db, items):
+    created = items.create_many(db, ItemCreate, [{"nombre": "a"}, {"nota": "sin nombre"}, {"nombre": "b"}])
+    assert [row["nombre"] for row in created["items"]] == ["a", "b"]
+    assert [error["index"] for error in created["errors"]] == [1]
+
+    updated = items.update_many(db, ItemBulkUpdate, [{"id_item": 1, "nombre": "uno"}, {"id_item": 99, "nombre": "x"}])
+    assert [row["nombre"] for row in updated["items"]] == ["uno"]
+    assert updated["errors"] == [{"index": 1, "detail": "Item no encontrado"}]
+
+    deleted = items.delete_many(db, [1, 99])
+    assert [row["id_item"] for row in deleted["items"]] == [1]
+    assert deleted["errors"] == [{"index": 1, "detail": "Item no encontrado"}]
+
+
+def test_cached_get_is_invalidated_by_writes(db):
+    cache = ReadThroughCache(LRUCacheBackend(max_items=10, ttl=60))
+    repository = Repository(Item, cache=cache, cache_schema=ItemSchema, cache_namespace="item")
+    repository.create(db, {"nombre": "antes"})
+    assert repository.get(db, 1) == ItemSchema(id_item=1, nombre="antes")
+    assert repository.get(db, 1).nombre == "antes"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    repository.update(db, 1, {"nombre": "después"})
+    assert repository.get(db, 1).nombre == "después"
+    repository.delete_many(db, [1])
+    assert repository.get(db, 1) is None
+
+
+def test_prepare_and_publish_hooks_see_every_write(db):
+    published = []
+    repository = Repository(
+        Item,
+        prepare=lambda db, rows: [{**row, "nota": "preparada"} for row in rows],
+        publish=lambda db, operation, rows: published.append((operation, [row["id_item"] for row in rows])),
+    )
+    assert repository.create(db, {"nombre": "a"}).nota == "preparada"
+    repository.create_many(db, ItemCreate, [{"nombre": "b"}, {"nombre": "c"}])
+    repository.update(db, 1, {"nombre": "a2"})
+    repository.delete(db, 2)
+    repository.delete_many(db, [3, 99])
+    assert published == [("upsert", [1]), ("upsert", [2, 3]), ("upsert", [1]), ("delete", [2]), ("delete", [3])]
+
+
+def test_async_repository_matches_the_sync_one(tmp_path):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/items.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        repository = Repository(Item).as_async()
+        async with AsyncSession(engine) as db:
+            await repository.create(db, {"nombre": "a"})
+            updated = await repository.update(db, 1, {"nota": "x"})
+            listed = await repository.paginate_rows(db, schema=ItemSchema)
+            missing = await repository.delete(db, 99)
+        await engine.dispose()
+        return updated, listed, missing
+
+    updated, listed, missing = asyncio.run(scenario())
+    assert updated.nota == "x"
+    assert listed == [{"id_item": 1, "nombre": "a", "nota": "x"}]
+    assert missing is None
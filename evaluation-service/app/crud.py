@@ -1,76 +1,40 @@
 """
-CRUD operations for database entities.
+Read operations for database entities.
 
-Implements create, read, update, and delete logic for 'Empresa' and 'Usuario'.
-Dependencies: SQLAlchemy ORM, application models and schemas.
+Implements the reads of 'Empresa' and 'Usuario'. Both tables are a replica of users-companies-service,
+written only by `app.replica`, which also invalidates the cached rows it changes.
+Each entity is served by a `calidad_core` repository; this module keeps the service-specific rules.
+Dependencies: calidad_core, application models and schemas.
 """
 from sqlalchemy.orm import Session
+from calidad_core.repository import Repository
 from . import models, schemas
+from .cache import cache
 
 
-def get_empresas(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Empresa).offset(skip).limit(limit).all()
+empresas = Repository(models.Empresa, not_found="Empresa no encontrada", cache=cache, cache_schema=schemas.Empresa, cache_namespace="empresa")
+usuarios = Repository(models.Usuario, not_found="Usuario no encontrado", cache=cache, cache_schema=schemas.Usuario, cache_namespace="usuario")
 
-def get_empresa(db: Session, empresa_id: int):
-    return db.query(models.Empresa).filter(models.Empresa.id_empresa == empresa_id).first()
 
-def create_empresa(db: Session, empresa: schemas.EmpresaCreate):
-    db_empresa = models.Empresa(nombre=empresa.nombre, telefono=empresa.telefono)
-    db.add(db_empresa)
-    db.commit()
-    db.refresh(db_empresa)
-    return db_empresa
+def get_empresas(db: Session, skip: int = 0, limit: int = 100, after_id: int | None = None, fields: list[str] | None = None):
+    return empresas.paginate_rows(db, skip, limit, after_id, schema=schemas.Empresa, fields=fields)
 
-def delete_empresa(db: Session, empresa_id: int):
-    empresa = db.query(models.Empresa).filter(models.Empresa.id_empresa == empresa_id).first()
-    if empresa:
-        db.delete(empresa)
-        db.commit()
-    return empresa
 
-def update_empresa(db: Session, empresa_id: int, empresa_update: schemas.EmpresaCreate):
-    empresa = db.query(models.Empresa).filter(models.Empresa.id_empresa == empresa_id).first()
-    if empresa:
-        empresa.nombre = empresa_update.nombre
-        empresa.telefono = empresa_update.telefono
-        db.commit()
-        db.refresh(empresa)
-    return empresa
+def get_empresas_by_ids(db: Session, ids: list[int], fields: list[str] | None = None):
+    return empresas.rows_by_ids(db, ids, schema=schemas.Empresa, fields=fields)
 
 
-def get_usuarios(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Usuario).offset(skip).limit(limit).all()
+def get_empresa(db: Session, empresa_id: int):
+    return empresas.get(db, empresa_id)
 
-def get_usuario(db: Session, usuario_id: int):
-    return db.query(models.Usuario).filter(models.Usuario.id_usuario == usuario_id).first()
 
-def create_usuario(db: Session, usuario: schemas.UsuarioCreate):
-    db_usuario = models.Usuario(**usuario.dict())
-    db.add(db_usuario)
-    db.commit()
-    db.refresh(db_usuario)
-    return db_usuario
+def get_usuarios(db: Session, skip: int = 0, limit: int = 100, after_id: int | None = None, fields: list[str] | None = None):
+    return usuarios.paginate_rows(db, skip, limit, after_id, schema=schemas.Usuario, fields=fields)
 
-def update_usuario(db: Session, usuario_id: int, usuario_update: schemas.UsuarioCreate):
-    usuario = db.query(models.Usuario).filter(models.Usuario.id_usuario == usuario_id).first()
-    if usuario:
-        for key, value in usuario_update.dict().items():
-            setattr(usuario, key, value)
-        db.commit()
-        db.refresh(usuario)
-    return usuario
 
-def delete_usuario(db: Session, usuario_id: int):
-    usuario = db.query(models.Usuario).filter(models.Usuario.id_usuario == usuario_id).first()
-    if usuario:
-        db.delete(usuario)
-        db.commit()
-    return usuario
+def get_usuarios_by_ids(db: Session, ids: list[int], fields: list[str] | None = None):
+    return usuarios.rows_by_ids(db, ids, schema=schemas.Usuario, fields=fields)
 
-def autenticar_usuario(db: Session, correo: str, contraseña: str):
-    """
-    Authenticate a user by email and password.
 
-    Returns the user instance if credentials are valid, otherwise None.
-    """
-    return db.query(models.Usuario).filter(models.Usuario.correo == correo, models.Usuario.contraseña == contraseña).first()
+def get_usuario(db: Session, usuario_id: int):
+    return usuarios.get(db, usuario_id)
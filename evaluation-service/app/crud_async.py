@@ -0,0 +1,36 @@
+"""
+Async read operations for database entities.
+
+Mirrors `app.crud` on top of an `AsyncSession` for the async entry point of the evaluation service.
+Dependencies: SQLAlchemy asyncio extension, calidad_core, application models and schemas.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import crud, schemas
+
+
+empresas = crud.empresas.as_async()
+usuarios = crud.usuarios.as_async()
+
+
+async def get_empresas(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: int | None = None, fields: list[str] | None = None):
+    return await empresas.paginate_rows(db, skip, limit, after_id, schema=schemas.Empresa, fields=fields)
+
+
+async def get_empresas_by_ids(db: AsyncSession, ids: list[int], fields: list[str] | None = None):
+    return await empresas.rows_by_ids(db, ids, schema=schemas.Empresa, fields=fields)
+
+
+async def get_empresa(db: AsyncSession, empresa_id: int):
+    return await empresas.get(db, empresa_id)
+
+
+async def get_usuarios(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: int | None = None, fields: list[str] | None = None):
+    return await usuarios.paginate_rows(db, skip, limit, after_id, schema=schemas.Usuario, fields=fields)
+
+
+async def get_usuarios_by_ids(db: AsyncSession, ids: list[int], fields: list[str] | None = None):
+    return await usuarios.rows_by_ids(db, ids, schema=schemas.Usuario, fields=fields)
+
+
+async def get_usuario(db: AsyncSession, usuario_id: int):
+    return await usuarios.get(db, usuario_id)
@@ -1,17 +1,27 @@
 """
 FastAPI application entry point.
 
-Defines API endpoints for managing 'Empresa' and 'Usuario' resources, including authentication.
-Dependencies: FastAPI, SQLAlchemy, application CRUD, models, and schemas.
+Defines the read endpoints of the replicated 'Empresa' and 'Usuario' resources and the replica status.
+Dependencies: FastAPI, SQLAlchemy, calidad_core, application CRUD, models, and schemas.
 """
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
-from .database import engine, SessionLocal
+from calidad_core.database import pool_status, register_create_all, register_dispose
+from calidad_core.compression import CompressionMiddleware
+from calidad_core.etag import ETagMiddleware
+from calidad_core.health import ReadinessProbe, liveness_response
+from calidad_core.metrics import MetricsMiddleware
+from calidad_core.auth import require_role, require_token
+from calidad_core.responses import FastJSONResponse
+from calidad_core.pagination import NEXT_CURSOR_HEADER, decode_cursor, fields_query, ids_query, set_next_cursor
+from calidad_core import metrics
+from .database import engine, get_db
+from .cache import cache
 from .models import Base
-from . import crud, schemas
+from . import crud, replica, schemas
 
-app = FastAPI()
+app = FastAPI(dependencies=[Depends(require_token)])
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,30 +29,57 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Server-Timing"],
 )
 
-@app.on_event("startup")
-def startup():
-    Base.metadata.create_all(bind=engine)
+app.add_middleware(ETagMiddleware)
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Outside the ETag middleware, which hashes the plain body.
+app.add_middleware(CompressionMiddleware)
+
+# Outermost, so the recorded latency includes the other middleware.
+app.add_middleware(MetricsMiddleware)
+
+register_create_all(app, Base.metadata, engine)
+register_dispose(app, engine)
+
+readiness = ReadinessProbe(engine)
+
+app.router.add_event_handler("startup", replica.follower.start)
+app.router.add_event_handler("shutdown", replica.follower.stop)
 
 @app.get("/", tags=["root"])
 def read_root():
     return {"msg": "Microservicio de Empresas funcionando"}
 
-@app.post("/empresas/", response_model=schemas.Empresa, tags=["empresas"])
-def create_empresa(empresa: schemas.EmpresaCreate, db: Session = Depends(get_db)):
-    return crud.create_empresa(db, empresa)
+@app.get("/health/live", tags=["health"])
+async def read_liveness():
+    return liveness_response()
+
+@app.get("/health/ready", tags=["health"])
+async def read_readiness():
+    return await readiness.response()
+
+@app.get("/debug/pool", tags=["debug"])
+def read_pool_status():
+    return pool_status(engine.pool)
+
+@app.get("/debug/cache", tags=["debug"])
+def read_cache_stats():
+    return cache.stats()
+
+@app.get("/metrics", tags=["debug"])
+def read_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
 
 @app.get("/empresas/", response_model=list[schemas.Empresa], tags=["empresas"])
-def read_empresas(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_empresas(db, skip=skip, limit=limit)
+def read_empresas(skip: int = 0, limit: int = 100, cursor: str | None = None, ids: list[int] | None = Depends(ids_query), fields: list[str] | None = Depends(fields_query(schemas.Empresa)), db: Session = Depends(get_db)):
+    if ids is not None:
+        return FastJSONResponse(crud.get_empresas_by_ids(db, ids, fields))
+    empresas = crud.get_empresas(db, skip=skip, limit=limit, after_id=decode_cursor(cursor), fields=fields)
+    response = FastJSONResponse(empresas)
+    set_next_cursor(response, empresas, "id_empresa", limit)
+    return response
 
 @app.get("/empresas/{empresa_id}", response_model=schemas.Empresa, tags=["empresas"])
 def read_empresa(empresa_id: int, db: Session = Depends(get_db)):
@@ -51,27 +88,14 @@ def read_empresa(empresa_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Empresa no encontrada")
     return db_empresa
 
-@app.put("/empresas/{empresa_id}", response_model=schemas.Empresa, tags=["empresas"])
-def update_empresa(empresa_id: int, empresa: schemas.EmpresaCreate, db: Session = Depends(get_db)):
-    db_empresa = crud.update_empresa(db, empresa_id, empresa)
-    if db_empresa is None:
-        raise HTTPException(status_code=404, detail="Empresa no encontrada")
-    return db_empresa
-
-@app.delete("/empresas/{empresa_id}", response_model=schemas.Empresa, tags=["empresas"])
-def delete_empresa(empresa_id: int, db: Session = Depends(get_db)):
-    db_empresa = crud.delete_empresa(db, empresa_id)
-    if db_empresa is None:
-        raise HTTPException(status_code=404, detail="Empresa no encontrada")
-    return db_empresa
-
-@app.post("/usuarios/", response_model=schemas.Usuario, tags=["usuarios"])
-def create_usuario(usuario: schemas.UsuarioCreate, db: Session = Depends(get_db)):
-    return crud.create_usuario(db, usuario)
-
 @app.get("/usuarios/", response_model=list[schemas.Usuario], tags=["usuarios"])
-def read_usuarios(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_usuarios(db, skip=skip, limit=limit)
+def read_usuarios(skip: int = 0, limit: int = 100, cursor: str | None = None, ids: list[int] | None = Depends(ids_query), fields: list[str] | None = Depends(fields_query(schemas.Usuario)), db: Session = Depends(get_db)):
+    if ids is not None:
+        return FastJSONResponse(crud.get_usuarios_by_ids(db, ids, fields))
+    usuarios = crud.get_usuarios(db, skip=skip, limit=limit, after_id=decode_cursor(cursor), fields=fields)
+    response = FastJSONResponse(usuarios)
+    set_next_cursor(response, usuarios, "id_usuario", limit)
+    return response
 
 @app.get("/usuarios/{usuario_id}", response_model=schemas.Usuario, tags=["usuarios"])
 def read_usuario(usuario_id: int, db: Session = Depends(get_db)):
@@ -80,23 +104,11 @@ def read_usuario(usuario_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     return db_usuario
 
-@app.put("/usuarios/{usuario_id}", response_model=schemas.Usuario, tags=["usuarios"])
-def update_usuario(usuario_id: int, usuario: schemas.UsuarioCreate, db: Session = Depends(get_db)):
-    db_usuario = crud.update_usuario(db, usuario_id, usuario)
-    if db_usuario is None:
-        raise HTTPException(status_code=404, detail="Usuario no encontrado")
-    return db_usuario
-
-@app.delete("/usuarios/{usuario_id}", response_model=schemas.Usuario, tags=["usuarios"])
-def delete_usuario(usuario_id: int, db: Session = Depends(get_db)):
-    db_usuario = crud.delete_usuario(db, usuario_id)
-    if db_usuario is None:
-        raise HTTPException(status_code=404, detail="Usuario no encontrado")
-    return db_usuario
+@app.get("/replica/estado", response_model=schemas.ReplicaEstado, tags=["replica"])
+def read_replica_estado(db: Session = Depends(get_db)):
+    return replica.follower.estado(db)
 
-@app.post("/login", response_model=schemas.Usuario, tags=["usuarios"])
-def login(request: schemas.LoginRequest, db: Session = Depends(get_db)):
-    usuario = crud.autenticar_usuario(db, request.correo, request.contraseña)
-    if not usuario:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Correo o contraseña incorrectos")
-    return usuario
+@app.post("/replica/replay", response_model=schemas.ReplicaEstado, tags=["replica"], dependencies=[Depends(require_role("admin"))])
+def replay_replica(desde: int = Query(..., ge=0), reiniciar: bool = False, db: Session = Depends(get_db)):
+    replica.replay(db, desde, reiniciar)
+    return replica.follower.estado(db)
@@ -1,10 +1,11 @@
 """
 SQLAlchemy ORM models for the application.
 
-Defines the database schema for 'Empresa' and 'Usuario' entities.
+Defines the database schema for 'Empresa' and 'Usuario' entities, replicated from users-companies-service
+(`app.replica`), and the replica's position in its change feed.
 Dependencies: SQLAlchemy.
 """
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import BigInteger, Column, DateTime, Integer, String
 from sqlalchemy.ext.declarative import declarative_base
 
 
@@ -20,6 +21,12 @@ class Usuario(Base):
     __tablename__ = "usuarios"
     id_usuario = Column(Integer, primary_key=True, index=True)
     correo = Column(String(255), unique=True, nullable=False)
-    contraseña = Column(String(255), nullable=False)
     nombre = Column(String(100), nullable=False)
     rol = Column(String(50), nullable=False, default='usuario')
+
+class ReplicaEstado(Base):
+    """Single row holding the id of the last change of the feed applied to the replica."""
+    __tablename__ = "replica_estado"
+    id = Column(Integer, primary_key=True)
+    ultimo_cambio = Column(BigInteger, nullable=False, default=0)
+    actualizado = Column(DateTime, nullable=False)
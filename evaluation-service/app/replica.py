@@ -0,0 +1,317 @@
+"""
+Replica of empresas and usuarios.
+
+users-companies-service owns both tables and publishes every change in its change feed (`GET /cambios`).
+Each worker follows the feed with long polls from the offset stored in `replica_estado` and applies the
+changes in batches, so reads stay local and nothing is written twice. When several workers receive the same
+batch only one applies it: the offset moves with a compare-and-set in the batch's transaction. Every worker
+invalidates its cached rows. `/metrics` reports the consistency lag; `python -m app.replica replay --desde N`
+moves the offset back so the feed is applied again from there.
+Dependencies: httpx, SQLAlchemy, calidad_core, application models, crud and database.
+"""
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+import httpx
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from calidad_core import metrics
+from calidad_core.auth import AUTH_TOKEN_TTL, create_token
+from calidad_core.client import SERVICE_TIMEOUT
+from calidad_core.outbox import DELETE, OUTBOX_HEAD_HEADER
+
+from . import crud, models
+from .database import SessionLocal
+
+
+USERS_SERVICE_URL = os.getenv("USERS_SERVICE_URL")
+REPLICA_BATCH_SIZE = int(os.getenv("REPLICA_BATCH_SIZE", "1000"))
+REPLICA_WAIT = float(os.getenv("REPLICA_WAIT", "25"))
+REPLICA_RETRY_SECONDS = float(os.getenv("REPLICA_RETRY_SECONDS", "5"))
+
+ESTADO_ID = 1
+# Feed resource: (replicated model, repository whose cached rows the changes invalidate).
+RESOURCES = {
+    "empresas": (models.Empresa, crud.empresas),
+    "usuarios": (models.Usuario, crud.usuarios),
+}
+
+logger = logging.getLogger(__name__)
+
+Estado = models.ReplicaEstado
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _timestamp(creado: str) -> float:
+    moment = datetime.fromisoformat(creado)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def read_estado(db: Session) -> models.ReplicaEstado:
+    """The status row, created at offset 0 when the schema came from `create_all`."""
+    estado = db.get(Estado, ESTADO_ID)
+    if estado is None:
+        try:
+            db.execute(insert(Estado).values(id=ESTADO_ID, ultimo_cambio=0, actualizado=_utcnow()))
+            db.commit()
+        except IntegrityError:
+            # Another worker created it first.
+            db.rollback()
+        estado = db.get(Estado, ESTADO_ID)
+    return estado
+
+
+def read_offset(db: Session) -> int:
+    offset = read_estado(db).ultimo_cambio
+    db.rollback()
+    return offset
+
+
+def _latest(changes: list[dict]) -> dict[tuple[str, int], dict]:
+    """The last change of each row in the batch; only the final state of a row is applied."""
+    latest = {}
+    for change in changes:
+        latest[(change["recurso"], change["id_objeto"])] = change
+    return latest
+
+
+def _unique_columns(table) -> list:
+    return [column for column in table.c if column.unique and not column.primary_key]
+
+
+def apply(db: Session, offset: int, changes: list[dict]) -> bool:
+    """
+    Apply a batch read from `offset` in one transaction; False when the offset had already moved.
+
+    The touched rows are deleted and the upserted ones inserted again with their final state, so rows
+    swapping a unique `correo` within the batch never collide. A row outside the batch still holding a
+    unique value an inserted row now has is deleted too: the value moved, so a later change of that row
+    (possible after compaction or a replay) brings it back with its new state.
+    """
+    moved = db.execute(
+        update(Estado)
+        .where(Estado.id == ESTADO_ID, Estado.ultimo_cambio == offset)
+        .values(ultimo_cambio=changes[-1]["id"], actualizado=_utcnow())
+    )
+    if moved.rowcount != 1:
+        db.rollback()
+        return False
+    latest = _latest(changes)
+    displaced = {recurso: [] for recurso in RESOURCES}
+    for recurso, (model, _) in RESOURCES.items():
+        touched = [change for (name, _), change in latest.items() if name == recurso]
+        if not touched:
+            continue
+        table = model.__table__
+        pk = table.primary_key.columns[0]
+        db.execute(delete(table).where(pk.in_([change["id_objeto"] for change in touched])))
+        rows = [
+            {column: change["datos"].get(column) for column in table.c.keys()}
+            for change in touched
+            if change["operacion"] != DELETE
+        ]
+        if rows:
+            for column in _unique_columns(table):
+                stale = delete(table).where(column.in_([row[column.key] for row in rows])).returning(pk)
+                displaced[recurso].extend(db.scalars(stale))
+            db.execute(table.insert(), rows)
+    db.commit()
+    for recurso, ids in displaced.items():
+        for obj_id in ids:
+            RESOURCES[recurso][1].invalidate(obj_id)
+    return True
+
+
+def invalidate(changes: list[dict]):
+    """Drop this worker's cached copies of the changed rows."""
+    for recurso, id_objeto in _latest(changes):
+        if recurso in RESOURCES:
+            RESOURCES[recurso][1].invalidate(id_objeto)
+
+
+def replay(db: Session, desde: int, reiniciar: bool = False):
+    """
+    Move the offset to `desde`; the followers apply the feed again from the next change.
+
+    With `reiniciar` the replica is emptied first, so it is rebuilt from the feed alone; use it with
+    `desde=0` to drop rows written here before the replica existed.
+    """
+    read_estado(db)
+    removed = {}
+    if reiniciar:
+        for recurso, (model, _) in RESOURCES.items():
+            pk = model.__table__.primary_key.columns[0]
+            removed[recurso] = db.scalars(select(pk)).all()
+            db.execute(delete(model.__table__))
+    db.execute(update(Estado).where(Estado.id == ESTADO_ID).values(ultimo_cambio=desde, actualizado=_utcnow()))
+    db.commit()
+    for recurso, ids in removed.items():
+        for obj_id in ids:
+            RESOURCES[recurso][1].invalidate(obj_id)
+
+
+class ReplicaFollower:
+    """
+    Follows the change feed in a background thread of this worker.
+
+    `offset` is the last change this worker applied or saw applied, which may run ahead of the stored one
+    only by batches another worker is committing; a stored offset behind it means a replay.
+    """
+
+    def __init__(self, base_url: str | None, session_factory, batch_size: int = REPLICA_BATCH_SIZE, wait: float = REPLICA_WAIT):
+        self.base_url = base_url
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.wait = wait
+        self.offset = None
+        self.head = None
+        # Wall time since which changes may be missing: the oldest unapplied change, or the last moment the
+        # replica was known to be current while the feed is unreachable. None while caught up.
+        self._behind_since = time.time()
+        self._current_at = None
+        self._token = None
+        self._token_expires = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def lag_seconds(self) -> float:
+        return 0.0 if self._behind_since is None else round(time.time() - self._behind_since, 3)
+
+    def lag_changes(self) -> int:
+        if self.head is None or self.offset is None:
+            return 0
+        return max(self.head - self.offset, 0)
+
+    def _headers(self) -> dict:
+        if self._token is None or self._token_expires - 60 < time.time():
+            self._token = create_token({"sub": "service:evaluation-service", "rol": "servicio"})
+            self._token_expires = time.time() + AUTH_TOKEN_TTL
+        return {"Authorization": f"Bearer {self._token}"}
+
+    def fetch(self, http: httpx.Client, offset: int, wait: float) -> tuple[list[dict], int]:
+        response = http.get(
+            "/cambios",
+            params={"desde": offset, "limit": self.batch_size, "espera": wait},
+            headers=self._headers(),
+        )
+        response.raise_for_status()
+        return response.json(), int(response.headers[OUTBOX_HEAD_HEADER])
+
+    def step(self, http: httpx.Client, wait: float | None = None) -> int:
+        """Fetch and apply one batch; returns how many changes it held."""
+        with self.session_factory() as db:
+            stored = read_offset(db)
+        if self.offset is None or stored < self.offset:
+            self.offset = stored
+        changes, self.head = self.fetch(http, self.offset, self.wait if wait is None else wait)
+        if changes:
+            oldest = _timestamp(changes[0]["creado"])
+            self._behind_since = oldest if self._behind_since is None else min(self._behind_since, oldest)
+            with self.session_factory() as db:
+                apply(db, self.offset, changes)
+            invalidate(changes)
+            self.offset = changes[-1]["id"]
+        if self.offset >= self.head:
+            self._behind_since = None
+            self._current_at = time.time()
+        elif changes:
+            # The next unapplied change is newer than the last applied one.
+            self._behind_since = _timestamp(changes[-1]["creado"])
+        return len(changes)
+
+    def catch_up(self) -> int:
+        """Apply the feed up to its current head without waiting for new changes; returns the changes read."""
+        total = 0
+        with self._http() as http:
+            while True:
+                read = self.step(http, wait=0)
+                total += read
+                if not read:
+                    return total
+
+    def _http(self) -> httpx.Client:
+        return httpx.Client(base_url=self.base_url, timeout=self.wait + SERVICE_TIMEOUT)
+
+    def _run(self):
+        with self._http() as http:
+            while not self._stop.is_set():
+                try:
+                    self.step(http)
+                except Exception:
+                    logger.exception("Replica sync from %s failed; retrying in %s s", self.base_url, REPLICA_RETRY_SECONDS)
+                    if self._behind_since is None:
+                        self._behind_since = self._current_at
+                    self._stop.wait(REPLICA_RETRY_SECONDS)
+
+    def start(self):
+        """Start following the feed; without `USERS_SERVICE_URL` the replica is left as it is."""
+        if self.base_url is None or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-follower", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        # A long poll in flight is abandoned with the daemon thread; a batch being applied either commits
+        # or rolls back with its connection.
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def estado(self, db: Session) -> dict:
+        estado = read_estado(db)
+        return {
+            "ultimo_cambio": estado.ultimo_cambio,
+            "cabeza": self.head,
+            "lag_cambios": max(self.head - estado.ultimo_cambio, 0) if self.head is not None else None,
+            "lag_segundos": self.lag_seconds() if self.base_url is not None else None,
+            "actualizado": estado.actualizado,
+        }
+
+
+follower = ReplicaFollower(USERS_SERVICE_URL, SessionLocal)
+
+if USERS_SERVICE_URL:
+    metrics.register(
+        metrics.Gauge("replica_lag_seconds", "Age of the oldest change not yet applied to the replica (0 when caught up).", follower.lag_seconds),
+        metrics.Gauge("replica_lag_changes", "Changes in the feed not yet applied to the replica.", follower.lag_changes),
+        metrics.Gauge("replica_offset", "Id of the last feed change applied to the replica.", lambda: follower.offset or 0),
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Réplica de empresas y usuarios.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("estado", help="Muestra el último cambio aplicado.")
+    sync = commands.add_parser("sincronizar", help="Aplica los cambios pendientes y termina.")
+    sync.add_argument("--url", default=USERS_SERVICE_URL, help="URL de users-companies-service.")
+    replay_parser = commands.add_parser("replay", help="Vuelve a aplicar el registro de cambios desde un offset.")
+    replay_parser.add_argument("--desde", type=int, required=True)
+    replay_parser.add_argument("--reiniciar", action="store_true", help="Vacía la réplica antes de aplicarlo.")
+    args = parser.parse_args(argv)
+    with SessionLocal() as db:
+        if args.command == "replay":
+            replay(db, args.desde, args.reiniciar)
+        elif args.command == "sincronizar":
+            if not args.url:
+                parser.error("falta USERS_SERVICE_URL o --url")
+            print(f"cambios leídos: {ReplicaFollower(args.url, SessionLocal).catch_up()}", file=sys.stderr)
+        print(f"último cambio aplicado: {read_offset(db)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
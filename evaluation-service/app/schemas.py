@@ -1,42 +1,33 @@
 """
 Pydantic schemas for request and response validation.
 
-Defines data validation and serialization for 'Empresa' and 'Usuario' entities.
+Defines serialization for the replicated 'Empresa' and 'Usuario' entities and the replica status.
 Dependencies: Pydantic.
 """
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
-class EmpresaBase(BaseModel):
+class Empresa(BaseModel):
     nombre: str
     telefono: str | None = None
-
-class EmpresaCreate(EmpresaBase):
-    pass
-
-class Empresa(EmpresaBase):
-    
     id_empresa: int
     class Config:
         orm_mode = True
 
-class UsuarioBase(BaseModel):
+class Usuario(BaseModel):
     correo: str
-    contraseña: str
     nombre: str
     rol: str = 'usuario'
-
-
-class UsuarioCreate(UsuarioBase):
-    pass
-
-class Usuario(UsuarioBase):
-
     id_usuario: int
     class Config:
         orm_mode = True
 
 
-class LoginRequest(BaseModel):
-    correo: str
-    contraseña: str
+class ReplicaEstado(BaseModel):
+    ultimo_cambio: int
+    cabeza: int | None = None
+    lag_cambios: int | None = None
+    lag_segundos: float | None = None
+    actualizado: datetime | None = None
@@ -0,0 +1,46 @@
+"""Initial schema
+
+Baseline matching the tables previously created by `create_all`. Tables that already exist are
+left untouched, so databases created before migrations can be upgraded in place.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "empresas" not in existing:
+        op.create_table(
+            "empresas",
+            sa.Column("id_empresa", sa.Integer(), primary_key=True),
+            sa.Column("nombre", sa.String(255), nullable=False),
+            sa.Column("telefono", sa.String(50)),
+        )
+        op.create_index("ix_empresas_id_empresa", "empresas", ["id_empresa"])
+
+    if "usuarios" not in existing:
+        op.create_table(
+            "usuarios",
+            sa.Column("id_usuario", sa.Integer(), primary_key=True),
+            sa.Column("correo", sa.String(255), nullable=False, unique=True),
+            sa.Column("contraseña", sa.String(255), nullable=False),
+            sa.Column("nombre", sa.String(100), nullable=False),
+            sa.Column("rol", sa.String(50), nullable=False),
+        )
+        op.create_index("ix_usuarios_id_usuario", "usuarios", ["id_usuario"])
+
+
+def downgrade():
+    op.drop_table("usuarios")
+    op.drop_table("empresas")
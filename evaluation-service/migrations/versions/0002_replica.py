@@ -0,0 +1,39 @@
+"""Replica of users-companies-service
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+`empresas` and `usuarios` become a replica fed by the users service's change feed (`app.replica`):
+password hashes stay in that service, and `replica_estado` stores the last change applied. The replica
+starts at offset 0, so the first sync applies the whole feed over the existing rows.
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("usuarios") as batch:
+        batch.drop_column("contraseña")
+    estado = op.create_table(
+        "replica_estado",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("ultimo_cambio", sa.BigInteger(), nullable=False),
+        sa.Column("actualizado", sa.DateTime(), nullable=False),
+    )
+    op.bulk_insert(estado, [{"id": 1, "ultimo_cambio": 0, "actualizado": datetime.now(timezone.utc).replace(tzinfo=None)}])
+
+
+def downgrade():
+    op.drop_table("replica_estado")
+    # The hashes are gone; users log in through users-companies-service.
+    with op.batch_alter_table("usuarios") as batch:
+        batch.add_column(sa.Column("contraseña", sa.String(255)))
@@ -0,0 +1,39 @@
+"""
+Test configuration.
+
+Points the application at a throwaway SQLite database before `app` is imported and puts the service
+directory on the import path, so the suite runs with `python -m pytest` from the service directory.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+
+SERVICE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SERVICE_DIR))
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/tests.db"
+os.environ["DB_SCHEMA_MODE"] = "none"
+os.environ.setdefault("AUTH_SECRET", "tests")
+
+
+@pytest.fixture(scope="session")
+def engine():
+    from app import models
+    from app.database import engine
+
+    models.Base.metadata.create_all(engine)
+    yield engine
+    models.Base.metadata.drop_all(engine)
+
+
+@pytest.fixture
+def client(engine):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
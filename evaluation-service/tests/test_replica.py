@@ -0,0 +1,59 @@
+"""
+Replay authorization.
+
+The token comes from a user who registers through users-companies-service, as any client can. The
+registration and login run in a child process because both services import their code as `app`.
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from sqlalchemy import func, select
+
+
+USERS_SERVICE_DIR = Path(__file__).resolve().parents[2] / "users-companies-service"
+SELF_REGISTRATION = """
+import json
+from fastapi.testclient import TestClient
+from app import models
+from app.database import engine
+from app.main import app
+models.Base.metadata.create_all(engine)
+body = {"correo": "intruso@example.com", "nombre": "Intruso", "contraseña": "secreto"}
+with TestClient(app) as client:
+    as_admin = client.post("/usuarios/", json={**body, "rol": "admin"}).status_code
+    client.post("/usuarios/", json=body).raise_for_status()
+    login = client.post("/login", json={"correo": body["correo"], "contraseña": body["contraseña"]})
+print(json.dumps({"as_admin": as_admin, "token": login.json()["access_token"]}))
+"""
+
+
+def self_registered_user(tmp_path) -> dict:
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path}/users.db",
+        "PYTHONPATH": str(USERS_SERVICE_DIR),
+        "PASSWORD_HASH_ITERATIONS": "1000",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", SELF_REGISTRATION], cwd=USERS_SERVICE_DIR, env=env, check=True, capture_output=True, text=True
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_self_registered_users_cannot_replay(client, engine, tmp_path):
+    from app import models
+
+    with engine.begin() as conn:
+        conn.execute(models.Empresa.__table__.insert(), [{"id_empresa": 1, "nombre": "Replicada"}])
+
+    user = self_registered_user(tmp_path)
+    assert user["as_admin"] == 403
+
+    headers = {"Authorization": f"Bearer {user['token']}"}
+    assert client.post("/replica/replay", params={"desde": 0, "reiniciar": True}, headers=headers).status_code == 403
+    assert client.post("/replica/replay", params={"desde": 0, "reiniciar": True}).status_code == 401
+    with engine.connect() as conn:
+        assert conn.scalar(select(func.count()).select_from(models.Empresa.__table__)) == 1
@@ -2,136 +2,209 @@
 CRUD operations for database entities.
 
 Implements create, read, update, and delete logic for the main entities in the forms management service.
-Dependencies: SQLAlchemy ORM, application models and schemas.
+Each entity is served by a `calidad_core` repository; this module keeps the filters and the nested form loading.
+Dependencies: SQLAlchemy ORM, calidad_core, application models and schemas.
 """
-from sqlalchemy.orm import Session
-from . import models, schemas
-
-
-def get_formularios(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Formulario).offset(skip).limit(limit).all()
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from calidad_core.repository import Repository
+from . import firmas, models, schemas
+from .cache import cache
+
+
+formularios = Repository(models.Formulario, not_found="Formulario no encontrado")
+objetivos = Repository(models.ObjetivoFormulario, not_found="Objetivo no encontrado")
+participantes = Repository(models.ParticipanteFormulario, not_found="Participante no encontrado", prepare=firmas.prepare)
+metodologias = Repository(models.Metodologia, not_found="Metodología no encontrada", cache=cache, cache_schema=schemas.Metodologia, cache_namespace="metodologia")
+
+
+def formulario_filters(filtros: schemas.FormularioFiltro | None) -> list:
+    """Translate the list filters into SQL conditions; `desde` and `hasta` bound `fecha` inclusively."""
+    if filtros is None:
+        return []
+    conditions = []
+    if filtros.id_empresa is not None:
+        conditions.append(models.Formulario.id_empresa == filtros.id_empresa)
+    if filtros.id_usuario is not None:
+        conditions.append(models.Formulario.id_usuario == filtros.id_usuario)
+    if filtros.id_metodologia is not None:
+        conditions.append(models.Formulario.id_metodologia == filtros.id_metodologia)
+    if filtros.ciudad is not None:
+        conditions.append(models.Formulario.ciudad == filtros.ciudad)
+    if filtros.desde is not None:
+        conditions.append(models.Formulario.fecha >= filtros.desde)
+    if filtros.hasta is not None:
+        conditions.append(models.Formulario.fecha <= filtros.hasta)
+    return conditions
+
+
+def get_formularios(db: Session, skip: int = 0, limit: int = 100, after_id: int | None = None, filtros: schemas.FormularioFiltro | None = None, fields: list[str] | None = None):
+    return formularios.paginate_rows(db, skip, limit, after_id, formulario_filters(filtros), schema=schemas.Formulario, fields=fields)
+
+
+def iter_formularios(db: Session, filtros: schemas.FormularioFiltro | None = None, batch_size: int = 1000):
+    """Yield filtered forms as row mappings from a server-side cursor, fetching `batch_size` rows at a time."""
+    query = (
+        select(*models.Formulario.__table__.c)
+        .where(*formulario_filters(filtros))
+        .order_by(models.Formulario.id_formulario)
+        .execution_options(yield_per=batch_size)
+    )
+    for row in db.execute(query):
+        yield row._mapping
 
 
 def get_formulario(db: Session, formulario_id: int):
-    return db.query(models.Formulario).filter(models.Formulario.id_formulario == formulario_id).first()
+    return formularios.get(db, formulario_id)
 
 
 def create_formulario(db: Session, formulario: schemas.FormularioCreate):
-    db_formulario = models.Formulario(**formulario.dict())
+    return formularios.create(db, formulario.dict())
+
+
+def get_formulario_completo(db: Session, formulario_id: int):
+    """Load a form with its methodology joined and its objectives and participants in one batched query each."""
+    return (
+        db.query(models.Formulario)
+        .options(
+            joinedload(models.Formulario.metodologia),
+            selectinload(models.Formulario.objetivos),
+            selectinload(models.Formulario.participantes),
+        )
+        .filter(models.Formulario.id_formulario == formulario_id)
+        .first()
+    )
+
+
+def create_formulario_completo(db: Session, formulario: schemas.FormularioCompletoCreate):
+    db_formulario = models.Formulario(**formulario.dict(exclude={"objetivos", "participantes"}))
+    db_formulario.objetivos = [models.ObjetivoFormulario(**objetivo.dict()) for objetivo in formulario.objetivos]
+    db_formulario.participantes = [
+        models.ParticipanteFormulario(**values)
+        for values in firmas.prepare(db, [participante.dict() for participante in formulario.participantes])
+    ]
     db.add(db_formulario)
     db.commit()
-    db.refresh(db_formulario)
-    return db_formulario
+    return get_formulario_completo(db, db_formulario.id_formulario)
 
 
 def update_formulario(db: Session, formulario_id: int, formulario_update: schemas.FormularioCreate):
-    formulario = db.query(models.Formulario).filter(models.Formulario.id_formulario == formulario_id).first()
-    if formulario:
-        for key, value in formulario_update.dict().items():
-            setattr(formulario, key, value)
-        db.commit()
-        db.refresh(formulario)
-    return formulario
+    return formularios.update(db, formulario_id, formulario_update.dict())
+
+
+def patch_formulario(db: Session, formulario_id: int, formulario_patch: schemas.FormularioUpdate):
+    return formularios.update(db, formulario_id, formularios.patch_values(formulario_patch))
 
 
 def delete_formulario(db: Session, formulario_id: int):
-    formulario = db.query(models.Formulario).filter(models.Formulario.id_formulario == formulario_id).first()
-    if formulario:
-        db.delete(formulario)
-        db.commit()
-    return formulario
+    return formularios.delete(db, formulario_id)
+
+
+def create_formularios(db: Session, items: list[dict]):
+    return formularios.create_many(db, schemas.FormularioCreate, items)
+
+
+def update_formularios(db: Session, items: list[dict]):
+    return formularios.update_many(db, schemas.FormularioBulkUpdate, items)
+
+
+def delete_formularios(db: Session, formulario_ids: list[int]):
+    return formularios.delete_many(db, formulario_ids)
+
+
+def get_objetivos(db: Session, skip: int = 0, limit: int = 100, after_id: int | None = None, id_formulario: int | None = None, fields: list[str] | None = None):
+    conditions = [models.ObjetivoFormulario.id_formulario == id_formulario] if id_formulario is not None else []
+    return objetivos.paginate_rows(db, skip, limit, after_id, conditions, schema=schemas.ObjetivoFormulario, fields=fields)
 
-    
-def get_objetivos(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.ObjetivoFormulario).offset(skip).limit(limit).all()
 
 def get_objetivo(db: Session, objetivo_id: int):
-    return db.query(models.ObjetivoFormulario).filter(models.ObjetivoFormulario.id_objetivo == objetivo_id).first()
+    return objetivos.get(db, objetivo_id)
+
 
 def create_objetivo(db: Session, objetivo: schemas.ObjetivoFormularioCreate):
-    db_objetivo = models.ObjetivoFormulario(**objetivo.dict())
-    db.add(db_objetivo)
-    db.commit()
-    db.refresh(db_objetivo)
-    return db_objetivo
+    return objetivos.create(db, objetivo.dict())
 
 
 def update_objetivo(db: Session, objetivo_id: int, objetivo_update: schemas.ObjetivoFormularioCreate):
-    objetivo = db.query(models.ObjetivoFormulario).filter(models.ObjetivoFormulario.id_objetivo == objetivo_id).first()
-    if objetivo:
-        for key, value in objetivo_update.dict().items():
-            setattr(objetivo, key, value)
-        db.commit()
-        db.refresh(objetivo)
-    return objetivo
+    return objetivos.update(db, objetivo_id, objetivo_update.dict())
+
+
+def patch_objetivo(db: Session, objetivo_id: int, objetivo_patch: schemas.ObjetivoFormularioUpdate):
+    return objetivos.update(db, objetivo_id, objetivos.patch_values(objetivo_patch))
+
 
 def delete_objetivo(db: Session, objetivo_id: int):
-    objetivo = db.query(models.ObjetivoFormulario).filter(models.ObjetivoFormulario.id_objetivo == objetivo_id).first()
-    if objetivo:
-        db.delete(objetivo)
-        db.commit()
-    return objetivo
+    return objetivos.delete(db, objetivo_id)
+
+
+def create_objetivos(db: Session, items: list[dict]):
+    return objetivos.create_many(db, schemas.ObjetivoFormularioCreate, items)
+
 
+def update_objetivos(db: Session, items: list[dict]):
+    return objetivos.update_many(db, schemas.ObjetivoFormularioBulkUpdate, items)
+
+
+def delete_objetivos(db: Session, objetivo_ids: list[int]):
+    return objetivos.delete_many(db, objetivo_ids)
+
+
+def get_participantes(db: Session, skip: int = 0, limit: int = 100, after_id: int | None = None, id_formulario: int | None = None, fields: list[str] | None = None):
+    conditions = [models.ParticipanteFormulario.id_formulario == id_formulario] if id_formulario is not None else []
+    return participantes.paginate_rows(db, skip, limit, after_id, conditions, schema=schemas.ParticipanteFormulario, fields=fields)
 
-def get_participantes(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.ParticipanteFormulario).offset(skip).limit(limit).all()
 
 def get_participante(db: Session, participante_id: int):
-    return db.query(models.ParticipanteFormulario).filter(models.ParticipanteFormulario.id_participante == participante_id).first()
+    return participantes.get(db, participante_id)
+
 
 def create_participante(db: Session, participante: schemas.ParticipanteFormularioCreate):
-    db_participante = models.ParticipanteFormulario(**participante.dict())
-    db.add(db_participante)
-    db.commit()
-    db.refresh(db_participante)
-    return db_participante
+    return participantes.create(db, participante.dict())
 
 
 def update_participante(db: Session, participante_id: int, participante_update: schemas.ParticipanteFormularioCreate):
-    participante = db.query(models.ParticipanteFormulario).filter(models.ParticipanteFormulario.id_participante == participante_id).first()
-    if participante:
-        for key, value in participante_update.dict().items():
-            setattr(participante, key, value)
-        db.commit()
-        db.refresh(participante)
-    return participante
+    return participantes.update(db, participante_id, participante_update.dict())
+
+
+def patch_participante(db: Session, participante_id: int, participante_patch: schemas.ParticipanteFormularioUpdate):
+    return participantes.update(db, participante_id, participantes.patch_values(participante_patch))
+
 
 def delete_participante(db: Session, participante_id: int):
-    participante = db.query(models.ParticipanteFormulario).filter(models.ParticipanteFormulario.id_participante == participante_id).first()
-    if participante:
-        db.delete(participante)
-        db.commit()
-    return participante
+    return participantes.delete(db, participante_id)
+
 
+def create_participantes(db: Session, items: list[dict]):
+    return participantes.create_many(db, schemas.ParticipanteFormularioCreate, items)
 
-def get_metodologias(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Metodologia).offset(skip).limit(limit).all()
+
+def update_participantes(db: Session, items: list[dict]):
+    return participantes.update_many(db, schemas.ParticipanteFormularioBulkUpdate, items)
+
+
+def delete_participantes(db: Session, participante_ids: list[int]):
+    return participantes.delete_many(db, participante_ids)
+
+
+def get_metodologias(db: Session, skip: int = 0, limit: int = 100, after_id: int | None = None, fields: list[str] | None = None):
+    return metodologias.paginate_rows(db, skip, limit, after_id, schema=schemas.Metodologia, fields=fields)
 
 
 def get_metodologia(db: Session, metodologia_id: int):
-    return db.query(models.Metodologia).filter(models.Metodologia.id_metodologia == metodologia_id).first()
+    return metodologias.get(db, metodologia_id)
+
 
 def create_metodologia(db: Session, metodologia: schemas.MetodologiaCreate):
-    db_metodologia = models.Metodologia(**metodologia.dict())
-    db.add(db_metodologia)
-    db.commit()
-    db.refresh(db_metodologia)
-    return db_metodologia
+    return metodologias.create(db, metodologia.dict())
 
 
 def update_metodologia(db: Session, metodologia_id: int, metodologia_update: schemas.MetodologiaCreate):
-    metodologia = db.query(models.Metodologia).filter(models.Metodologia.id_metodologia == metodologia_id).first()
-    if metodologia:
-        for key, value in metodologia_update.dict().items():
-            setattr(metodologia, key, value)
-        db.commit()
-        db.refresh(metodologia)
-    return metodologia
+    return metodologias.update(db, metodologia_id, metodologia_update.dict())
+
+
+def patch_metodologia(db: Session, metodologia_id: int, metodologia_patch: schemas.MetodologiaUpdate):
+    return metodologias.update(db, metodologia_id, metodologias.patch_values(metodologia_patch))
 
 
 def delete_metodologia(db: Session, metodologia_id: int):
-    metodologia = db.query(models.Metodologia).filter(models.Metodologia.id_metodologia == metodologia_id).first()
-    if metodologia:
-        db.delete(metodologia)
-        db.commit()
-    return metodologia
+    return metodologias.delete(db, metodologia_id)
@@ -0,0 +1,113 @@
+"""
+Async CRUD operations for database entities.
+
+Mirrors `app.crud` on top of an `AsyncSession` for the async entry point of the forms management service.
+Dependencies: SQLAlchemy asyncio extension, calidad_core, application models and schemas.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import crud, models, schemas
+from .crud import formulario_filters
+
+
+formularios = crud.formularios.as_async()
+objetivos = crud.objetivos.as_async()
+participantes = crud.participantes.as_async()
+metodologias = crud.metodologias.as_async()
+
+
+async def get_formularios(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: int | None = None, filtros: schemas.FormularioFiltro | None = None, fields: list[str] | None = None):
+    return await formularios.paginate_rows(db, skip, limit, after_id, formulario_filters(filtros), schema=schemas.Formulario, fields=fields)
+
+
+async def get_formulario(db: AsyncSession, formulario_id: int):
+    return await formularios.get(db, formulario_id)
+
+
+async def create_formulario(db: AsyncSession, formulario: schemas.FormularioCreate):
+    return await formularios.create(db, formulario.dict())
+
+
+async def update_formulario(db: AsyncSession, formulario_id: int, formulario_update: schemas.FormularioCreate):
+    return await formularios.update(db, formulario_id, formulario_update.dict())
+
+
+async def patch_formulario(db: AsyncSession, formulario_id: int, formulario_patch: schemas.FormularioUpdate):
+    return await formularios.update(db, formulario_id, formularios.patch_values(formulario_patch))
+
+
+async def delete_formulario(db: AsyncSession, formulario_id: int):
+    return await formularios.delete(db, formulario_id)
+
+
+async def get_objetivos(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: int | None = None, id_formulario: int | None = None, fields: list[str] | None = None):
+    conditions = [models.ObjetivoFormulario.id_formulario == id_formulario] if id_formulario is not None else []
+    return await objetivos.paginate_rows(db, skip, limit, after_id, conditions, schema=schemas.ObjetivoFormulario, fields=fields)
+
+
+async def get_objetivo(db: AsyncSession, objetivo_id: int):
+    return await objetivos.get(db, objetivo_id)
+
+
+async def create_objetivo(db: AsyncSession, objetivo: schemas.ObjetivoFormularioCreate):
+    return await objetivos.create(db, objetivo.dict())
+
+
+async def update_objetivo(db: AsyncSession, objetivo_id: int, objetivo_update: schemas.ObjetivoFormularioCreate):
+    return await objetivos.update(db, objetivo_id, objetivo_update.dict())
+
+
+async def patch_objetivo(db: AsyncSession, objetivo_id: int, objetivo_patch: schemas.ObjetivoFormularioUpdate):
+    return await objetivos.update(db, objetivo_id, objetivos.patch_values(objetivo_patch))
+
+
+async def delete_objetivo(db: AsyncSession, objetivo_id: int):
+    return await objetivos.delete(db, objetivo_id)
+
+
+async def get_participantes(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: int | None = None, id_formulario: int | None = None, fields: list[str] | None = None):
+    conditions = [models.ParticipanteFormulario.id_formulario == id_formulario] if id_formulario is not None else []
+    return await participantes.paginate_rows(db, skip, limit, after_id, conditions, schema=schemas.ParticipanteFormulario, fields=fields)
+
+
+async def get_participante(db: AsyncSession, participante_id: int):
+    return await participantes.get(db, participante_id)
+
+
+async def create_participante(db: AsyncSession, participante: schemas.ParticipanteFormularioCreate):
+    return await participantes.create(db, participante.dict())
+
+
+async def update_participante(db: AsyncSession, participante_id: int, participante_update: schemas.ParticipanteFormularioCreate):
+    return await participantes.update(db, participante_id, participante_update.dict())
+
+
+async def patch_participante(db: AsyncSession, participante_id: int, participante_patch: schemas.ParticipanteFormularioUpdate):
+    return await participantes.update(db, participante_id, participantes.patch_values(participante_patch))
+
+
+async def delete_participante(db: AsyncSession, participante_id: int):
+    return await participantes.delete(db, participante_id)
+
+
+async def get_metodologias(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: int | None = None, fields: list[str] | None = None):
+    return await metodologias.paginate_rows(db, skip, limit, after_id, schema=schemas.Metodologia, fields=fields)
+
+
+async def get_metodologia(db: AsyncSession, metodologia_id: int):
+    return await metodologias.get(db, metodologia_id)
+
+
+async def create_metodologia(db: AsyncSession, metodologia: schemas.MetodologiaCreate):
+    return await metodologias.create(db, metodologia.dict())
+
+
+async def update_metodologia(db: AsyncSession, metodologia_id: int, metodologia_update: schemas.MetodologiaCreate):
+    return await metodologias.update(db, metodologia_id, metodologia_update.dict())
+
+
+async def patch_metodologia(db: AsyncSession, metodologia_id: int, metodologia_patch: schemas.MetodologiaUpdate):
+    return await metodologias.update(db, metodologia_id, metodologias.patch_values(metodologia_patch))
+
+
+async def delete_metodologia(db: AsyncSession, metodologia_id: int):
+    return await metodologias.delete(db, metodologia_id)
@@ -2,13 +2,18 @@
 Database configuration module.
 
 Sets up the SQLAlchemy engine and session for database interactions.
-Dependencies: SQLAlchemy.
+The connection URL is read from `DATABASE_URL`; pool settings and instrumentation come from `calidad_core.database`.
+Dependencies: SQLAlchemy, calidad_core.
 """
-from sqlalchemy import create_engine
+import os
+
 from sqlalchemy.orm import sessionmaker
 
+from calidad_core.database import create_engine, session_dependency
+
 
-DATABASE_URL = "postgresql://<usuario>:<contraseña>@<host>/<db>?sslmode=require"
+DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://<usuario>:<contraseña>@<host>/<db>?sslmode=require")
 
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+get_db = session_dependency(SessionLocal)
@@ -0,0 +1,44 @@
+"""
+Streaming export serializers.
+
+Turns an iterator of row mappings into NDJSON or CSV text chunks, so large exports are written
+to the client as they are read from the database instead of being built in memory.
+Dependencies: standard library.
+"""
+import csv
+import io
+import json
+
+CHUNK_ROWS = 500
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def to_ndjson(rows):
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(row), default=str, ensure_ascii=False))
+        if len(lines) == CHUNK_ROWS:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def to_csv(rows, columns: list[str]):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        writer.writerow([row[column] for column in columns])
+        pending += 1
+        if pending == CHUNK_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue()
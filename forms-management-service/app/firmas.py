@@ -0,0 +1,192 @@
+"""
+Participant signature store.
+
+Signatures arrive as base64 text (optionally a `data:` URI) and are kept once per distinct content in
+`firmas`, keyed by the SHA-256 of the decoded bytes and zlib-compressed when that makes them smaller.
+Participants only hold that `firma_hash`, so their rows and list pages stay small; the bytes are
+served by `GET /participantes/{id}/firma`. `python -m app.firmas` deletes signatures no participant uses;
+the foreign key from `firma_hash` keeps it from deleting one a concurrent write has started to use.
+Dependencies: SQLAlchemy, FastAPI, application models.
+"""
+import argparse
+import base64
+import binascii
+import hashlib
+import re
+import sys
+import zlib
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from calidad_core.etag import etag_matches
+
+from . import models
+
+
+_DATA_URI = re.compile(r"data:(?P<media_type>[\w.+-]+/[\w.+-]+)?(?:;[\w-]+=[^;,]*)*;base64,", re.ASCII)
+# Leading bytes of the image formats signature pads produce.
+_MAGIC = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF8", "image/gif"),
+    (b"RIFF", "image/webp"),
+    (b"<svg", "image/svg+xml"),
+    (b"<?xml", "image/svg+xml"),
+)
+# A `?v=<firma_hash>` URL never changes content; the bare URL follows the participant and must revalidate.
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "private, no-cache"
+PURGE_BATCH_SIZE = 1000
+
+
+def decode(firma: str) -> tuple[bytes, str]:
+    """Bytes and media type of a signature; text that is not base64 is kept as UTF-8 `text/plain`."""
+    match = _DATA_URI.match(firma)
+    payload = firma[match.end():] if match else firma
+    try:
+        content = base64.b64decode(payload, validate=True)
+    except (binascii.Error, ValueError):
+        return firma.encode(), "text/plain; charset=utf-8"
+    if match and match.group("media_type"):
+        return content, match.group("media_type")
+    return content, next((media_type for magic, media_type in _MAGIC if content.startswith(magic)), "application/octet-stream")
+
+
+def digest(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def _compressed(content: bytes) -> tuple[bytes, str]:
+    packed = zlib.compress(content, 6)
+    return (packed, "zlib") if len(packed) < len(content) else (content, "identity")
+
+
+def _insert_missing(db: Session, rows: list[dict]):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        # `DO NOTHING` locks no row, so a purge could still delete one it skipped. A key-share lock holds
+        # the rows until commit; a row deleted in between is not returned and is inserted again.
+        Firma = models.Firma
+        while rows:
+            db.execute(postgresql_insert(Firma).on_conflict_do_nothing(index_elements=["hash"]), rows)
+            locked = set(db.scalars(
+                select(Firma.hash).where(Firma.hash.in_([row["hash"] for row in rows])).with_for_update(key_share=True)
+            ))
+            rows = [row for row in rows if row["hash"] not in locked]
+        return
+    if dialect == "sqlite":
+        db.execute(sqlite_insert(models.Firma).on_conflict_do_nothing(index_elements=["hash"]), rows)
+        return
+    existing = set(db.scalars(select(models.Firma.hash).where(models.Firma.hash.in_([row["hash"] for row in rows]))))
+    missing = [row for row in rows if row["hash"] not in existing]
+    if missing:
+        db.execute(models.Firma.__table__.insert(), missing)
+
+
+def store(db: Session, firmas: list[str | None]) -> list[str | None]:
+    """Hashes of `firmas`, storing the contents not stored yet; the caller commits."""
+    hashes, rows = [], {}
+    for firma in firmas:
+        if not firma:
+            hashes.append(None)
+            continue
+        content, media_type = decode(firma)
+        content_hash = digest(content)
+        hashes.append(content_hash)
+        if content_hash not in rows:
+            packed, codificacion = _compressed(content)
+            rows[content_hash] = {
+                "hash": content_hash,
+                "media_type": media_type,
+                "tamano": len(content),
+                "codificacion": codificacion,
+                "contenido": packed,
+            }
+    if rows:
+        _insert_missing(db, list(rows.values()))
+    return hashes
+
+
+def prepare(db: Session, rows: list[dict]) -> list[dict]:
+    """Repository hook: replaces the `firma` of each participant row with its `firma_hash`."""
+    if not any("firma" in row for row in rows):
+        return rows
+    hashes = iter(store(db, [row["firma"] for row in rows if "firma" in row]))
+    prepared = []
+    for row in rows:
+        row = dict(row)
+        if "firma" in row:
+            del row["firma"]
+            row["firma_hash"] = next(hashes)
+        prepared.append(row)
+    return prepared
+
+
+def content(firma: models.Firma) -> bytes:
+    return zlib.decompress(firma.contenido) if firma.codificacion == "zlib" else firma.contenido
+
+
+def purge_unreferenced(db: Session) -> int:
+    """
+    Delete the stored signatures no participant references any more; returns how many.
+
+    Deletes in batches, each checking the references again. A batch the foreign key rejects, because a
+    concurrent write started using one of its signatures, is left for the next run.
+    """
+    Participante = models.ParticipanteFormulario
+    referenced = select(Participante.firma_hash).where(Participante.firma_hash.is_not(None))
+    unreferenced = db.scalars(select(models.Firma.hash).where(models.Firma.hash.not_in(referenced))).all()
+    db.rollback()
+    deleted = 0
+    for start in range(0, len(unreferenced), PURGE_BATCH_SIZE):
+        batch = unreferenced[start:start + PURGE_BATCH_SIZE]
+        try:
+            result = db.execute(delete(models.Firma).where(models.Firma.hash.in_(batch), models.Firma.hash.not_in(referenced)))
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            continue
+        deleted += result.rowcount
+    return deleted
+
+
+def response(db: Session, participante_id: int, request: Request, version: str | None = None) -> Response:
+    """
+    The signature of a participant with its hash as a strong ETag.
+
+    A matching `If-None-Match` is answered with `304` from the participant row alone, without reading the blob.
+    """
+    Participante = models.ParticipanteFormulario
+    row = db.execute(select(Participante.firma_hash).where(Participante.id_participante == participante_id)).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Participante no encontrado")
+    firma_hash = row.firma_hash
+    if firma_hash is None:
+        raise HTTPException(status_code=404, detail="Firma no encontrada")
+    etag = f'"{firma_hash}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE if version == firma_hash else REVALIDATE}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    firma = db.get(models.Firma, firma_hash)
+    if firma is None:
+        raise HTTPException(status_code=404, detail="Firma no encontrada")
+    return Response(content(firma), media_type=firma.media_type, headers=headers)
+
+
+def main():
+    from .database import SessionLocal
+
+    argparse.ArgumentParser(description="Borra las firmas que ningún participante referencia.").parse_args()
+    with SessionLocal() as db:
+        print(f"firmas borradas: {purge_unreferenced(db)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""
+Bulk import pipeline for forms.
+
+Reads CSV (one form per row, `FormularioCreate` columns) or NDJSON (one `FormularioCompletoCreate`
+per line, with optional nested objectives and participants) as a stream, validates it in chunks and
+loads each chunk in one transaction with batched multi-row inserts.
+Also runnable as a CLI: `python -m app.importer formularios.csv`.
+Dependencies: SQLAlchemy, Pydantic, calidad_core, application models and schemas.
+"""
+import argparse
+import codecs
+import csv
+import json
+import sys
+from itertools import islice
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from calidad_core.repository import format_validation_error
+
+from . import firmas, models, schemas
+
+CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+
+def read_records(lines, format: str):
+    """
+    Yield `(line_number, record)` pairs from an iterable of text lines.
+
+    `record` is a dict, or an error message when the line cannot be parsed.
+    """
+    if format == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            # Empty cells fall back to the schema defaults.
+            yield reader.line_num, {key: value for key, value in row.items() if value != ""}
+        return
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_number, f"JSON inválido: {exc.msg}"
+
+
+def _chunks(iterable, size: int):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _insert_chunk(db: Session, formularios: list[schemas.FormularioCompletoCreate]):
+    table = models.Formulario.__table__
+    rows = [formulario.dict(exclude={"objetivos", "participantes"}) for formulario in formularios]
+    stmt = insert(table).returning(table.c.id_formulario, sort_by_parameter_order=True)
+    ids = db.scalars(stmt, rows).all()
+    objetivos = [
+        {**objetivo.dict(), "id_formulario": formulario_id}
+        for formulario_id, formulario in zip(ids, formularios)
+        for objetivo in formulario.objetivos
+    ]
+    participantes = [
+        {**participante.dict(), "id_formulario": formulario_id}
+        for formulario_id, formulario in zip(ids, formularios)
+        for participante in formulario.participantes
+    ]
+    if objetivos:
+        db.execute(insert(models.ObjetivoFormulario.__table__), objetivos)
+    if participantes:
+        db.execute(insert(models.ParticipanteFormulario.__table__), firmas.prepare(db, participantes))
+    db.commit()
+
+
+def import_formularios(db: Session, records, chunk_size: int = CHUNK_SIZE, on_progress=None) -> dict:
+    """
+    Validate and load `(line_number, record)` pairs, committing once per chunk.
+
+    Rejected rows are reported by line number and do not stop the import. `on_progress` is called
+    with the running totals after every chunk.
+    """
+    result = {"total": 0, "imported": 0, "rejected": 0, "errors": []}
+
+    def reject(line: int, detail: str):
+        result["rejected"] += 1
+        if len(result["errors"]) < MAX_REPORTED_ERRORS:
+            result["errors"].append({"line": line, "detail": detail})
+
+    for chunk in _chunks(records, chunk_size):
+        valid = []
+        for line, record in chunk:
+            result["total"] += 1
+            if isinstance(record, str):
+                reject(line, record)
+                continue
+            try:
+                valid.append(schemas.FormularioCompletoCreate.parse_obj(record))
+            except ValidationError as exc:
+                reject(line, format_validation_error(exc))
+        if valid:
+            _insert_chunk(db, valid)
+            result["imported"] += len(valid)
+        if on_progress:
+            on_progress(result)
+    return result
+
+
+def import_file(db: Session, binary_file, format: str, on_progress=None) -> dict:
+    """Import from a binary file object, decoding it line by line."""
+    return import_formularios(db, read_records(codecs.iterdecode(binary_file, "utf-8"), format), on_progress=on_progress)
+
+
+def main():
+    from .database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Importa formularios desde un archivo CSV o NDJSON.")
+    parser.add_argument("archivo")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="por defecto se deduce de la extensión")
+    args = parser.parse_args()
+    format = args.format or ("csv" if args.archivo.endswith(".csv") else "ndjson")
+
+    def report(result):
+        print(f"procesadas {result['total']}, importadas {result['imported']}, rechazadas {result['rejected']}", file=sys.stderr)
+
+    db = SessionLocal()
+    try:
+        with open(args.archivo, "rb") as binary_file:
+            result = import_file(db, binary_file, format, on_progress=report)
+    finally:
+        db.close()
+    for error in result["errors"]:
+        print(f"línea {error['line']}: {error['detail']}", file=sys.stderr)
+    return 1 if result["rejected"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,16 +2,32 @@
 FastAPI application entry point.
 
 Defines API endpoints for managing the main resources of the forms management service.
-Dependencies: FastAPI, SQLAlchemy, application CRUD, models, and schemas.
+Dependencies: FastAPI, SQLAlchemy, calidad_core, application CRUD, models, and schemas.
 """
-from fastapi import FastAPI, Depends, HTTPException
+from typing import Literal
+
+import anyio
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from .database import engine, SessionLocal
+from calidad_core.database import pool_status, register_create_all, register_dispose
+from calidad_core.compression import CompressionMiddleware
+from calidad_core.etag import ETagMiddleware
+from calidad_core.health import ReadinessProbe, liveness_response
+from calidad_core.metrics import MetricsMiddleware
+from calidad_core.auth import require_token
+from calidad_core.responses import FastJSONResponse
+from calidad_core.pagination import NEXT_CURSOR_HEADER, decode_cursor, fields_query, set_next_cursor
+from calidad_core import metrics
+from .database import engine, SessionLocal, get_db
+from .cache import cache
 from .models import Base
-from . import crud, schemas
+from . import crud, export, firmas, importer, models, references, schemas, search, stats
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+BULK_MAX_ITEMS = 1000
+
+app = FastAPI(dependencies=[Depends(require_token)])
 
 app.add_middleware(
        CORSMiddleware,
@@ -19,30 +35,113 @@ app.add_middleware(
        allow_credentials=True,
        allow_methods=["*"],
        allow_headers=["*"],
+       expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Server-Timing"],
    )
 
-@app.on_event("startup")
-def startup():
-    Base.metadata.create_all(bind=engine)
+app.add_middleware(ETagMiddleware)
+
+# Outside the ETag middleware, which hashes the plain body.
+app.add_middleware(CompressionMiddleware)
+
+# Outermost, so the recorded latency includes the other middleware.
+app.add_middleware(MetricsMiddleware)
+
+register_create_all(app, Base.metadata, engine)
+register_dispose(app, engine)
+
+readiness = ReadinessProbe(engine)
+
+summary_refresher = stats.SummaryRefresher(SessionLocal)
+summary_refresher.track(engine)
+app.router.add_event_handler("startup", summary_refresher.start)
+app.router.add_event_handler("shutdown", summary_refresher.stop)
+app.router.add_event_handler("shutdown", references.close)
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+search_index = search.SearchIndex(SessionLocal)
+search_index.track(engine)
+
+def check_bulk_size(items: list):
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Máximo {BULK_MAX_ITEMS} elementos por lote")
+
+def validate_references(values: dict):
+    # Sync endpoints run in a worker thread: cross to the event loop only when there is something to check.
+    if references.VALIDATE_REFERENCES:
+        anyio.from_thread.run(references.validate, values)
 
 @app.get("/", tags=["root"])
 def read_root():
     return {"msg": "Microservicio de Formularios funcionando"}
 
+@app.get("/health/live", tags=["health"])
+async def read_liveness():
+    return liveness_response()
+
+@app.get("/health/ready", tags=["health"])
+async def read_readiness():
+    return await readiness.response()
+
+@app.get("/debug/pool", tags=["debug"])
+def read_pool_status():
+    return pool_status(engine.pool)
+
+@app.get("/debug/cache", tags=["debug"])
+def read_cache_stats():
+    return cache.stats()
+
+@app.get("/metrics", tags=["debug"])
+def read_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.post("/formularios/", response_model=schemas.Formulario, tags=["formularios"])
 def create_formulario(formulario: schemas.FormularioCreate, db: Session = Depends(get_db)):
+    validate_references(formulario.dict())
     return crud.create_formulario(db, formulario)
 
-@app.get("/formularios/", response_model=list[schemas.Formulario], tags=["formularios"])
-def read_formularios(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_formularios(db, skip=skip, limit=limit)
+@app.get("/formularios/", response_model=list[schemas.FormularioConReferencias], tags=["formularios"])
+def read_formularios(skip: int = 0, limit: int = 100, cursor: str | None = None, filtros: schemas.FormularioFiltro = Depends(), expand: list[str] = Depends(references.expand_query), fields: list[str] | None = Depends(fields_query(schemas.Formulario)), db: Session = Depends(get_db)):
+    formularios = crud.get_formularios(db, skip=skip, limit=limit, after_id=decode_cursor(cursor), filtros=filtros, fields=references.with_id_fields(fields, expand))
+    if expand:
+        # Sync endpoints run in a worker thread; the lookups run on the event loop, where the client's pool lives.
+        anyio.from_thread.run(references.expand, formularios, expand)
+    response = FastJSONResponse(formularios)
+    set_next_cursor(response, formularios, "id_formulario", limit)
+    return response
+
+@app.get("/formularios/export", tags=["formularios"])
+def export_formularios(format: Literal["ndjson", "csv"] = "ndjson", filtros: schemas.FormularioFiltro = Depends()):
+    def content():
+        # The stream outlives the request dependencies, so it owns its session.
+        db = SessionLocal()
+        try:
+            rows = crud.iter_formularios(db, filtros)
+            if format == "csv":
+                yield from export.to_csv(rows, [column.key for column in models.Formulario.__table__.c])
+            else:
+                yield from export.to_ndjson(rows)
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        content(),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="formularios.{format}"'},
+    )
+
+@app.post("/formularios/bulk", response_model=schemas.FormularioBulkResult, tags=["formularios"])
+def create_formularios(formularios: list[dict], db: Session = Depends(get_db)):
+    check_bulk_size(formularios)
+    return crud.create_formularios(db, formularios)
+
+@app.put("/formularios/bulk", response_model=schemas.FormularioBulkResult, tags=["formularios"])
+def update_formularios(formularios: list[dict], db: Session = Depends(get_db)):
+    check_bulk_size(formularios)
+    return crud.update_formularios(db, formularios)
+
+@app.delete("/formularios/bulk", response_model=schemas.FormularioBulkResult, tags=["formularios"])
+def delete_formularios(ids: list[int] = Query(...), db: Session = Depends(get_db)):
+    check_bulk_size(ids)
+    return crud.delete_formularios(db, ids)
 
 @app.get("/formularios/{formulario_id}", response_model=schemas.Formulario, tags=["formularios"])
 def read_formulario(formulario_id: int, db: Session = Depends(get_db)):
@@ -51,13 +150,38 @@ def read_formulario(formulario_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Formulario no encontrado")
     return db_formulario
 
+@app.post("/formularios/import", response_model=schemas.ImportResult, tags=["formularios"])
+def import_formularios(archivo: UploadFile, format: Literal["ndjson", "csv"] = "ndjson", db: Session = Depends(get_db)):
+    return importer.import_file(db, archivo.file, format)
+
+@app.post("/formularios/completo", response_model=schemas.FormularioCompleto, tags=["formularios"])
+def create_formulario_completo(formulario: schemas.FormularioCompletoCreate, db: Session = Depends(get_db)):
+    validate_references(formulario.dict())
+    return crud.create_formulario_completo(db, formulario)
+
+@app.get("/formularios/{formulario_id}/completo", response_model=schemas.FormularioCompleto, tags=["formularios"])
+def read_formulario_completo(formulario_id: int, db: Session = Depends(get_db)):
+    db_formulario = crud.get_formulario_completo(db, formulario_id=formulario_id)
+    if db_formulario is None:
+        raise HTTPException(status_code=404, detail="Formulario no encontrado")
+    return db_formulario
+
 @app.put("/formularios/{formulario_id}", response_model=schemas.Formulario, tags=["formularios"])
 def update_formulario(formulario_id: int, formulario: schemas.FormularioCreate, db: Session = Depends(get_db)):
+    validate_references(formulario.dict())
     db_formulario = crud.update_formulario(db, formulario_id, formulario)
     if db_formulario is None:
         raise HTTPException(status_code=404, detail="Formulario no encontrado")
     return db_formulario
 
+@app.patch("/formularios/{formulario_id}", response_model=schemas.Formulario, tags=["formularios"])
+def patch_formulario(formulario_id: int, formulario: schemas.FormularioUpdate, db: Session = Depends(get_db)):
+    validate_references(formulario.dict(exclude_unset=True))
+    db_formulario = crud.patch_formulario(db, formulario_id, formulario)
+    if db_formulario is None:
+        raise HTTPException(status_code=404, detail="Formulario no encontrado")
+    return db_formulario
+
 @app.delete("/formularios/{formulario_id}", response_model=schemas.Formulario, tags=["formularios"])
 def delete_formulario(formulario_id: int, db: Session = Depends(get_db)):
     db_formulario = crud.delete_formulario(db, formulario_id)
@@ -70,8 +194,26 @@ def create_objetivo(objetivo: schemas.ObjetivoFormularioCreate, db: Session = De
     return crud.create_objetivo(db, objetivo)
 
 @app.get("/objetivos/", response_model=list[schemas.ObjetivoFormulario], tags=["objetivos"])
-def read_objetivos(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_objetivos(db, skip=skip, limit=limit)
+def read_objetivos(skip: int = 0, limit: int = 100, cursor: str | None = None, id_formulario: int | None = None, fields: list[str] | None = Depends(fields_query(schemas.ObjetivoFormulario)), db: Session = Depends(get_db)):
+    objetivos = crud.get_objetivos(db, skip=skip, limit=limit, after_id=decode_cursor(cursor), id_formulario=id_formulario, fields=fields)
+    response = FastJSONResponse(objetivos)
+    set_next_cursor(response, objetivos, "id_objetivo", limit)
+    return response
+
+@app.post("/objetivos/bulk", response_model=schemas.ObjetivoFormularioBulkResult, tags=["objetivos"])
+def create_objetivos(objetivos: list[dict], db: Session = Depends(get_db)):
+    check_bulk_size(objetivos)
+    return crud.create_objetivos(db, objetivos)
+
+@app.put("/objetivos/bulk", response_model=schemas.ObjetivoFormularioBulkResult, tags=["objetivos"])
+def update_objetivos(objetivos: list[dict], db: Session = Depends(get_db)):
+    check_bulk_size(objetivos)
+    return crud.update_objetivos(db, objetivos)
+
+@app.delete("/objetivos/bulk", response_model=schemas.ObjetivoFormularioBulkResult, tags=["objetivos"])
+def delete_objetivos(ids: list[int] = Query(...), db: Session = Depends(get_db)):
+    check_bulk_size(ids)
+    return crud.delete_objetivos(db, ids)
 
 @app.get("/objetivos/{objetivo_id}", response_model=schemas.ObjetivoFormulario, tags=["objetivos"])
 def read_objetivo(objetivo_id: int, db: Session = Depends(get_db)):
@@ -87,6 +229,13 @@ def update_objetivo(objetivo_id: int, objetivo: schemas.ObjetivoFormularioCreate
         raise HTTPException(status_code=404, detail="Objetivo no encontrado")
     return db_objetivo
 
+@app.patch("/objetivos/{objetivo_id}", response_model=schemas.ObjetivoFormulario, tags=["objetivos"])
+def patch_objetivo(objetivo_id: int, objetivo: schemas.ObjetivoFormularioUpdate, db: Session = Depends(get_db)):
+    db_objetivo = crud.patch_objetivo(db, objetivo_id, objetivo)
+    if db_objetivo is None:
+        raise HTTPException(status_code=404, detail="Objetivo no encontrado")
+    return db_objetivo
+
 @app.delete("/objetivos/{objetivo_id}", response_model=schemas.ObjetivoFormulario, tags=["objetivos"])
 def delete_objetivo(objetivo_id: int, db: Session = Depends(get_db)):
     db_objetivo = crud.delete_objetivo(db, objetivo_id)
@@ -99,8 +248,26 @@ def create_participante(participante: schemas.ParticipanteFormularioCreate, db:
     return crud.create_participante(db, participante)
 
 @app.get("/participantes/", response_model=list[schemas.ParticipanteFormulario], tags=["participantes"])
-def read_participantes(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_participantes(db, skip=skip, limit=limit)
+def read_participantes(skip: int = 0, limit: int = 100, cursor: str | None = None, id_formulario: int | None = None, fields: list[str] | None = Depends(fields_query(schemas.ParticipanteFormulario)), db: Session = Depends(get_db)):
+    participantes = crud.get_participantes(db, skip=skip, limit=limit, after_id=decode_cursor(cursor), id_formulario=id_formulario, fields=fields)
+    response = FastJSONResponse(participantes)
+    set_next_cursor(response, participantes, "id_participante", limit)
+    return response
+
+@app.post("/participantes/bulk", response_model=schemas.ParticipanteFormularioBulkResult, tags=["participantes"])
+def create_participantes(participantes: list[dict], db: Session = Depends(get_db)):
+    check_bulk_size(participantes)
+    return crud.create_participantes(db, participantes)
+
+@app.put("/participantes/bulk", response_model=schemas.ParticipanteFormularioBulkResult, tags=["participantes"])
+def update_participantes(participantes: list[dict], db: Session = Depends(get_db)):
+    check_bulk_size(participantes)
+    return crud.update_participantes(db, participantes)
+
+@app.delete("/participantes/bulk", response_model=schemas.ParticipanteFormularioBulkResult, tags=["participantes"])
+def delete_participantes(ids: list[int] = Query(...), db: Session = Depends(get_db)):
+    check_bulk_size(ids)
+    return crud.delete_participantes(db, ids)
 
 @app.get("/participantes/{participante_id}", response_model=schemas.ParticipanteFormulario, tags=["participantes"])
 def read_participante(participante_id: int, db: Session = Depends(get_db)):
@@ -109,6 +276,10 @@ def read_participante(participante_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Participante no encontrado")
     return db_participante
 
+@app.get("/participantes/{participante_id}/firma", tags=["participantes"])
+def read_participante_firma(participante_id: int, request: Request, v: str | None = None, db: Session = Depends(get_db)):
+    return firmas.response(db, participante_id, request, version=v)
+
 @app.put("/participantes/{participante_id}", response_model=schemas.ParticipanteFormulario, tags=["participantes"])
 def update_participante(participante_id: int, participante: schemas.ParticipanteFormularioCreate, db: Session = Depends(get_db)):
     db_participante = crud.update_participante(db, participante_id, participante)
@@ -116,6 +287,13 @@ def update_participante(participante_id: int, participante: schemas.Participante
         raise HTTPException(status_code=404, detail="Participante no encontrado")
     return db_participante
 
+@app.patch("/participantes/{participante_id}", response_model=schemas.ParticipanteFormulario, tags=["participantes"])
+def patch_participante(participante_id: int, participante: schemas.ParticipanteFormularioUpdate, db: Session = Depends(get_db)):
+    db_participante = crud.patch_participante(db, participante_id, participante)
+    if db_participante is None:
+        raise HTTPException(status_code=404, detail="Participante no encontrado")
+    return db_participante
+
 @app.delete("/participantes/{participante_id}", response_model=schemas.ParticipanteFormulario, tags=["participantes"])
 def delete_participante(participante_id: int, db: Session = Depends(get_db)):
     db_participante = crud.delete_participante(db, participante_id)
@@ -128,8 +306,11 @@ def create_metodologia(metodologia: schemas.MetodologiaCreate, db: Session = Dep
     return crud.create_metodologia(db, metodologia)
 
 @app.get("/metodologias/", response_model=list[schemas.Metodologia], tags=["metodologias"])
-def read_metodologias(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_metodologias(db, skip=skip, limit=limit)
+def read_metodologias(skip: int = 0, limit: int = 100, cursor: str | None = None, fields: list[str] | None = Depends(fields_query(schemas.Metodologia)), db: Session = Depends(get_db)):
+    metodologias = crud.get_metodologias(db, skip=skip, limit=limit, after_id=decode_cursor(cursor), fields=fields)
+    response = FastJSONResponse(metodologias)
+    set_next_cursor(response, metodologias, "id_metodologia", limit)
+    return response
 
 @app.get("/metodologias/{metodologia_id}", response_model=schemas.Metodologia, tags=["metodologias"])
 def read_metodologia(metodologia_id: int, db: Session = Depends(get_db)):
@@ -145,9 +326,44 @@ def update_metodologia(metodologia_id: int, metodologia: schemas.MetodologiaCrea
         raise HTTPException(status_code=404, detail="Metodología no encontrada")
     return db_metodologia
 
+@app.patch("/metodologias/{metodologia_id}", response_model=schemas.Metodologia, tags=["metodologias"])
+def patch_metodologia(metodologia_id: int, metodologia: schemas.MetodologiaUpdate, db: Session = Depends(get_db)):
+    db_metodologia = crud.patch_metodologia(db, metodologia_id, metodologia)
+    if db_metodologia is None:
+        raise HTTPException(status_code=404, detail="Metodología no encontrada")
+    return db_metodologia
+
 @app.delete("/metodologias/{metodologia_id}", response_model=schemas.Metodologia, tags=["metodologias"])
 def delete_metodologia(metodologia_id: int, db: Session = Depends(get_db)):
     db_metodologia = crud.delete_metodologia(db, metodologia_id)
     if db_metodologia is None:
         raise HTTPException(status_code=404, detail="Metodología no encontrada")
     return db_metodologia
+
+@app.get("/estadisticas/formularios", response_model=schemas.EstadisticasFormularios, tags=["estadisticas"])
+def read_estadisticas_formularios(
+    por: Literal["empresa", "metodologia", "ciudad", "usuario", "mes"] = "empresa",
+    fuente: Literal["auto", "directo", "resumen"] = "auto",
+    filtros: schemas.FormularioFiltro = Depends(),
+    db: Session = Depends(get_db),
+):
+    return stats.formularios_por(db, por, filtros, fuente)
+
+@app.get("/estadisticas/objetivos", response_model=schemas.EstadisticasObjetivos, tags=["estadisticas"])
+def read_estadisticas_objetivos(filtros: schemas.FormularioFiltro = Depends(), db: Session = Depends(get_db)):
+    return stats.objetivos_por_formulario(db, filtros)
+
+@app.post("/estadisticas/refrescar", response_model=schemas.EstadoResumen, tags=["estadisticas"])
+def refresh_estadisticas(db: Session = Depends(get_db)):
+    refrescado = stats.refresh_summary(db)
+    return {"actualizado": stats.summary_updated(db), "refrescado": refrescado}
+
+@app.get("/buscar", response_model=list[schemas.ResultadoBusqueda], tags=["buscar"])
+def buscar(
+    q: str = Query(..., min_length=1, max_length=200),
+    tipo: Literal["formulario", "objetivo", "metodologia"] | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+):
+    return FastJSONResponse(search_index.search(db, q, tipo, skip, limit))
@@ -0,0 +1,216 @@
+"""
+Async FastAPI application entry point.
+
+Serves the CRUD endpoints of the forms management service through the async database engine.
+Every other route is taken from `app.main`, so both entry points expose the same API.
+Dependencies: FastAPI, SQLAlchemy asyncio extension, calidad_core, application async CRUD, models, and schemas.
+"""
+from fastapi import APIRouter, FastAPI, Depends, HTTPException
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+from calidad_core.auth import require_token
+from calidad_core.database import pool_status, register_create_all, register_dispose
+from calidad_core.health import ReadinessProbe
+from calidad_core.responses import FastJSONResponse
+from calidad_core.pagination import decode_cursor, fields_query, set_next_cursor
+from .database_async import async_engine, get_async_db
+from .models import Base
+from . import crud_async, references, schemas
+from . import main as sync_main
+
+router = APIRouter(dependencies=[Depends(require_token)])
+
+readiness = ReadinessProbe(async_engine)
+
+@router.get("/health/ready", tags=["health"])
+async def read_readiness():
+    return await readiness.response()
+
+@router.get("/debug/pool", tags=["debug"])
+async def read_pool_status():
+    return pool_status(async_engine.pool)
+
+@router.post("/formularios/", response_model=schemas.Formulario, tags=["formularios"])
+async def create_formulario(formulario: schemas.FormularioCreate, db: AsyncSession = Depends(get_async_db)):
+    await references.validate(formulario.dict())
+    return await crud_async.create_formulario(db, formulario)
+
+@router.get("/formularios/", response_model=list[schemas.FormularioConReferencias], tags=["formularios"])
+async def read_formularios(skip: int = 0, limit: int = 100, cursor: str | None = None, filtros: schemas.FormularioFiltro = Depends(), expand: list[str] = Depends(references.expand_query), fields: list[str] | None = Depends(fields_query(schemas.Formulario)), db: AsyncSession = Depends(get_async_db)):
+    formularios = await crud_async.get_formularios(db, skip=skip, limit=limit, after_id=decode_cursor(cursor), filtros=filtros, fields=references.with_id_fields(fields, expand))
+    await references.expand(formularios, expand)
+    response = FastJSONResponse(formularios)
+    set_next_cursor(response, formularios, "id_formulario", limit)
+    return response
+
+@router.get("/formularios/{formulario_id}", response_model=schemas.Formulario, tags=["formularios"])
+async def read_formulario(formulario_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_formulario = await crud_async.get_formulario(db, formulario_id=formulario_id)
+    if db_formulario is None:
+        raise HTTPException(status_code=404, detail="Formulario no encontrado")
+    return db_formulario
+
+@router.put("/formularios/{formulario_id}", response_model=schemas.Formulario, tags=["formularios"])
+async def update_formulario(formulario_id: int, formulario: schemas.FormularioCreate, db: AsyncSession = Depends(get_async_db)):
+    await references.validate(formulario.dict())
+    db_formulario = await crud_async.update_formulario(db, formulario_id, formulario)
+    if db_formulario is None:
+        raise HTTPException(status_code=404, detail="Formulario no encontrado")
+    return db_formulario
+
+@router.patch("/formularios/{formulario_id}", response_model=schemas.Formulario, tags=["formularios"])
+async def patch_formulario(formulario_id: int, formulario: schemas.FormularioUpdate, db: AsyncSession = Depends(get_async_db)):
+    await references.validate(formulario.dict(exclude_unset=True))
+    db_formulario = await crud_async.patch_formulario(db, formulario_id, formulario)
+    if db_formulario is None:
+        raise HTTPException(status_code=404, detail="Formulario no encontrado")
+    return db_formulario
+
+@router.delete("/formularios/{formulario_id}", response_model=schemas.Formulario, tags=["formularios"])
+async def delete_formulario(formulario_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_formulario = await crud_async.delete_formulario(db, formulario_id)
+    if db_formulario is None:
+        raise HTTPException(status_code=404, detail="Formulario no encontrado")
+    return db_formulario
+
+@router.post("/objetivos/", response_model=schemas.ObjetivoFormulario, tags=["objetivos"])
+async def create_objetivo(objetivo: schemas.ObjetivoFormularioCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.create_objetivo(db, objetivo)
+
+@router.get("/objetivos/", response_model=list[schemas.ObjetivoFormulario], tags=["objetivos"])
+async def read_objetivos(skip: int = 0, limit: int = 100, cursor: str | None = None, id_formulario: int | None = None, fields: list[str] | None = Depends(fields_query(schemas.ObjetivoFormulario)), db: AsyncSession = Depends(get_async_db)):
+    objetivos = await crud_async.get_objetivos(db, skip=skip, limit=limit, after_id=decode_cursor(cursor), id_formulario=id_formulario, fields=fields)
+    response = FastJSONResponse(objetivos)
+    set_next_cursor(response, objetivos, "id_objetivo", limit)
+    return response
+
+@router.get("/objetivos/{objetivo_id}", response_model=schemas.ObjetivoFormulario, tags=["objetivos"])
+async def read_objetivo(objetivo_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_objetivo = await crud_async.get_objetivo(db, objetivo_id=objetivo_id)
+    if db_objetivo is None:
+        raise HTTPException(status_code=404, detail="Objetivo no encontrado")
+    return db_objetivo
+
+@router.put("/objetivos/{objetivo_id}", response_model=schemas.ObjetivoFormulario, tags=["objetivos"])
+async def update_objetivo(objetivo_id: int, objetivo: schemas.ObjetivoFormularioCreate, db: AsyncSession = Depends(get_async_db)):
+    db_objetivo = await crud_async.update_objetivo(db, objetivo_id, objetivo)
+    if db_objetivo is None:
+        raise HTTPException(status_code=404, detail="Objetivo no encontrado")
+    return db_objetivo
+
+@router.patch("/objetivos/{objetivo_id}", response_model=schemas.ObjetivoFormulario, tags=["objetivos"])
+async def patch_objetivo(objetivo_id: int, objetivo: schemas.ObjetivoFormularioUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_objetivo = await crud_async.patch_objetivo(db, objetivo_id, objetivo)
+    if db_objetivo is None:
+        raise HTTPException(status_code=404, detail="Objetivo no encontrado")
+    return db_objetivo
+
+@router.delete("/objetivos/{objetivo_id}", response_model=schemas.ObjetivoFormulario, tags=["objetivos"])
+async def delete_objetivo(objetivo_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_objetivo = await crud_async.delete_objetivo(db, objetivo_id)
+    if db_objetivo is None:
+        raise HTTPException(status_code=404, detail="Objetivo no encontrado")
+    return db_objetivo
+
+@router.post("/participantes/", response_model=schemas.ParticipanteFormulario, tags=["participantes"])
+async def create_participante(participante: schemas.ParticipanteFormularioCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.create_participante(db, participante)
+
+@router.get("/participantes/", response_model=list[schemas.ParticipanteFormulario], tags=["participantes"])
+async def read_participantes(skip: int = 0, limit: int = 100, cursor: str | None = None, id_formulario: int | None = None, fields: list[str] | None = Depends(fields_query(schemas.ParticipanteFormulario)), db: AsyncSession = Depends(get_async_db)):
+    participantes = await crud_async.get_participantes(db, skip=skip, limit=limit, after_id=decode_cursor(cursor), id_formulario=id_formulario, fields=fields)
+    response = FastJSONResponse(participantes)
+    set_next_cursor(response, participantes, "id_participante", limit)
+    return response
+
+@router.get("/participantes/{participante_id}", response_model=schemas.ParticipanteFormulario, tags=["participantes"])
+async def read_participante(participante_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_participante = await crud_async.get_participante(db, participante_id=participante_id)
+    if db_participante is None:
+        raise HTTPException(status_code=404, detail="Participante no encontrado")
+    return db_participante
+
+@router.put("/participantes/{participante_id}", response_model=schemas.ParticipanteFormulario, tags=["participantes"])
+async def update_participante(participante_id: int, participante: schemas.ParticipanteFormularioCreate, db: AsyncSession = Depends(get_async_db)):
+    db_participante = await crud_async.update_participante(db, participante_id, participante)
+    if db_participante is None:
+        raise HTTPException(status_code=404, detail="Participante no encontrado")
+    return db_participante
+
+@router.patch("/participantes/{participante_id}", response_model=schemas.ParticipanteFormulario, tags=["participantes"])
+async def patch_participante(participante_id: int, participante: schemas.ParticipanteFormularioUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_participante = await crud_async.patch_participante(db, participante_id, participante)
+    if db_participante is None:
+        raise HTTPException(status_code=404, detail="Participante no encontrado")
+    return db_participante
+
+@router.delete("/participantes/{participante_id}", response_model=schemas.ParticipanteFormulario, tags=["participantes"])
+async def delete_participante(participante_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_participante = await crud_async.delete_participante(db, participante_id)
+    if db_participante is None:
+        raise HTTPException(status_code=404, detail="Participante no encontrado")
+    return db_participante
+
+@router.post("/metodologias/", response_model=schemas.Metodologia, tags=["metodologias"])
+async def create_metodologia(metodologia: schemas.MetodologiaCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.create_metodologia(db, metodologia)
+
+@router.get("/metodologias/", response_model=list[schemas.Metodologia], tags=["metodologias"])
+async def read_metodologias(skip: int = 0, limit: int = 100, cursor: str | None = None, fields: list[str] | None = Depends(fields_query(schemas.Metodologia)), db: AsyncSession = Depends(get_async_db)):
+    metodologias = await crud_async.get_metodologias(db, skip=skip, limit=limit, after_id=decode_cursor(cursor), fields=fields)
+    response = FastJSONResponse(metodologias)
+    set_next_cursor(response, metodologias, "id_metodologia", limit)
+    return response
+
+@router.get("/metodologias/{metodologia_id}", response_model=schemas.Metodologia, tags=["metodologias"])
+async def read_metodologia(metodologia_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_metodologia = await crud_async.get_metodologia(db, metodologia_id=metodologia_id)
+    if db_metodologia is None:
+        raise HTTPException(status_code=404, detail="Metodología no encontrada")
+    return db_metodologia
+
+@router.put("/metodologias/{metodologia_id}", response_model=schemas.Metodologia, tags=["metodologias"])
+async def update_metodologia(metodologia_id: int, metodologia: schemas.MetodologiaCreate, db: AsyncSession = Depends(get_async_db)):
+    db_metodologia = await crud_async.update_metodologia(db, metodologia_id, metodologia)
+    if db_metodologia is None:
+        raise HTTPException(status_code=404, detail="Metodología no encontrada")
+    return db_metodologia
+
+@router.patch("/metodologias/{metodologia_id}", response_model=schemas.Metodologia, tags=["metodologias"])
+async def patch_metodologia(metodologia_id: int, metodologia: schemas.MetodologiaUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_metodologia = await crud_async.patch_metodologia(db, metodologia_id, metodologia)
+    if db_metodologia is None:
+        raise HTTPException(status_code=404, detail="Metodología no encontrada")
+    return db_metodologia
+
+@router.delete("/metodologias/{metodologia_id}", response_model=schemas.Metodologia, tags=["metodologias"])
+async def delete_metodologia(metodologia_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_metodologia = await crud_async.delete_metodologia(db, metodologia_id)
+    if db_metodologia is None:
+        raise HTTPException(status_code=404, detail="Metodología no encontrada")
+    return db_metodologia
+
+
+def _route_key(route: APIRoute):
+    return route.path, frozenset(route.methods)
+
+
+app = FastAPI()
+app.user_middleware = list(sync_main.app.user_middleware)
+
+_async_routes = {_route_key(route): route for route in router.routes}
+for route in sync_main.app.routes:
+    if isinstance(route, APIRoute):
+        app.router.routes.append(_async_routes.get(_route_key(route), route))
+
+register_create_all(app, Base.metadata, async_engine)
+# Routes taken from `app.main` still use the sync engine.
+register_dispose(app, async_engine)
+register_dispose(app, sync_main.engine)
+
+# Writes through the async engine also make the statistics summary and the search index stale.
+sync_main.summary_refresher.track(async_engine.sync_engine)
+sync_main.search_index.track(async_engine.sync_engine)
+app.router.add_event_handler("startup", sync_main.summary_refresher.start)
+app.router.add_event_handler("shutdown", sync_main.summary_refresher.stop)
+app.router.add_event_handler("shutdown", references.close)
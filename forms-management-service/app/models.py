@@ -4,38 +4,114 @@ SQLAlchemy ORM models for the application.
 Defines the database schema for the main entities used in the forms management service.
 Dependencies: SQLAlchemy.
 """
-from sqlalchemy import Column, Integer, String, Date, Text
+from sqlalchemy import Column, DDL, ForeignKey, Integer, LargeBinary, String, Date, DateTime, Text, Index, event, func, text
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship
 
 Base = declarative_base()
 
 class Formulario(Base):
     __tablename__ = "formulario"
+    __table_args__ = (
+        # Covers filtering by company alone and company reports over a date range.
+        Index("ix_formulario_id_empresa_fecha", "id_empresa", "fecha"),
+    )
     id_formulario = Column(Integer, primary_key=True, index=True)
     id_empresa = Column(Integer, nullable=False)
-    fecha = Column(Date, nullable=False)
-    ciudad = Column(String(100))
+    fecha = Column(Date, nullable=False, index=True)
+    ciudad = Column(String(100), index=True)
     nombre_software = Column(String(100))
-    id_usuario = Column(Integer, nullable=False)
-    id_metodologia = Column(Integer, nullable=False)
+    id_usuario = Column(Integer, nullable=False, index=True)
+    id_metodologia = Column(Integer, nullable=False, index=True)
+
+    # Forms and their children carry no foreign keys, so the joins are declared explicitly.
+    # passive_deletes="all" keeps children untouched when a form is deleted.
+    objetivos = relationship(
+        "ObjetivoFormulario",
+        primaryjoin="Formulario.id_formulario == foreign(ObjetivoFormulario.id_formulario)",
+        order_by="ObjetivoFormulario.id_objetivo",
+        passive_deletes="all",
+    )
+    participantes = relationship(
+        "ParticipanteFormulario",
+        primaryjoin="Formulario.id_formulario == foreign(ParticipanteFormulario.id_formulario)",
+        order_by="ParticipanteFormulario.id_participante",
+        passive_deletes="all",
+    )
+    metodologia = relationship(
+        "Metodologia",
+        primaryjoin="foreign(Formulario.id_metodologia) == Metodologia.id_metodologia",
+        viewonly=True,
+    )
 
 class ObjetivoFormulario(Base):
     __tablename__ = "objetivos_formulario"
     id_objetivo = Column(Integer, primary_key=True, index=True)
-    id_formulario = Column(Integer, nullable=False)
+    id_formulario = Column(Integer, nullable=False, index=True)
     descripcion = Column(Text, nullable=False)
     tipo = Column(String(20)) 
 
 class ParticipanteFormulario(Base):
     __tablename__ = "participantes_formulario"
     id_participante = Column(Integer, primary_key=True, index=True)
-    id_formulario = Column(Integer, nullable=False)
+    id_formulario = Column(Integer, nullable=False, index=True)
     cargo = Column(String(100))
     nombre = Column(String(255))
-    firma = Column(Text)
+    # SHA-256 of the signature in `firmas`; the content itself stays out of participant rows.
+    firma_hash = Column(String(64), ForeignKey("firmas.hash", name="fk_participantes_formulario_firma_hash"), index=True)
+
+class Firma(Base):
+    """Signature content, stored once per distinct content; see `app.firmas`."""
+    __tablename__ = "firmas"
+    hash = Column(String(64), primary_key=True)
+    media_type = Column(String(100), nullable=False)
+    tamano = Column(Integer, nullable=False)
+    # "zlib" or "identity" (already compressed formats such as PNG are kept as they are).
+    codificacion = Column(String(10), nullable=False)
+    contenido = Column(LargeBinary, nullable=False)
 
 class Metodologia(Base):
     __tablename__ = "metodologias"
     id_metodologia = Column(Integer, primary_key=True, index=True)
     nombre = Column(String(100), nullable=False)
-    descripcion = Column(Text)
\ No newline at end of file
+    descripcion = Column(Text)
+
+# Full-text search indexes, PostgreSQL only. `app.search` queries the same expressions so the planner uses them.
+SEARCH_CONFIG = text("'spanish'::regconfig")
+objetivo_search_vector = postgresql.to_tsvector(SEARCH_CONFIG, ObjetivoFormulario.descripcion)
+metodologia_search_vector = postgresql.to_tsvector(
+    SEARCH_CONFIG, Metodologia.nombre + " " + func.coalesce(Metodologia.descripcion, "")
+)
+POSTGRESQL_ONLY = {"dialect": "postgresql"}
+Index("ix_objetivos_formulario_descripcion_fts", objetivo_search_vector, postgresql_using="gin", info=POSTGRESQL_ONLY).ddl_if(dialect="postgresql")
+Index("ix_metodologias_fts", metodologia_search_vector, postgresql_using="gin", info=POSTGRESQL_ONLY).ddl_if(dialect="postgresql")
+# Trigram index: software names match on any substring, e.g. "erp" in "SAP-ERP".
+Index(
+    "ix_formulario_nombre_software_trgm",
+    Formulario.nombre_software,
+    postgresql_using="gin",
+    postgresql_ops={"nombre_software": "gin_trgm_ops"},
+    info=POSTGRESQL_ONLY,
+).ddl_if(dialect="postgresql")
+event.listen(
+    Formulario.__table__, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql")
+)
+
+class ResumenFormulario(Base):
+    """Forms and objectives per month for each value of one dimension; rebuilt by `app.stats`."""
+    __tablename__ = "resumen_formularios"
+    __table_args__ = (
+        Index("ix_resumen_formularios_dimension_clave_mes", "dimension", "clave", "mes"),
+    )
+    id_resumen = Column(Integer, primary_key=True)
+    dimension = Column(String(20), nullable=False)
+    clave = Column(String(100))
+    mes = Column(String(7), nullable=False)
+    formularios = Column(Integer, nullable=False)
+    objetivos = Column(Integer, nullable=False)
+
+class ResumenEstado(Base):
+    __tablename__ = "resumen_estado"
+    nombre = Column(String(50), primary_key=True)
+    actualizado = Column(DateTime, nullable=False)
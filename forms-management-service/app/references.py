@@ -0,0 +1,97 @@
+"""
+Empresa and usuario references.
+
+Forms store `id_empresa` and `id_usuario` owned by the users service. `?expand=empresa,usuario` embeds
+those rows in form lists with one batched lookup per resource instead of one request per form, and
+`VALIDATE_REFERENCES` rejects writes pointing at rows the users service does not know.
+Dependencies: FastAPI, calidad_core.client.
+"""
+import asyncio
+import os
+
+from fastapi import HTTPException, Query
+
+from calidad_core.client import ServiceClient, ServiceUnavailable
+
+
+USERS_SERVICE_URL = os.getenv("USERS_SERVICE_URL")
+VALIDATE_REFERENCES = os.getenv("VALIDATE_REFERENCES", "false").lower() == "true"
+
+# Reference: (id field in the form, users service resource, fields embedded in the form).
+REFERENCES = {
+    "empresa": ("id_empresa", "empresas", ("id_empresa", "nombre", "telefono")),
+    "usuario": ("id_usuario", "usuarios", ("id_usuario", "correo", "nombre", "rol")),
+}
+NOT_FOUND = {"empresa": "Empresa no encontrada", "usuario": "Usuario no encontrado"}
+
+client = (
+    ServiceClient(
+        USERS_SERVICE_URL,
+        {resource: id_field for id_field, resource, _ in REFERENCES.values()},
+        service_name="forms-management-service",
+        fields={resource: embedded for _, resource, embedded in REFERENCES.values()},
+    )
+    if USERS_SERVICE_URL
+    else None
+)
+
+
+def expand_query(
+    expand: str | None = Query(None, description="Referencias a incluir, separadas por comas: empresa, usuario"),
+) -> list[str]:
+    """Parses `?expand=empresa,usuario`."""
+    fields = list(dict.fromkeys(field.strip() for field in (expand or "").split(",") if field.strip()))
+    unknown = [field for field in fields if field not in REFERENCES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"expand inválido: {', '.join(unknown)}")
+    return fields
+
+
+def with_id_fields(fields: list[str] | None, expand: list[str]) -> list[str] | None:
+    """`?fields=` plus the id fields the requested expansions read."""
+    if fields is None:
+        return None
+    return fields + [REFERENCES[field][0] for field in expand if REFERENCES[field][0] not in fields]
+
+
+def _client() -> ServiceClient:
+    if client is None:
+        raise HTTPException(status_code=503, detail="Servicio de usuarios no configurado")
+    return client
+
+
+async def _lookup(field: str, ids) -> dict[int, dict]:
+    _, resource, _ = REFERENCES[field]
+    try:
+        return await _client().get_many(resource, ids)
+    except ServiceUnavailable:
+        raise HTTPException(status_code=503, detail="Servicio de usuarios no disponible")
+
+
+async def expand(rows: list[dict], fields: list[str]) -> list[dict]:
+    """Embeds the requested references in each row; a reference the users service does not know is null."""
+    if not fields or not rows:
+        return rows
+    lookups = await asyncio.gather(*(_lookup(field, [row[REFERENCES[field][0]] for row in rows]) for field in fields))
+    for field, found in zip(fields, lookups):
+        id_field, _, embedded = REFERENCES[field]
+        public = {obj_id: {key: row.get(key) for key in embedded} for obj_id, row in found.items()}
+        for row in rows:
+            row[field] = public.get(row[id_field])
+    return rows
+
+
+async def validate(values: dict):
+    """With `VALIDATE_REFERENCES`, 422 when an `id_empresa` or `id_usuario` in `values` does not exist."""
+    if not VALIDATE_REFERENCES:
+        return
+    fields = [field for field, (id_field, _, _) in REFERENCES.items() if values.get(id_field) is not None]
+    lookups = await asyncio.gather(*(_lookup(field, [values[REFERENCES[field][0]]]) for field in fields))
+    for field, found in zip(fields, lookups):
+        if not found:
+            raise HTTPException(status_code=422, detail=NOT_FOUND[field])
+
+
+async def close():
+    if client is not None:
+        await client.aclose()
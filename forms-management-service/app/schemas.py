@@ -5,7 +5,7 @@ Defines data validation and serialization for the main entities in the forms man
 Dependencies: Pydantic.
 """
 from pydantic import BaseModel
-from datetime import date
+from datetime import date, datetime
 
 
 class FormularioBase(BaseModel):
@@ -20,11 +20,42 @@ class FormularioBase(BaseModel):
 class FormularioCreate(FormularioBase):
     pass
 
+class FormularioUpdate(BaseModel):
+    id_empresa: int | None = None
+    fecha: date | None = None
+    ciudad: str | None = None
+    nombre_software: str | None = None
+    id_usuario: int | None = None
+    id_metodologia: int | None = None
+
 class Formulario(FormularioBase):
     id_formulario: int
     class Config:
         orm_mode = True
 
+class FormularioConReferencias(Formulario):
+    empresa: dict | None = None
+    usuario: dict | None = None
+
+class FormularioFiltro(BaseModel):
+    id_empresa: int | None = None
+    id_usuario: int | None = None
+    id_metodologia: int | None = None
+    ciudad: str | None = None
+    desde: date | None = None
+    hasta: date | None = None
+
+class FormularioBulkUpdate(FormularioCreate):
+    id_formulario: int
+
+class BulkError(BaseModel):
+    index: int
+    detail: str
+
+class FormularioBulkResult(BaseModel):
+    items: list[Formulario] = []
+    errors: list[BulkError] = []
+
 class ObjetivoFormularioBase(BaseModel):
     id_formulario: int
     descripcion: str
@@ -32,26 +63,52 @@ class ObjetivoFormularioBase(BaseModel):
 
 class ObjetivoFormularioCreate(ObjetivoFormularioBase):
     pass
+
+class ObjetivoFormularioUpdate(BaseModel):
+    id_formulario: int | None = None
+    descripcion: str | None = None
+    tipo: str | None = None
     
 class ObjetivoFormulario(ObjetivoFormularioBase):
     id_objetivo: int
     class Config:
         orm_mode = True
 
+class ObjetivoFormularioBulkUpdate(ObjetivoFormularioCreate):
+    id_objetivo: int
+
+class ObjetivoFormularioBulkResult(BaseModel):
+    items: list[ObjetivoFormulario] = []
+    errors: list[BulkError] = []
+
 class ParticipanteFormularioBase(BaseModel):
     id_formulario: int
     cargo: str | None = None
     nombre: str | None = None
-    firma: str | None = None
 
 class ParticipanteFormularioCreate(ParticipanteFormularioBase):
-    pass
+    # Base64 image, optionally a `data:` URI; stored apart and answered as `firma_hash`.
+    firma: str | None = None
+
+class ParticipanteFormularioUpdate(BaseModel):
+    id_formulario: int | None = None
+    cargo: str | None = None
+    nombre: str | None = None
+    firma: str | None = None
 
 class ParticipanteFormulario(ParticipanteFormularioBase):
     id_participante: int
+    firma_hash: str | None = None
     class Config:
         orm_mode = True
 
+class ParticipanteFormularioBulkUpdate(ParticipanteFormularioCreate):
+    id_participante: int
+
+class ParticipanteFormularioBulkResult(BaseModel):
+    items: list[ParticipanteFormulario] = []
+    errors: list[BulkError] = []
+
 class MetodologiaBase(BaseModel):
     nombre: str
     descripcion: str | None = None
@@ -59,7 +116,73 @@ class MetodologiaBase(BaseModel):
 class MetodologiaCreate(MetodologiaBase):
     pass
 
+class MetodologiaUpdate(BaseModel):
+    nombre: str | None = None
+    descripcion: str | None = None
+
 class Metodologia(MetodologiaBase):
     id_metodologia: int
     class Config:
         orm_mode = True
+
+class ObjetivoCompletoCreate(BaseModel):
+    descripcion: str
+    tipo: str
+
+class ParticipanteCompletoCreate(BaseModel):
+    cargo: str | None = None
+    nombre: str | None = None
+    firma: str | None = None
+
+class FormularioCompletoCreate(FormularioCreate):
+    objetivos: list[ObjetivoCompletoCreate] = []
+    participantes: list[ParticipanteCompletoCreate] = []
+
+class FormularioCompleto(Formulario):
+    metodologia: Metodologia | None = None
+    objetivos: list[ObjetivoFormulario] = []
+    participantes: list[ParticipanteFormulario] = []
+
+class ImportRowError(BaseModel):
+    line: int
+    detail: str
+
+class ImportResult(BaseModel):
+    total: int = 0
+    imported: int = 0
+    rejected: int = 0
+    errors: list[ImportRowError] = []
+
+class EstadisticaGrupo(BaseModel):
+    clave: int | str | None
+    formularios: int
+    objetivos: int
+
+class EstadisticasFormularios(BaseModel):
+    por: str
+    fuente: str
+    actualizado: datetime | None = None
+    formularios: int
+    objetivos: int
+    grupos: list[EstadisticaGrupo] = []
+
+class DistribucionObjetivos(BaseModel):
+    objetivos: int
+    formularios: int
+
+class EstadisticasObjetivos(BaseModel):
+    formularios: int
+    objetivos: int
+    promedio: float
+    distribucion: list[DistribucionObjetivos] = []
+
+class EstadoResumen(BaseModel):
+    actualizado: datetime | None = None
+    refrescado: bool
+
+class ResultadoBusqueda(BaseModel):
+    tipo: str
+    id: int
+    id_formulario: int | None = None
+    texto: str | None = None
+    rank: float
@@ -0,0 +1,272 @@
+"""
+Full-text search.
+
+Searches objective and methodology descriptions and software names. On PostgreSQL the queries use the
+`to_tsvector` GIN indexes and the `pg_trgm` index declared in `app.models`, ranked with `ts_rank` and
+`similarity`. Other databases (the SQLite stand-in) are served by an in-process inverted index that each
+worker builds on its first search and rebuilds in the background after writes.
+Dependencies: SQLAlchemy, application models.
+"""
+import heapq
+import logging
+import math
+import os
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from sqlalchemy import Integer, String, cast, event, func, literal, null, select, union_all
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from . import models
+
+
+# Age after which the in-process index is rebuilt even without local writes (other workers may have written).
+SEARCH_INDEX_MAX_AGE = float(os.getenv("SEARCH_INDEX_MAX_AGE", "300"))
+
+TIPOS = ("formulario", "objetivo", "metodologia")
+TRACKED_TABLES = {"formulario", "objetivos_formulario", "metodologias"}
+# Words PostgreSQL's `spanish` configuration drops as well; they would match almost every row.
+STOPWORDS = frozenset(
+    "a al con de del el en es la las lo los o para por que se su sus un una unos unas y".split()
+)
+BUILD_BATCH_SIZE = 10000
+# BM25 parameters.
+K1 = 1.2
+B = 0.75
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+_FOLD = str.maketrans("áàäâéèëêíìïîóòöôúùüûñç", "aaaaeeeeiiiioooouuuunc")
+
+Formulario = models.Formulario
+Objetivo = models.ObjetivoFormulario
+Metodologia = models.Metodologia
+METODOLOGIA_TEXT = Metodologia.nombre + " " + func.coalesce(Metodologia.descripcion, "")
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Lowercase, accent-free words without stopwords."""
+    if not text:
+        return []
+    return [word for word in _WORD.findall(text.lower().translate(_FOLD)) if word not in STOPWORDS]
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _postgres_query(q: str, tipos: tuple[str, ...]):
+    query = postgresql.plainto_tsquery(models.SEARCH_CONFIG, q)
+    parts = {
+        "formulario": select(
+            literal("formulario").label("tipo"),
+            Formulario.id_formulario.label("id"),
+            Formulario.id_formulario.label("id_formulario"),
+            Formulario.nombre_software.label("texto"),
+            func.similarity(Formulario.nombre_software, q).label("rank"),
+        ).where(Formulario.nombre_software.ilike(f"%{_escape_like(q)}%", escape="\\")),
+        "objetivo": select(
+            literal("objetivo").label("tipo"),
+            Objetivo.id_objetivo.label("id"),
+            Objetivo.id_formulario.label("id_formulario"),
+            Objetivo.descripcion.label("texto"),
+            func.ts_rank(models.objetivo_search_vector, query).label("rank"),
+        ).where(models.objetivo_search_vector.bool_op("@@")(query)),
+        "metodologia": select(
+            literal("metodologia").label("tipo"),
+            Metodologia.id_metodologia.label("id"),
+            cast(null(), Integer).label("id_formulario"),
+            cast(METODOLOGIA_TEXT, String).label("texto"),
+            func.ts_rank(models.metodologia_search_vector, query).label("rank"),
+        ).where(models.metodologia_search_vector.bool_op("@@")(query)),
+    }
+    return union_all(*(parts[tipo] for tipo in tipos)).subquery()
+
+
+def search_postgres(db: Session, q: str, tipos: tuple[str, ...], skip: int, limit: int) -> list[dict]:
+    results = _postgres_query(q, tipos)
+    query = (
+        select(results)
+        .order_by(results.c.rank.desc(), results.c.tipo, results.c.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return [{**row, "rank": round(float(row["rank"]), 6)} for row in db.execute(query).mappings()]
+
+
+# Per type, in `TIPOS` order: the id, the text columns indexed, and the `id_formulario` and text returned with a hit.
+SOURCES = (
+    (Formulario.id_formulario, [Formulario.nombre_software], [Formulario.id_formulario, Formulario.nombre_software]),
+    (Objetivo.id_objetivo, [Objetivo.descripcion], [Objetivo.id_formulario, Objetivo.descripcion]),
+    (Metodologia.id_metodologia, [Metodologia.nombre, Metodologia.descripcion], [null(), METODOLOGIA_TEXT]),
+)
+
+
+class InvertedIndex:
+    """
+    Word -> documents postings for every searchable row, kept in compact arrays.
+
+    Documents are numbered in build order; each posting list is an ascending `array` of those numbers.
+    Only ids are kept: the texts of a result page are read back from the database.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.kinds = array("B")
+        self.ids = array("L")
+        self.lengths = array("H")
+        self.total_length = 0
+        self.built_at = time.monotonic()
+
+    @classmethod
+    def build(cls, db: Session) -> "InvertedIndex":
+        index = cls()
+        for kind, (id_column, text_columns, _) in enumerate(SOURCES):
+            rows = db.execute(select(id_column, *text_columns).execution_options(yield_per=BUILD_BATCH_SIZE))
+            for obj_id, *texts in rows:
+                index._add(kind, obj_id, [word for text in texts for word in tokenize(text)])
+        return index
+
+    def _add(self, kind: int, obj_id: int, words: list[str]):
+        doc = len(self.ids)
+        self.kinds.append(kind)
+        self.ids.append(obj_id)
+        self.lengths.append(min(len(words), 65535))
+        self.total_length += len(words)
+        for word in set(words):
+            posting = self.postings.get(word)
+            if posting is None:
+                posting = self.postings[word] = array("L")
+            posting.append(doc)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def match(self, terms: list[str]) -> list[int] | set[int]:
+        """Documents containing every term."""
+        postings = sorted((self.postings.get(term, ()) for term in set(terms)), key=len)
+        if not postings or not postings[0]:
+            return []
+        docs = postings[0]
+        for posting in postings[1:]:
+            if len(docs) * 16 < len(posting):
+                # Few candidates against a long posting: binary search it instead of materializing a set.
+                docs = [doc for doc in docs if (i := bisect_left(posting, doc)) < len(posting) and posting[i] == doc]
+            elif isinstance(docs, set):
+                docs.intersection_update(posting)
+            else:
+                docs = set(docs).intersection(posting)
+            if not docs:
+                return []
+        return docs
+
+    def top(self, terms: list[str], kinds: set[int] | None, n: int) -> list[tuple[float, int]]:
+        """The `n` best (score, document) pairs for documents of `kinds` (all when None) containing every term (BM25)."""
+        docs = self.match(terms)
+        if kinds is not None:
+            doc_kinds = self.kinds
+            docs = [doc for doc in docs if doc_kinds[doc] in kinds]
+        if not docs:
+            return []
+        # Every term counts once, so for a given query the score only falls with the document length:
+        # the shortest documents win, and ties keep the build (id) order.
+        best = heapq.nsmallest(n, sorted(docs) if isinstance(docs, set) else docs, key=self.lengths.__getitem__)
+        total = len(self.ids)
+        average_length = (self.total_length / total) or 1.0
+        idf = sum(
+            math.log(1 + (total - len(self.postings[term]) + 0.5) / (len(self.postings[term]) + 0.5))
+            for term in set(terms)
+        )
+        return [(idf * (K1 + 1) / (1 + K1 * (1 - B + B * self.lengths[doc] / average_length)), doc) for doc in best]
+
+
+class SearchIndex:
+    """Searches PostgreSQL directly and other databases through a per-worker `InvertedIndex`."""
+
+    def __init__(self, session_factory, max_age: float = SEARCH_INDEX_MAX_AGE):
+        self.session_factory = session_factory
+        self.max_age = max_age
+        self.index = None
+        self._stale = False
+        self._lock = threading.Lock()
+        self._rebuilding = None
+
+    def track(self, engine):
+        """Mark the index stale on every INSERT, UPDATE or DELETE of the searched tables run on `engine`."""
+        event.listen(engine, "after_execute", self._after_execute)
+
+    def _after_execute(self, conn, clauseelement, multiparams, params, execution_options, result):
+        if isinstance(clauseelement, UpdateBase) and getattr(clauseelement.table, "name", None) in TRACKED_TABLES:
+            self._stale = True
+
+    def rebuild(self, db: Session | None = None):
+        self._stale = False
+        if db is not None:
+            self.index = InvertedIndex.build(db)
+            return
+        with self.session_factory() as db:
+            self.index = InvertedIndex.build(db)
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception("Search index rebuild failed")
+            self._stale = True
+        finally:
+            self._rebuilding = None
+
+    def _current(self, db: Session) -> InvertedIndex:
+        """The index, built now on first use; a stale or old one keeps serving while it is rebuilt."""
+        with self._lock:
+            if self.index is None:
+                self.rebuild(db)
+            elif (self._stale or time.monotonic() - self.index.built_at > self.max_age) and self._rebuilding is None:
+                self._rebuilding = threading.Thread(target=self._rebuild_in_background, name="search-index-rebuild", daemon=True)
+                self._rebuilding.start()
+            return self.index
+
+    def _hits(self, db: Session, hits: list[tuple[float, int]], index: InvertedIndex) -> list[dict]:
+        """Reads back the texts of a result page, one query per type."""
+        wanted = {}
+        for _, doc in hits:
+            wanted.setdefault(index.kinds[doc], []).append(index.ids[doc])
+        rows = {}
+        for kind, ids in wanted.items():
+            id_column, _, columns = SOURCES[kind]
+            for obj_id, id_formulario, texto in db.execute(select(id_column, *columns).where(id_column.in_(ids))):
+                rows[kind, obj_id] = (id_formulario, texto)
+        results = []
+        for score, doc in hits:
+            kind, obj_id = index.kinds[doc], index.ids[doc]
+            if (kind, obj_id) not in rows:
+                # Deleted since the index was built.
+                continue
+            id_formulario, texto = rows[kind, obj_id]
+            results.append({
+                "tipo": TIPOS[kind],
+                "id": obj_id,
+                "id_formulario": id_formulario,
+                "texto": texto,
+                "rank": round(score, 6),
+            })
+        return results
+
+    def search(self, db: Session, q: str, tipo: str | None = None, skip: int = 0, limit: int = 100) -> list[dict]:
+        """Rows matching every word of `q`, best first."""
+        tipos = (tipo,) if tipo else TIPOS
+        if db.get_bind().dialect.name == "postgresql":
+            return search_postgres(db, q, tipos, skip, limit)
+        terms = tokenize(q)
+        if not terms:
+            return []
+        index = self._current(db)
+        kinds = {TIPOS.index(name) for name in tipos} if tipo else None
+        hits = index.top(terms, kinds, skip + limit)[skip:]
+        return self._hits(db, hits, index)
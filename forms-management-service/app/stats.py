@@ -0,0 +1,255 @@
+"""
+Form statistics.
+
+Counts of forms and objectives grouped by empresa, metodología, ciudad, usuario or month, computed with
+GROUP BY over the indexed columns of `formulario`. Dashboard queries are answered from `resumen_formularios`,
+a per-month summary of each dimension that every worker rebuilds in the background once it has written
+forms or objectives, at most every `STATS_REFRESH_SECONDS`.
+Dependencies: SQLAlchemy, FastAPI, application models, schemas and crud filters.
+"""
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import String, cast, delete, event, func, insert, literal, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from . import models, schemas
+from .crud import formulario_filters
+
+
+STATS_REFRESH_SECONDS = float(os.getenv("STATS_REFRESH_SECONDS", "60"))
+
+SUMMARY_NAME = "resumen_formularios"
+SUMMARY_DIMENSIONS = ("empresa", "metodologia", "ciudad")
+INTEGER_DIMENSIONS = ("empresa", "metodologia", "usuario")
+# Writes to these tables make the summary stale.
+TRACKED_TABLES = {"formulario", "objetivos_formulario"}
+
+logger = logging.getLogger(__name__)
+
+Formulario = models.Formulario
+Objetivo = models.ObjetivoFormulario
+Resumen = models.ResumenFormulario
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def month_of(column, dialect: str):
+    """`YYYY-MM` of a date column."""
+    if dialect == "sqlite":
+        return func.strftime("%Y-%m", column)
+    return func.to_char(column, "YYYY-MM")
+
+
+def _dimension_column(por: str, dialect: str):
+    if por == "mes":
+        return month_of(Formulario.fecha, dialect)
+    return {
+        "empresa": Formulario.id_empresa,
+        "metodologia": Formulario.id_metodologia,
+        "ciudad": Formulario.ciudad,
+        "usuario": Formulario.id_usuario,
+    }[por]
+
+
+def _counts(keys: list, columns: list | None = None):
+    """`columns` (the keys by default) with the forms and objectives per `keys`; the outer join keeps forms without objectives."""
+    return (
+        select(*(keys if columns is None else columns), func.count(func.distinct(Formulario.id_formulario)), func.count(Objetivo.id_objetivo))
+        .select_from(Formulario)
+        .outerjoin(Objetivo, Objetivo.id_formulario == Formulario.id_formulario)
+        .group_by(*keys)
+    )
+
+
+def _whole_months(desde: date | None, hasta: date | None) -> bool:
+    return (desde is None or desde.day == 1) and (hasta is None or (hasta + timedelta(days=1)).day == 1)
+
+
+def _summary_plan(por: str, filtros: schemas.FormularioFiltro) -> tuple[str, str | None] | None:
+    """The summary dimension and key that answer the request, or None when only the forms table can."""
+    if por == "usuario" or filtros.id_usuario is not None or not _whole_months(filtros.desde, filtros.hasta):
+        return None
+    filtered = [
+        (dimension, value)
+        for dimension, value in (("empresa", filtros.id_empresa), ("metodologia", filtros.id_metodologia), ("ciudad", filtros.ciudad))
+        if value is not None
+    ]
+    if len(filtered) > 1:
+        return None
+    if filtered:
+        dimension, value = filtered[0]
+        return (dimension, str(value)) if por in (dimension, "mes") else None
+    # Every dimension partitions all the forms; metodología has the fewest keys per month.
+    return ("metodologia" if por == "mes" else por), None
+
+
+def summary_updated(db: Session) -> datetime | None:
+    return db.scalar(select(models.ResumenEstado.actualizado).where(models.ResumenEstado.nombre == SUMMARY_NAME))
+
+
+def _from_summary(db: Session, por: str, dimension: str, clave: str | None, filtros: schemas.FormularioFiltro):
+    key = Resumen.mes if por == "mes" else Resumen.clave
+    conditions = [Resumen.dimension == dimension]
+    if clave is not None:
+        conditions.append(Resumen.clave == clave)
+    if filtros.desde is not None:
+        conditions.append(Resumen.mes >= f"{filtros.desde:%Y-%m}")
+    if filtros.hasta is not None:
+        conditions.append(Resumen.mes <= f"{filtros.hasta:%Y-%m}")
+    query = (
+        select(key, func.sum(Resumen.formularios), func.sum(Resumen.objetivos))
+        .where(*conditions)
+        .group_by(key)
+    )
+    rows = db.execute(query).all()
+    if por in INTEGER_DIMENSIONS:
+        return [(int(clave) if clave is not None else None, formularios, objetivos) for clave, formularios, objetivos in rows]
+    return rows
+
+
+def formularios_por(db: Session, por: str, filtros: schemas.FormularioFiltro, fuente: str = "auto") -> dict:
+    """
+    Forms and objectives per `por`, with the list filters applied.
+
+    `fuente="auto"` reads the summary when it exists and can answer the filters (whole months, no usuario,
+    at most one of empresa, metodología or ciudad), and the forms table otherwise.
+    """
+    plan = _summary_plan(por, filtros)
+    actualizado = summary_updated(db) if fuente != "directo" else None
+    if fuente == "resumen":
+        if plan is None:
+            raise HTTPException(status_code=400, detail="La consulta no se puede responder desde el resumen")
+        if actualizado is None:
+            raise HTTPException(status_code=409, detail="El resumen aún no se ha calculado")
+    if fuente != "directo" and plan is not None and actualizado is not None:
+        rows = _from_summary(db, por, *plan, filtros)
+        fuente = "resumen"
+    else:
+        key = _dimension_column(por, db.get_bind().dialect.name)
+        rows = db.execute(_counts([key]).where(*formulario_filters(filtros))).all()
+        fuente, actualizado = "directo", None
+    grupos = sorted(
+        ({"clave": clave, "formularios": formularios, "objetivos": objetivos} for clave, formularios, objetivos in rows),
+        key=lambda grupo: (grupo["clave"] is None, grupo["clave"]),
+    )
+    return {
+        "por": por,
+        "fuente": fuente,
+        "actualizado": actualizado,
+        "formularios": sum(grupo["formularios"] for grupo in grupos),
+        "objetivos": sum(grupo["objetivos"] for grupo in grupos),
+        "grupos": grupos,
+    }
+
+
+def objetivos_por_formulario(db: Session, filtros: schemas.FormularioFiltro) -> dict:
+    """How many forms have 0, 1, 2... objectives, with the list filters applied."""
+    per_form = (
+        select(func.count(Objetivo.id_objetivo).label("objetivos"))
+        .select_from(Formulario)
+        .outerjoin(Objetivo, Objetivo.id_formulario == Formulario.id_formulario)
+        .where(*formulario_filters(filtros))
+        .group_by(Formulario.id_formulario)
+        .subquery()
+    )
+    rows = db.execute(select(per_form.c.objetivos, func.count()).group_by(per_form.c.objetivos).order_by(per_form.c.objetivos)).all()
+    formularios = sum(count for _, count in rows)
+    objetivos = sum(per_form_count * count for per_form_count, count in rows)
+    return {
+        "formularios": formularios,
+        "objetivos": objetivos,
+        "promedio": round(objetivos / formularios, 3) if formularios else 0.0,
+        "distribucion": [{"objetivos": per_form_count, "formularios": count} for per_form_count, count in rows],
+    }
+
+
+def refresh_summary(db: Session, if_older_than: datetime | None = None) -> bool:
+    """
+    Rebuild the summary in one transaction; returns False when it was already rebuilt after `if_older_than`.
+
+    The status row is locked first, so concurrent rebuilds from several workers run one after the other.
+    """
+    started = _utcnow()
+    estado = db.scalars(
+        select(models.ResumenEstado).where(models.ResumenEstado.nombre == SUMMARY_NAME).with_for_update()
+    ).first()
+    if estado is not None and if_older_than is not None and estado.actualizado >= if_older_than:
+        db.rollback()
+        return False
+    dialect = db.get_bind().dialect.name
+    mes = month_of(Formulario.fecha, dialect)
+    db.execute(delete(Resumen))
+    for dimension in SUMMARY_DIMENSIONS:
+        key = _dimension_column(dimension, dialect)
+        rows = _counts([key, mes], columns=[literal(dimension), cast(key, String), mes])
+        db.execute(insert(Resumen).from_select(["dimension", "clave", "mes", "formularios", "objetivos"], rows))
+    if estado is None:
+        db.add(models.ResumenEstado(nombre=SUMMARY_NAME, actualizado=started))
+    else:
+        estado.actualizado = started
+    db.commit()
+    return True
+
+
+class SummaryRefresher:
+    """Rebuilds the summary in a background thread after this worker has written forms or objectives."""
+
+    def __init__(self, session_factory, interval: float = STATS_REFRESH_SECONDS):
+        self.session_factory = session_factory
+        self.interval = interval
+        # Builds the summary on the first tick when it has never been computed.
+        self._stale_since = datetime.min
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def mark_stale(self):
+        with self._lock:
+            if self._stale_since is None:
+                self._stale_since = _utcnow()
+
+    def track(self, engine):
+        """Mark the summary stale on every INSERT, UPDATE or DELETE of forms or objectives run on `engine`."""
+        event.listen(engine, "after_execute", self._after_execute)
+
+    def _after_execute(self, conn, clauseelement, multiparams, params, execution_options, result):
+        if isinstance(clauseelement, UpdateBase) and getattr(clauseelement.table, "name", None) in TRACKED_TABLES:
+            self.mark_stale()
+
+    def refresh_if_stale(self):
+        with self._lock:
+            since, self._stale_since = self._stale_since, None
+        if since is None:
+            return
+        try:
+            with self.session_factory() as db:
+                refresh_summary(db, if_older_than=since)
+        except Exception:
+            logger.exception("Statistics summary refresh failed")
+            with self._lock:
+                self._stale_since = min(since, self._stale_since or since)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.refresh_if_stale()
+
+    def start(self):
+        """Start the background refresh; `STATS_REFRESH_SECONDS=0` leaves it to `POST /estadisticas/refrescar`."""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stats-summary-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
@@ -0,0 +1,45 @@
+"""
+Alembic migration environment.
+
+Runs the versioned migrations against DATABASE_URL with the application's metadata.
+Dependencies: Alembic, SQLAlchemy, application database settings and models.
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.database import DATABASE_URL
+from app.models import Base
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    # Indexes marked `info={"dialect": ...}` (the search indexes) only exist in that database.
+    dialect = obj.info.get("dialect") if type_ == "index" else None
+    return dialect is None or dialect == context.get_bind().dialect.name
+
+
+def run_migrations_offline():
+    context.configure(url=DATABASE_URL, target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connectable = create_engine(DATABASE_URL, poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata, include_object=include_object)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,71 @@
+"""Initial schema
+
+Baseline matching the tables previously created by `create_all`. Tables that already exist are
+left untouched, so databases created before migrations can be upgraded in place.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "formulario" not in existing:
+        op.create_table(
+            "formulario",
+            sa.Column("id_formulario", sa.Integer(), primary_key=True),
+            sa.Column("id_empresa", sa.Integer(), nullable=False),
+            sa.Column("fecha", sa.Date(), nullable=False),
+            sa.Column("ciudad", sa.String(100)),
+            sa.Column("nombre_software", sa.String(100)),
+            sa.Column("id_usuario", sa.Integer(), nullable=False),
+            sa.Column("id_metodologia", sa.Integer(), nullable=False),
+        )
+        op.create_index("ix_formulario_id_formulario", "formulario", ["id_formulario"])
+
+    if "objetivos_formulario" not in existing:
+        op.create_table(
+            "objetivos_formulario",
+            sa.Column("id_objetivo", sa.Integer(), primary_key=True),
+            sa.Column("id_formulario", sa.Integer(), nullable=False),
+            sa.Column("descripcion", sa.Text(), nullable=False),
+            sa.Column("tipo", sa.String(20)),
+        )
+        op.create_index("ix_objetivos_formulario_id_objetivo", "objetivos_formulario", ["id_objetivo"])
+
+    if "participantes_formulario" not in existing:
+        op.create_table(
+            "participantes_formulario",
+            sa.Column("id_participante", sa.Integer(), primary_key=True),
+            sa.Column("id_formulario", sa.Integer(), nullable=False),
+            sa.Column("cargo", sa.String(100)),
+            sa.Column("nombre", sa.String(255)),
+            sa.Column("firma", sa.Text()),
+        )
+        op.create_index("ix_participantes_formulario_id_participante", "participantes_formulario", ["id_participante"])
+
+    if "metodologias" not in existing:
+        op.create_table(
+            "metodologias",
+            sa.Column("id_metodologia", sa.Integer(), primary_key=True),
+            sa.Column("nombre", sa.String(100), nullable=False),
+            sa.Column("descripcion", sa.Text()),
+        )
+        op.create_index("ix_metodologias_id_metodologia", "metodologias", ["id_metodologia"])
+
+
+def downgrade():
+    op.drop_table("metodologias")
+    op.drop_table("participantes_formulario")
+    op.drop_table("objetivos_formulario")
+    op.drop_table("formulario")
@@ -0,0 +1,33 @@
+"""Indexes for the list filters
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_formulario_id_empresa_fecha", "formulario", ["id_empresa", "fecha"]),
+    ("ix_formulario_fecha", "formulario", ["fecha"]),
+    ("ix_formulario_ciudad", "formulario", ["ciudad"]),
+    ("ix_formulario_id_usuario", "formulario", ["id_usuario"]),
+    ("ix_formulario_id_metodologia", "formulario", ["id_metodologia"]),
+    ("ix_objetivos_formulario_id_formulario", "objetivos_formulario", ["id_formulario"]),
+    ("ix_participantes_formulario_id_formulario", "participantes_formulario", ["id_formulario"]),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
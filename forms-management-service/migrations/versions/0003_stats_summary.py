@@ -0,0 +1,38 @@
+"""Statistics summary tables
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "resumen_formularios",
+        sa.Column("id_resumen", sa.Integer(), primary_key=True),
+        sa.Column("dimension", sa.String(20), nullable=False),
+        sa.Column("clave", sa.String(100)),
+        sa.Column("mes", sa.String(7), nullable=False),
+        sa.Column("formularios", sa.Integer(), nullable=False),
+        sa.Column("objetivos", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_resumen_formularios_dimension_clave_mes", "resumen_formularios", ["dimension", "clave", "mes"])
+    op.create_table(
+        "resumen_estado",
+        sa.Column("nombre", sa.String(50), primary_key=True),
+        sa.Column("actualizado", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("resumen_estado")
+    op.drop_index("ix_resumen_formularios_dimension_clave_mes", table_name="resumen_formularios")
+    op.drop_table("resumen_formularios")
@@ -0,0 +1,49 @@
+"""Full-text search indexes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+PostgreSQL only: SQLite databases are searched through the in-process index of `app.search`.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        "ix_objetivos_formulario_descripcion_fts",
+        "objetivos_formulario",
+        [sa.text("to_tsvector('spanish'::regconfig, descripcion)")],
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_metodologias_fts",
+        "metodologias",
+        [sa.text("to_tsvector('spanish'::regconfig, nombre || ' ' || coalesce(descripcion, ''))")],
+        postgresql_using="gin",
+    )
+    op.create_index(
+        "ix_formulario_nombre_software_trgm",
+        "formulario",
+        ["nombre_software"],
+        postgresql_using="gin",
+        postgresql_ops={"nombre_software": "gin_trgm_ops"},
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.drop_index("ix_formulario_nombre_software_trgm", table_name="formulario")
+    op.drop_index("ix_metodologias_fts", table_name="metodologias")
+    op.drop_index("ix_objetivos_formulario_descripcion_fts", table_name="objetivos_formulario")
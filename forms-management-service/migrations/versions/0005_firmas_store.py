@@ -0,0 +1,145 @@
+"""Content-addressed signature store
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+Moves `participantes_formulario.firma` into `firmas`, one row per distinct content, and leaves only
+`firma_hash` in the participant rows. The rows are converted in batches; the decoding mirrors
+`app.firmas` as of this revision so later changes to the app do not alter the migration.
+"""
+import base64
+import binascii
+import hashlib
+import re
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+_DATA_URI = re.compile(r"data:(?P<media_type>[\w.+-]+/[\w.+-]+)?(?:;[\w-]+=[^;,]*)*;base64,", re.ASCII)
+_MAGIC = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF8", "image/gif"),
+    (b"RIFF", "image/webp"),
+    (b"<svg", "image/svg+xml"),
+    (b"<?xml", "image/svg+xml"),
+)
+
+participantes = sa.table(
+    "participantes_formulario",
+    sa.column("id_participante", sa.Integer),
+    sa.column("firma", sa.Text),
+    sa.column("firma_hash", sa.String),
+)
+firmas = sa.table(
+    "firmas",
+    sa.column("hash", sa.String),
+    sa.column("media_type", sa.String),
+    sa.column("tamano", sa.Integer),
+    sa.column("codificacion", sa.String),
+    sa.column("contenido", sa.LargeBinary),
+)
+
+
+def _decode(firma: str) -> tuple[bytes, str]:
+    match = _DATA_URI.match(firma)
+    payload = firma[match.end():] if match else firma
+    try:
+        content = base64.b64decode(payload, validate=True)
+    except (binascii.Error, ValueError):
+        return firma.encode(), "text/plain; charset=utf-8"
+    if match and match.group("media_type"):
+        return content, match.group("media_type")
+    return content, next((media_type for magic, media_type in _MAGIC if content.startswith(magic)), "application/octet-stream")
+
+
+def _firma_row(firma: str) -> dict:
+    content, media_type = _decode(firma)
+    packed = zlib.compress(content, 6)
+    codificacion = "zlib" if len(packed) < len(content) else "identity"
+    return {
+        "hash": hashlib.sha256(content).hexdigest(),
+        "media_type": media_type,
+        "tamano": len(content),
+        "codificacion": codificacion,
+        "contenido": packed if codificacion == "zlib" else content,
+    }
+
+
+def _move_signatures(conn):
+    stored = set()
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(participantes.c.id_participante, participantes.c.firma)
+            .where(participantes.c.id_participante > last_id, participantes.c.firma.is_not(None), participantes.c.firma != "")
+            .order_by(participantes.c.id_participante)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        new, updates = {}, []
+        for id_participante, firma in rows:
+            row = _firma_row(firma)
+            if row["hash"] not in stored:
+                new[row["hash"]] = row
+            updates.append({"b_id": id_participante, "b_hash": row["hash"]})
+        if new:
+            conn.execute(firmas.insert(), list(new.values()))
+            stored.update(new)
+        conn.execute(
+            participantes.update()
+            .where(participantes.c.id_participante == sa.bindparam("b_id"))
+            .values(firma_hash=sa.bindparam("b_hash")),
+            updates,
+        )
+        last_id = rows[-1].id_participante
+
+
+def _restore_signatures(conn):
+    rows = conn.execute(sa.select(firmas.c.hash, firmas.c.media_type, firmas.c.codificacion, firmas.c.contenido)).all()
+    for content_hash, media_type, codificacion, contenido in rows:
+        content = zlib.decompress(contenido) if codificacion == "zlib" else contenido
+        if media_type.startswith("text/plain"):
+            firma = content.decode()
+        else:
+            firma = f"data:{media_type};base64,{base64.b64encode(content).decode()}"
+        conn.execute(participantes.update().where(participantes.c.firma_hash == content_hash).values(firma=firma))
+
+
+def upgrade():
+    op.create_table(
+        "firmas",
+        sa.Column("hash", sa.String(64), primary_key=True),
+        sa.Column("media_type", sa.String(100), nullable=False),
+        sa.Column("tamano", sa.Integer(), nullable=False),
+        sa.Column("codificacion", sa.String(10), nullable=False),
+        sa.Column("contenido", sa.LargeBinary(), nullable=False),
+    )
+    with op.batch_alter_table("participantes_formulario") as batch:
+        batch.add_column(sa.Column("firma_hash", sa.String(64)))
+    _move_signatures(op.get_bind())
+    with op.batch_alter_table("participantes_formulario") as batch:
+        batch.drop_column("firma")
+        batch.create_index("ix_participantes_formulario_firma_hash", ["firma_hash"])
+
+
+def downgrade():
+    with op.batch_alter_table("participantes_formulario") as batch:
+        batch.add_column(sa.Column("firma", sa.Text()))
+    # Signatures come back as `data:` URIs (or their text), whatever form they were first sent in.
+    _restore_signatures(op.get_bind())
+    with op.batch_alter_table("participantes_formulario") as batch:
+        batch.drop_index("ix_participantes_formulario_firma_hash")
+        batch.drop_column("firma_hash")
+    op.drop_table("firmas")
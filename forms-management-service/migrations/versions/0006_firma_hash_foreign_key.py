@@ -0,0 +1,35 @@
+"""Signature foreign key
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+
+References `firmas.hash` from `participantes_formulario.firma_hash`, so a purge can no longer delete a
+signature in use. Hashes whose signature a purge already removed are cleared first: their content is gone.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+participantes = sa.table("participantes_formulario", sa.column("firma_hash", sa.String))
+firmas = sa.table("firmas", sa.column("hash", sa.String))
+
+
+def upgrade():
+    op.execute(
+        participantes.update()
+        .where(participantes.c.firma_hash.is_not(None), participantes.c.firma_hash.not_in(sa.select(firmas.c.hash)))
+        .values(firma_hash=None)
+    )
+    with op.batch_alter_table("participantes_formulario") as batch:
+        batch.create_foreign_key("fk_participantes_formulario_firma_hash", "firmas", ["firma_hash"], ["hash"])
+
+
+def downgrade():
+    with op.batch_alter_table("participantes_formulario") as batch:
+        batch.drop_constraint("fk_participantes_formulario_firma_hash", type_="foreignkey")
@@ -0,0 +1,82 @@
+"""
+Memory bound of the streaming export.
+
+Seeds `EXPORT_TEST_ROWS` forms (default 20000, so CI stays fast; set it to 1000000 for the full check) and
+streams `GET /formularios/export` in a child process. The child's peak RSS may exceed that of a child
+exporting nothing by at most `EXPORT_TEST_MAX_GROWTH_MB`.
+Dependencies: pytest, a POSIX `resource` module.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import delete, text
+
+from app import models
+
+from conftest import SERVICE_DIR
+
+
+ROWS = int(os.getenv("EXPORT_TEST_ROWS", "20000"))
+MAX_GROWTH_MB = float(os.getenv("EXPORT_TEST_MAX_GROWTH_MB", "32"))
+
+# Streams one export straight through the ASGI app, since the test client collects whole bodies, and
+# reports its size and the process's peak RSS in MB.
+EXPORT_CHILD = """
+import asyncio, json, resource, sys
+from urllib.parse import urlencode
+from app.main import app
+sent = {"bytes": 0, "lines": 0, "status": None}
+async def receive():
+    await asyncio.Event().wait()
+async def send(message):
+    if message["type"] == "http.response.start":
+        sent["status"] = message["status"]
+    elif message["type"] == "http.response.body":
+        sent["bytes"] += len(message.get("body", b""))
+        sent["lines"] += message.get("body", b"").count(b"\\n")
+query = urlencode({"format": sys.argv[1], "id_empresa": sys.argv[2]}).encode()
+scope = {
+    "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+    "path": "/formularios/export", "raw_path": b"/formularios/export", "root_path": "", "query_string": query,
+    "headers": [(b"host", b"test")], "client": ("127.0.0.1", 0), "server": ("test", 80),
+}
+asyncio.run(app(scope, receive, send))
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({**sent, "peak_mb": peak / (1024 * 1024 if sys.platform == "darwin" else 1024)}))
+"""
+
+
+@pytest.fixture(scope="module")
+def seeded(engine):
+    # Generated inside SQLite so the test process itself never holds the rows.
+    with engine.begin() as conn:
+        conn.execute(text("""
+            WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < :rows)
+            INSERT INTO formulario (id_empresa, fecha, ciudad, nombre_software, id_usuario, id_metodologia)
+            SELECT 1, date('2022-01-01', '+' || (i % 1000) || ' days'), 'Bogotá', 'software ' || i, i % 97 + 1, 1 FROM n
+        """), {"rows": ROWS})
+    yield ROWS
+    with engine.begin() as conn:
+        conn.execute(delete(models.Formulario))
+
+
+def export(format: str, id_empresa: int) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", EXPORT_CHILD, format, str(id_empresa)],
+        cwd=SERVICE_DIR, env={**os.environ, "LOG_LEVEL": "warning"}, check=True, capture_output=True, text=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize("format", ["csv", "ndjson"])
+def test_export_memory_stays_bounded(seeded, format):
+    baseline = export(format, id_empresa=0)
+    streamed = export(format, id_empresa=1)
+    header = 1 if format == "csv" else 0
+    assert streamed["status"] == 200
+    assert streamed["lines"] == seeded + header
+    growth = streamed["peak_mb"] - baseline["peak_mb"]
+    assert growth < MAX_GROWTH_MB, f"{streamed['bytes'] / 2**20:.0f} MB exported, RSS grew {growth:.0f} MB"
@@ -0,0 +1,88 @@
+"""
+Index usage of the form queries.
+
+Runs the repository queries against a seeded and analyzed SQLite database and asserts with
+`EXPLAIN QUERY PLAN` that the indexes of migration `0002` serve them.
+"""
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import delete, event, insert
+
+from app import crud, models, schemas
+from app.database import SessionLocal
+
+
+FORMULARIOS = 5000
+
+
+@pytest.fixture(scope="module")
+def seeded(engine):
+    with engine.begin() as conn:
+        conn.execute(insert(models.Formulario), [
+            {
+                "id_empresa": i % 50 + 1,
+                "fecha": date(2022, 1, 1) + timedelta(days=i % 1000),
+                "ciudad": "Bogotá",
+                "nombre_software": "software",
+                "id_usuario": 1,
+                "id_metodologia": 1,
+            }
+            for i in range(FORMULARIOS)
+        ])
+        conn.execute(insert(models.ObjetivoFormulario), [
+            {"id_formulario": i % FORMULARIOS + 1, "descripcion": "objetivo"} for i in range(3 * FORMULARIOS)
+        ])
+        conn.execute(insert(models.ParticipanteFormulario), [
+            {"id_formulario": i % FORMULARIOS + 1, "nombre": "participante"} for i in range(3 * FORMULARIOS)
+        ])
+        conn.exec_driver_sql("ANALYZE")
+    yield engine
+    with engine.begin() as conn:
+        for model in (models.ParticipanteFormulario, models.ObjetivoFormulario, models.Formulario):
+            conn.execute(delete(model))
+
+
+def query_plans(engine, call) -> dict[str, str]:
+    """Run `call(db)` and return the `EXPLAIN QUERY PLAN` of each statement it executed, by table searched."""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        with SessionLocal() as db:
+            call(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    plans = {}
+    with engine.connect() as conn:
+        for statement, parameters in executed:
+            for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters):
+                detail = row[-1]
+                if detail.startswith(("SEARCH ", "SCAN ")):
+                    plans.setdefault(detail.split()[1], detail)
+    return plans
+
+
+def test_fecha_range_uses_fecha_index(seeded):
+    filtros = schemas.FormularioFiltro(desde=date(2023, 1, 1), hasta=date(2023, 1, 31))
+    plans = query_plans(seeded, lambda db: crud.get_formularios(db, filtros=filtros))
+    assert "USING INDEX ix_formulario_fecha " in plans["formulario"]
+
+
+def test_empresa_and_fecha_use_composite_index(seeded):
+    filtros = schemas.FormularioFiltro(id_empresa=3, desde=date(2023, 1, 1), hasta=date(2023, 3, 31))
+    plans = query_plans(seeded, lambda db: crud.get_formularios(db, filtros=filtros))
+    assert "USING INDEX ix_formulario_id_empresa_fecha (id_empresa=? AND fecha>? AND fecha<?)" in plans["formulario"]
+
+
+@pytest.mark.parametrize("call", [
+    lambda db: crud.get_formulario_completo(db, 7),
+    lambda db: (crud.get_objetivos(db, id_formulario=7), crud.get_participantes(db, id_formulario=7)),
+], ids=["completo", "listas"])
+def test_child_lookups_use_id_formulario_indexes(seeded, call):
+    plans = query_plans(seeded, call)
+    assert "USING INDEX ix_objetivos_formulario_id_formulario (id_formulario=?)" in plans["objetivos_formulario"]
+    assert "USING INDEX ix_participantes_formulario_id_formulario (id_formulario=?)" in plans["participantes_formulario"]
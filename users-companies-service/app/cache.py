@@ -0,0 +1,14 @@
+"""
+Read-through cache module.
+
+Holds the cache instance of the users-companies service; `CACHE_PREFIX` namespaces its keys in the shared backend.
+Dependencies: calidad_core.
+"""
+import os
+
+from calidad_core.cache import create_cache
+
+
+CACHE_PREFIX = os.getenv("CACHE_PREFIX", "users-companies")
+
+cache = create_cache(CACHE_PREFIX)
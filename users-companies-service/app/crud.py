@@ -1,77 +1,107 @@
 from sqlalchemy.orm import Session
+from calidad_core.passwords import dummy_hash, hash_password, needs_rehash, verify_password
+from calidad_core.repository import Repository
 from . import models, schemas
+from .cache import cache
+from .outbox import outbox
 
 """
 CRUD operations for database entities.
 
 Implements create, read, update, and delete logic for the main entities in the users-companies service.
-Dependencies: SQLAlchemy ORM, application models and schemas.
+Each entity is served by a `calidad_core` repository; this module keeps the service-specific rules.
+Dependencies: calidad_core, application models and schemas.
 """
 
 
-def get_empresas(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Empresa).offset(skip).limit(limit).all()
+empresas = Repository(
+    models.Empresa, not_found="Empresa no encontrada", cache=cache, cache_schema=schemas.Empresa, cache_namespace="empresa",
+    publish=outbox.publisher("empresas", "id_empresa"),
+)
+# Password hashes stay in this service.
+usuarios = Repository(
+    models.Usuario, not_found="Usuario no encontrado", cache=cache, cache_schema=schemas.Usuario, cache_namespace="usuario",
+    publish=outbox.publisher("usuarios", "id_usuario", exclude=("contraseña",)),
+)
+
+
+def get_empresas(db: Session, skip: int = 0, limit: int = 100, after_id: int | None = None, fields: list[str] | None = None):
+    return empresas.paginate_rows(db, skip, limit, after_id, schema=schemas.Empresa, fields=fields)
+
+
+def get_empresas_by_ids(db: Session, ids: list[int], fields: list[str] | None = None):
+    return empresas.rows_by_ids(db, ids, schema=schemas.Empresa, fields=fields)
 
 
 def get_empresa(db: Session, empresa_id: int):
-    return db.query(models.Empresa).filter(models.Empresa.id_empresa == empresa_id).first()
+    return empresas.get(db, empresa_id)
 
 
 def create_empresa(db: Session, empresa: schemas.EmpresaCreate):
-    db_empresa = models.Empresa(nombre=empresa.nombre, telefono=empresa.telefono)
-    db.add(db_empresa)
-    db.commit()
-    db.refresh(db_empresa)
-    return db_empresa
+    return empresas.create(db, empresa.dict())
 
 
 def delete_empresa(db: Session, empresa_id: int):
-    empresa = db.query(models.Empresa).filter(models.Empresa.id_empresa == empresa_id).first()
-    if empresa:
-        db.delete(empresa)
-        db.commit()
-    return empresa
+    return empresas.delete(db, empresa_id)
 
 
 def update_empresa(db: Session, empresa_id: int, empresa_update: schemas.EmpresaCreate):
-    empresa = db.query(models.Empresa).filter(models.Empresa.id_empresa == empresa_id).first()
-    if empresa:
-        empresa.nombre = empresa_update.nombre
-        empresa.telefono = empresa_update.telefono
-        db.commit()
-        db.refresh(empresa)
-    return empresa
+    return empresas.update(db, empresa_id, empresa_update.dict())
 
 
-def get_usuarios(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Usuario).offset(skip).limit(limit).all()
+def patch_empresa(db: Session, empresa_id: int, empresa_patch: schemas.EmpresaUpdate):
+    return empresas.update(db, empresa_id, empresas.patch_values(empresa_patch))
+
+
+def get_usuarios(db: Session, skip: int = 0, limit: int = 100, after_id: int | None = None, fields: list[str] | None = None):
+    return usuarios.paginate_rows(db, skip, limit, after_id, schema=schemas.Usuario, fields=fields)
+
+
+def get_usuarios_by_ids(db: Session, ids: list[int], fields: list[str] | None = None):
+    return usuarios.rows_by_ids(db, ids, schema=schemas.Usuario, fields=fields)
+
 
 def get_usuario(db: Session, usuario_id: int):
-    return db.query(models.Usuario).filter(models.Usuario.id_usuario == usuario_id).first()
+    return usuarios.get(db, usuario_id)
 
 
-def create_usuario(db: Session, usuario: schemas.UsuarioCreate):
-    db_usuario = models.Usuario(**usuario.dict())
-    db.add(db_usuario)
-    db.commit()
-    db.refresh(db_usuario)
-    return db_usuario
+# `contraseña` is the hash of the new password, computed by the caller in the hash pool
+# (`calidad_core.passwords.run_in_hash_pool`) so PBKDF2 never runs on the request threadpool.
+def create_usuario(db: Session, usuario: schemas.UsuarioCreate, contraseña: str):
+    return usuarios.create(db, {**usuario.dict(exclude_none=True), "contraseña": contraseña})
+
+
+def update_usuario(db: Session, usuario_id: int, usuario_update: schemas.UsuarioCreate, contraseña: str):
+    return usuarios.update(db, usuario_id, {**usuario_update.dict(exclude_none=True), "contraseña": contraseña})
+
+
+def patch_usuario(db: Session, usuario_id: int, usuario_patch: schemas.UsuarioUpdate, contraseña: str | None = None):
+    values = usuarios.patch_values(usuario_patch)
+    if contraseña is not None:
+        values["contraseña"] = contraseña
+    return usuarios.update(db, usuario_id, values)
 
-def update_usuario(db: Session, usuario_id: int, usuario_update: schemas.UsuarioCreate):
-    usuario = db.query(models.Usuario).filter(models.Usuario.id_usuario == usuario_id).first()
-    if usuario:
-        for key, value in usuario_update.dict().items():
-            setattr(usuario, key, value)
-        db.commit()
-        db.refresh(usuario)
-    return usuario
 
 def delete_usuario(db: Session, usuario_id: int):
-    usuario = db.query(models.Usuario).filter(models.Usuario.id_usuario == usuario_id).first()
-    if usuario:
-        db.delete(usuario)
-        db.commit()
-    return usuario
+    return usuarios.delete(db, usuario_id)
+
 
 def autenticar_usuario(db: Session, correo: str, contraseña: str):
-    return db.query(models.Usuario).filter(models.Usuario.correo == correo, models.Usuario.contraseña == contraseña).first()
+    """
+    Authenticate a user by email and password.
+
+    Returns the user instance if credentials are valid, otherwise None.
+    Passwords still stored in plaintext, or with an outdated work factor, are rehashed on success.
+    """
+    usuario = db.query(models.Usuario).filter(models.Usuario.correo == correo).first()
+    if usuario is None:
+        verify_password(contraseña, dummy_hash())
+        return None
+    if not verify_password(contraseña, usuario.contraseña):
+        return None
+    if needs_rehash(usuario.contraseña):
+        usuario.contraseña = hash_password(contraseña)
+        db.commit()
+        db.refresh(usuario)
+        usuarios.invalidate(usuario.id_usuario)
+    return usuario
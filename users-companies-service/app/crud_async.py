@@ -0,0 +1,93 @@
+"""
+Async CRUD operations for database entities.
+
+Mirrors `app.crud` on top of an `AsyncSession` for the async entry point of the users-companies service.
+Dependencies: SQLAlchemy asyncio extension, calidad_core, application models and schemas.
+"""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from calidad_core.passwords import dummy_hash, hash_password, needs_rehash, run_in_hash_pool, verify_password
+from . import crud, models, schemas
+
+
+empresas = crud.empresas.as_async()
+usuarios = crud.usuarios.as_async()
+
+
+async def get_empresas(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: int | None = None, fields: list[str] | None = None):
+    return await empresas.paginate_rows(db, skip, limit, after_id, schema=schemas.Empresa, fields=fields)
+
+
+async def get_empresas_by_ids(db: AsyncSession, ids: list[int], fields: list[str] | None = None):
+    return await empresas.rows_by_ids(db, ids, schema=schemas.Empresa, fields=fields)
+
+
+async def get_empresa(db: AsyncSession, empresa_id: int):
+    return await empresas.get(db, empresa_id)
+
+
+async def create_empresa(db: AsyncSession, empresa: schemas.EmpresaCreate):
+    return await empresas.create(db, empresa.dict())
+
+
+async def delete_empresa(db: AsyncSession, empresa_id: int):
+    return await empresas.delete(db, empresa_id)
+
+
+async def update_empresa(db: AsyncSession, empresa_id: int, empresa_update: schemas.EmpresaCreate):
+    return await empresas.update(db, empresa_id, empresa_update.dict())
+
+
+async def patch_empresa(db: AsyncSession, empresa_id: int, empresa_patch: schemas.EmpresaUpdate):
+    return await empresas.update(db, empresa_id, empresas.patch_values(empresa_patch))
+
+
+async def get_usuarios(db: AsyncSession, skip: int = 0, limit: int = 100, after_id: int | None = None, fields: list[str] | None = None):
+    return await usuarios.paginate_rows(db, skip, limit, after_id, schema=schemas.Usuario, fields=fields)
+
+
+async def get_usuarios_by_ids(db: AsyncSession, ids: list[int], fields: list[str] | None = None):
+    return await usuarios.rows_by_ids(db, ids, schema=schemas.Usuario, fields=fields)
+
+
+async def get_usuario(db: AsyncSession, usuario_id: int):
+    return await usuarios.get(db, usuario_id)
+
+
+async def create_usuario(db: AsyncSession, usuario: schemas.UsuarioCreate):
+    contraseña = await run_in_hash_pool(hash_password, usuario.contraseña)
+    return await usuarios.create(db, {**usuario.dict(exclude_none=True), "contraseña": contraseña})
+
+
+async def _hash_password_value(values: dict) -> dict:
+    if "contraseña" in values:
+        values["contraseña"] = await run_in_hash_pool(hash_password, values["contraseña"])
+    return values
+
+
+async def update_usuario(db: AsyncSession, usuario_id: int, usuario_update: schemas.UsuarioCreate):
+    return await usuarios.update(db, usuario_id, await _hash_password_value(usuario_update.dict(exclude_none=True)))
+
+
+async def patch_usuario(db: AsyncSession, usuario_id: int, usuario_patch: schemas.UsuarioUpdate):
+    return await usuarios.update(db, usuario_id, await _hash_password_value(usuarios.patch_values(usuario_patch)))
+
+
+async def delete_usuario(db: AsyncSession, usuario_id: int):
+    return await usuarios.delete(db, usuario_id)
+
+
+async def autenticar_usuario(db: AsyncSession, correo: str, contraseña: str):
+    result = await db.scalars(select(models.Usuario).where(models.Usuario.correo == correo))
+    usuario = result.first()
+    if usuario is None:
+        await run_in_hash_pool(verify_password, contraseña, dummy_hash())
+        return None
+    if not await run_in_hash_pool(verify_password, contraseña, usuario.contraseña):
+        return None
+    if needs_rehash(usuario.contraseña):
+        usuario.contraseña = await run_in_hash_pool(hash_password, contraseña)
+        await db.commit()
+        await db.refresh(usuario)
+        usuarios.invalidate(usuario.id_usuario)
+    return usuario
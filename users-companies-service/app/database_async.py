@@ -0,0 +1,16 @@
+"""
+Async database configuration module.
+
+Sets up the SQLAlchemy async engine and session used by the async entry point (`app.main_async`).
+Dependencies: SQLAlchemy asyncio extension, asyncpg, calidad_core.
+"""
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from calidad_core.database import async_session_dependency, create_async_engine
+
+from .database import DATABASE_URL
+
+
+async_engine = create_async_engine(DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+get_async_db = async_session_dependency(AsyncSessionLocal)
@@ -2,16 +2,29 @@
 FastAPI application entry point.
 
 Defines API endpoints for managing the main resources of the users-companies service.
-Dependencies: FastAPI, SQLAlchemy, application CRUD, models, and schemas.
+Dependencies: FastAPI, SQLAlchemy, calidad_core, application CRUD, models, and schemas.
 """
-from fastapi import FastAPI, Depends, HTTPException, status
+import anyio
+from fastapi import FastAPI, Depends, HTTPException, Query, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
-from .database import engine, SessionLocal
+from calidad_core.database import pool_status, register_create_all, register_dispose
+from calidad_core.compression import CompressionMiddleware
+from calidad_core.etag import ETagMiddleware
+from calidad_core.health import ReadinessProbe, liveness_response
+from calidad_core.metrics import MetricsMiddleware
+from calidad_core.outbox import OUTBOX_HEAD_HEADER
+from calidad_core.auth import create_token, has_role, request_claims, require_token
+from calidad_core.passwords import hash_password, run_in_hash_pool
+from calidad_core.responses import FastJSONResponse
+from calidad_core.pagination import NEXT_CURSOR_HEADER, decode_cursor, fields_query, ids_query, set_next_cursor
+from calidad_core import metrics
+from .database import engine, get_db
+from .cache import cache
 from .models import Base
-from . import crud, schemas
+from . import crud, outbox, schemas
 
-app = FastAPI()
+app = FastAPI(dependencies=[Depends(require_token)])
 
 app.add_middleware(
     CORSMiddleware,
@@ -19,30 +32,61 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, OUTBOX_HEAD_HEADER, "ETag", "Server-Timing"],
 )
 
-@app.on_event("startup")
-def startup():
-    Base.metadata.create_all(bind=engine)
+app.add_middleware(ETagMiddleware)
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Outside the ETag middleware, which hashes the plain body.
+app.add_middleware(CompressionMiddleware)
+
+# Outermost, so the recorded latency includes the other middleware.
+app.add_middleware(MetricsMiddleware)
+
+register_create_all(app, Base.metadata, engine)
+register_dispose(app, engine)
+
+readiness = ReadinessProbe(engine)
+
+app.router.add_event_handler("startup", outbox.listener.start)
+app.router.add_event_handler("shutdown", outbox.listener.stop)
 
 @app.get("/", tags=["root"])
 def read_root():
     return {"msg": "Microservicio de Empresas funcionando"}
 
+@app.get("/health/live", tags=["health"])
+async def read_liveness():
+    return liveness_response()
+
+@app.get("/health/ready", tags=["health"])
+async def read_readiness():
+    return await readiness.response()
+
+@app.get("/debug/pool", tags=["debug"])
+def read_pool_status():
+    return pool_status(engine.pool)
+
+@app.get("/debug/cache", tags=["debug"])
+def read_cache_stats():
+    return cache.stats()
+
+@app.get("/metrics", tags=["debug"])
+def read_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.post("/empresas/", response_model=schemas.Empresa, tags=["empresas"])
 def create_empresa(empresa: schemas.EmpresaCreate, db: Session = Depends(get_db)):
     return crud.create_empresa(db, empresa)
 
 @app.get("/empresas/", response_model=list[schemas.Empresa], tags=["empresas"])
-def read_empresas(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_empresas(db, skip=skip, limit=limit)
+def read_empresas(skip: int = 0, limit: int = 100, cursor: str | None = None, ids: list[int] | None = Depends(ids_query), fields: list[str] | None = Depends(fields_query(schemas.Empresa)), db: Session = Depends(get_db)):
+    if ids is not None:
+        return FastJSONResponse(crud.get_empresas_by_ids(db, ids, fields))
+    empresas = crud.get_empresas(db, skip=skip, limit=limit, after_id=decode_cursor(cursor), fields=fields)
+    response = FastJSONResponse(empresas)
+    set_next_cursor(response, empresas, "id_empresa", limit)
+    return response
 
 @app.get("/empresas/{empresa_id}", response_model=schemas.Empresa, tags=["empresas"])
 def read_empresa(empresa_id: int, db: Session = Depends(get_db)):
@@ -58,6 +102,13 @@ def update_empresa(empresa_id: int, empresa: schemas.EmpresaCreate, db: Session
         raise HTTPException(status_code=404, detail="Empresa no encontrada")
     return db_empresa
 
+@app.patch("/empresas/{empresa_id}", response_model=schemas.Empresa, tags=["empresas"])
+def patch_empresa(empresa_id: int, empresa: schemas.EmpresaUpdate, db: Session = Depends(get_db)):
+    db_empresa = crud.patch_empresa(db, empresa_id, empresa)
+    if db_empresa is None:
+        raise HTTPException(status_code=404, detail="Empresa no encontrada")
+    return db_empresa
+
 @app.delete("/empresas/{empresa_id}", response_model=schemas.Empresa, tags=["empresas"])
 def delete_empresa(empresa_id: int, db: Session = Depends(get_db)):
     db_empresa = crud.delete_empresa(db, empresa_id)
@@ -65,13 +116,29 @@ def delete_empresa(empresa_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Empresa no encontrada")
     return db_empresa
 
+async def hash_new_password(contraseña: str | None) -> str | None:
+    """Hash in the bounded hash pool, so a burst of user writes cannot take the request threadpool."""
+    return await run_in_hash_pool(hash_password, contraseña) if contraseña is not None else None
+
+def check_rol(usuario: schemas.UsuarioCreate | schemas.UsuarioUpdate, claims: dict | None) -> None:
+    """Tokens carry `rol`, which grants administrative operations, so only an admin may assign it."""
+    if usuario.rol is not None and not has_role(claims, "admin"):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Solo un administrador puede asignar el rol")
+
 @app.post("/usuarios/", response_model=schemas.Usuario, tags=["usuarios"])
-def create_usuario(usuario: schemas.UsuarioCreate, db: Session = Depends(get_db)):
-    return crud.create_usuario(db, usuario)
+async def create_usuario(usuario: schemas.UsuarioCreate, db: Session = Depends(get_db), claims: dict | None = Depends(request_claims)):
+    check_rol(usuario, claims)
+    contraseña = await hash_new_password(usuario.contraseña)
+    return await anyio.to_thread.run_sync(crud.create_usuario, db, usuario, contraseña)
 
 @app.get("/usuarios/", response_model=list[schemas.Usuario], tags=["usuarios"])
-def read_usuarios(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_usuarios(db, skip=skip, limit=limit)
+def read_usuarios(skip: int = 0, limit: int = 100, cursor: str | None = None, ids: list[int] | None = Depends(ids_query), fields: list[str] | None = Depends(fields_query(schemas.Usuario)), db: Session = Depends(get_db)):
+    if ids is not None:
+        return FastJSONResponse(crud.get_usuarios_by_ids(db, ids, fields))
+    usuarios = crud.get_usuarios(db, skip=skip, limit=limit, after_id=decode_cursor(cursor), fields=fields)
+    response = FastJSONResponse(usuarios)
+    set_next_cursor(response, usuarios, "id_usuario", limit)
+    return response
 
 @app.get("/usuarios/{usuario_id}", response_model=schemas.Usuario, tags=["usuarios"])
 def read_usuario(usuario_id: int, db: Session = Depends(get_db)):
@@ -81,8 +148,19 @@ def read_usuario(usuario_id: int, db: Session = Depends(get_db)):
     return db_usuario
 
 @app.put("/usuarios/{usuario_id}", response_model=schemas.Usuario, tags=["usuarios"])
-def update_usuario(usuario_id: int, usuario: schemas.UsuarioCreate, db: Session = Depends(get_db)):
-    db_usuario = crud.update_usuario(db, usuario_id, usuario)
+async def update_usuario(usuario_id: int, usuario: schemas.UsuarioCreate, db: Session = Depends(get_db), claims: dict | None = Depends(request_claims)):
+    check_rol(usuario, claims)
+    contraseña = await hash_new_password(usuario.contraseña)
+    db_usuario = await anyio.to_thread.run_sync(crud.update_usuario, db, usuario_id, usuario, contraseña)
+    if db_usuario is None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    return db_usuario
+
+@app.patch("/usuarios/{usuario_id}", response_model=schemas.Usuario, tags=["usuarios"])
+async def patch_usuario(usuario_id: int, usuario: schemas.UsuarioUpdate, db: Session = Depends(get_db), claims: dict | None = Depends(request_claims)):
+    check_rol(usuario, claims)
+    contraseña = await hash_new_password(usuario.contraseña)
+    db_usuario = await anyio.to_thread.run_sync(crud.patch_usuario, db, usuario_id, usuario, contraseña)
     if db_usuario is None:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     return db_usuario
@@ -94,9 +172,21 @@ def delete_usuario(usuario_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
     return db_usuario
 
-@app.post("/login", response_model=schemas.Usuario, tags=["usuarios"])
-def login(request: schemas.LoginRequest, db: Session = Depends(get_db)):
-    usuario = crud.autenticar_usuario(db, request.correo, request.contraseña)
+def login_response(usuario) -> dict:
+    claims = {"sub": str(usuario.id_usuario), "correo": usuario.correo, "rol": usuario.rol}
+    return {"access_token": create_token(claims), "token_type": "bearer", "usuario": usuario}
+
+@app.post("/login", response_model=schemas.LoginResponse, tags=["usuarios"])
+async def login(request: schemas.LoginRequest, db: Session = Depends(get_db)):
+    usuario = await run_in_hash_pool(crud.autenticar_usuario, db, request.correo, request.contraseña)
     if not usuario:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Correo o contraseña incorrectos")
-    return usuario
+    return login_response(usuario)
+
+@app.get("/cambios", response_model=list[schemas.Cambio], tags=["cambios"])
+async def read_cambios(
+    desde: int = Query(0, ge=0, description="Offset: devuelve los cambios con id mayor."),
+    limit: int = Query(outbox.FEED_MAX_LIMIT, ge=1, le=outbox.FEED_MAX_LIMIT),
+    espera: float = Query(0, ge=0, le=outbox.FEED_MAX_WAIT, description="Segundos a esperar un cambio si no hay ninguno."),
+):
+    return await outbox.feed(desde, limit, espera)
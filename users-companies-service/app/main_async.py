@@ -0,0 +1,143 @@
+"""
+Async FastAPI application entry point.
+
+Serves the CRUD endpoints of the users-companies service through the async database engine.
+Every other route is taken from `app.main`, so both entry points expose the same API.
+Dependencies: FastAPI, SQLAlchemy asyncio extension, calidad_core, application async CRUD, models, and schemas.
+"""
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, status
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+from calidad_core.auth import request_claims, require_token
+from calidad_core.database import pool_status, register_create_all, register_dispose
+from calidad_core.health import ReadinessProbe
+from calidad_core.responses import FastJSONResponse
+from calidad_core.pagination import decode_cursor, fields_query, ids_query, set_next_cursor
+from .database_async import async_engine, get_async_db
+from .models import Base
+from . import crud_async, outbox, schemas
+from . import main as sync_main
+
+router = APIRouter(dependencies=[Depends(require_token)])
+
+readiness = ReadinessProbe(async_engine)
+
+@router.get("/health/ready", tags=["health"])
+async def read_readiness():
+    return await readiness.response()
+
+@router.get("/debug/pool", tags=["debug"])
+async def read_pool_status():
+    return pool_status(async_engine.pool)
+
+@router.post("/empresas/", response_model=schemas.Empresa, tags=["empresas"])
+async def create_empresa(empresa: schemas.EmpresaCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.create_empresa(db, empresa)
+
+@router.get("/empresas/", response_model=list[schemas.Empresa], tags=["empresas"])
+async def read_empresas(skip: int = 0, limit: int = 100, cursor: str | None = None, ids: list[int] | None = Depends(ids_query), fields: list[str] | None = Depends(fields_query(schemas.Empresa)), db: AsyncSession = Depends(get_async_db)):
+    if ids is not None:
+        return FastJSONResponse(await crud_async.get_empresas_by_ids(db, ids, fields))
+    empresas = await crud_async.get_empresas(db, skip=skip, limit=limit, after_id=decode_cursor(cursor), fields=fields)
+    response = FastJSONResponse(empresas)
+    set_next_cursor(response, empresas, "id_empresa", limit)
+    return response
+
+@router.get("/empresas/{empresa_id}", response_model=schemas.Empresa, tags=["empresas"])
+async def read_empresa(empresa_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_empresa = await crud_async.get_empresa(db, empresa_id=empresa_id)
+    if db_empresa is None:
+        raise HTTPException(status_code=404, detail="Empresa no encontrada")
+    return db_empresa
+
+@router.put("/empresas/{empresa_id}", response_model=schemas.Empresa, tags=["empresas"])
+async def update_empresa(empresa_id: int, empresa: schemas.EmpresaCreate, db: AsyncSession = Depends(get_async_db)):
+    db_empresa = await crud_async.update_empresa(db, empresa_id, empresa)
+    if db_empresa is None:
+        raise HTTPException(status_code=404, detail="Empresa no encontrada")
+    return db_empresa
+
+@router.patch("/empresas/{empresa_id}", response_model=schemas.Empresa, tags=["empresas"])
+async def patch_empresa(empresa_id: int, empresa: schemas.EmpresaUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_empresa = await crud_async.patch_empresa(db, empresa_id, empresa)
+    if db_empresa is None:
+        raise HTTPException(status_code=404, detail="Empresa no encontrada")
+    return db_empresa
+
+@router.delete("/empresas/{empresa_id}", response_model=schemas.Empresa, tags=["empresas"])
+async def delete_empresa(empresa_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_empresa = await crud_async.delete_empresa(db, empresa_id)
+    if db_empresa is None:
+        raise HTTPException(status_code=404, detail="Empresa no encontrada")
+    return db_empresa
+
+@router.post("/usuarios/", response_model=schemas.Usuario, tags=["usuarios"])
+async def create_usuario(usuario: schemas.UsuarioCreate, db: AsyncSession = Depends(get_async_db), claims: dict | None = Depends(request_claims)):
+    sync_main.check_rol(usuario, claims)
+    return await crud_async.create_usuario(db, usuario)
+
+@router.get("/usuarios/", response_model=list[schemas.Usuario], tags=["usuarios"])
+async def read_usuarios(skip: int = 0, limit: int = 100, cursor: str | None = None, ids: list[int] | None = Depends(ids_query), fields: list[str] | None = Depends(fields_query(schemas.Usuario)), db: AsyncSession = Depends(get_async_db)):
+    if ids is not None:
+        return FastJSONResponse(await crud_async.get_usuarios_by_ids(db, ids, fields))
+    usuarios = await crud_async.get_usuarios(db, skip=skip, limit=limit, after_id=decode_cursor(cursor), fields=fields)
+    response = FastJSONResponse(usuarios)
+    set_next_cursor(response, usuarios, "id_usuario", limit)
+    return response
+
+@router.get("/usuarios/{usuario_id}", response_model=schemas.Usuario, tags=["usuarios"])
+async def read_usuario(usuario_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_usuario = await crud_async.get_usuario(db, usuario_id=usuario_id)
+    if db_usuario is None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    return db_usuario
+
+@router.put("/usuarios/{usuario_id}", response_model=schemas.Usuario, tags=["usuarios"])
+async def update_usuario(usuario_id: int, usuario: schemas.UsuarioCreate, db: AsyncSession = Depends(get_async_db), claims: dict | None = Depends(request_claims)):
+    sync_main.check_rol(usuario, claims)
+    db_usuario = await crud_async.update_usuario(db, usuario_id, usuario)
+    if db_usuario is None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    return db_usuario
+
+@router.patch("/usuarios/{usuario_id}", response_model=schemas.Usuario, tags=["usuarios"])
+async def patch_usuario(usuario_id: int, usuario: schemas.UsuarioUpdate, db: AsyncSession = Depends(get_async_db), claims: dict | None = Depends(request_claims)):
+    sync_main.check_rol(usuario, claims)
+    db_usuario = await crud_async.patch_usuario(db, usuario_id, usuario)
+    if db_usuario is None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    return db_usuario
+
+@router.delete("/usuarios/{usuario_id}", response_model=schemas.Usuario, tags=["usuarios"])
+async def delete_usuario(usuario_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_usuario = await crud_async.delete_usuario(db, usuario_id)
+    if db_usuario is None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    return db_usuario
+
+@router.post("/login", response_model=schemas.LoginResponse, tags=["usuarios"])
+async def login(request: schemas.LoginRequest, db: AsyncSession = Depends(get_async_db)):
+    usuario = await crud_async.autenticar_usuario(db, request.correo, request.contraseña)
+    if not usuario:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Correo o contraseña incorrectos")
+    return sync_main.login_response(usuario)
+
+
+def _route_key(route: APIRoute):
+    return route.path, frozenset(route.methods)
+
+
+app = FastAPI()
+app.user_middleware = list(sync_main.app.user_middleware)
+
+_async_routes = {_route_key(route): route for route in router.routes}
+for route in sync_main.app.routes:
+    if isinstance(route, APIRoute):
+        app.router.routes.append(_async_routes.get(_route_key(route), route))
+
+register_create_all(app, Base.metadata, async_engine)
+# Routes taken from `app.main` still use the sync engine.
+register_dispose(app, async_engine)
+register_dispose(app, sync_main.engine)
+app.router.add_event_handler("startup", outbox.listener.start)
+app.router.add_event_handler("shutdown", outbox.listener.stop)
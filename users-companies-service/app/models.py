@@ -5,7 +5,7 @@ Defines the database schema for the main entities used in the users-companies se
 Dependencies: SQLAlchemy.
 """
 
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Index, Integer, String
 from sqlalchemy.ext.declarative import declarative_base
 
 
@@ -25,3 +25,16 @@ class Usuario(Base):
     contraseña = Column(String(255), nullable=False)
     nombre = Column(String(100), nullable=False)
     rol = Column(String(50), nullable=False, default='usuario')
+
+class Cambio(Base):
+    """Outbox of empresa and usuario changes (`app.outbox`); `id` is the offset of the change feed."""
+    __tablename__ = "cambios"
+    # SQLite only autoincrements INTEGER primary keys.
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    recurso = Column(String(50), nullable=False)
+    operacion = Column(String(10), nullable=False)
+    id_objeto = Column(Integer, nullable=False)
+    datos = Column(JSON, nullable=False)
+    creado = Column(DateTime(timezone=True), nullable=False)
+    # Compaction looks up the later changes of each row.
+    __table_args__ = (Index("ix_cambios_recurso_id_objeto", "recurso", "id_objeto", "id"),)
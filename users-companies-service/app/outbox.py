@@ -0,0 +1,48 @@
+"""
+Change feed of empresas and usuarios.
+
+Every write made through `app.crud` records the changed rows in the `cambios` outbox within its own
+transaction, without password hashes. `GET /cambios?desde=<offset>` serves the log in order and, with
+`espera`, long-polls until a change arrives; evaluation-service keeps its replica from it.
+`python -m app.outbox` compacts the log.
+Dependencies: FastAPI, calidad_core, application models and database.
+"""
+import argparse
+import sys
+
+from calidad_core.outbox import OUTBOX_HEAD_HEADER, ChangeListener, Outbox
+from calidad_core.responses import FastJSONResponse
+
+from . import models
+from .database import SessionLocal, engine
+
+
+FEED_MAX_LIMIT = 1000
+FEED_MAX_WAIT = 30
+
+outbox = Outbox(models.Cambio)
+listener = ChangeListener(engine)
+
+
+def read(desde: int, limit: int) -> tuple[list[dict], int]:
+    """Changes after offset `desde` and the current head, read in one transaction."""
+    with SessionLocal() as db:
+        return outbox.changes(db, desde, limit), outbox.head(db)
+
+
+async def feed(desde: int, limit: int, espera: float) -> FastJSONResponse:
+    changes, head = await listener.poll(lambda: read(desde, limit), espera)
+    response = FastJSONResponse(changes)
+    response.headers[OUTBOX_HEAD_HEADER] = str(head)
+    return response
+
+
+def main():
+    argparse.ArgumentParser(description="Compacta el registro de cambios: conserva solo el último cambio de cada fila.").parse_args()
+    with SessionLocal() as db:
+        print(f"cambios borrados: {outbox.compact(db)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,8 @@ Pydantic schemas for request and response validation.
 Defines data validation and serialization for the main entities in the users-companies service.
 Dependencies: Pydantic.
 """
+from datetime import datetime
+
 from pydantic import BaseModel
 
 class EmpresaBase(BaseModel):
@@ -13,6 +15,10 @@ class EmpresaBase(BaseModel):
 class EmpresaCreate(EmpresaBase):
     pass
 
+class EmpresaUpdate(BaseModel):
+    nombre: str | None = None
+    telefono: str | None = None
+
 class Empresa(EmpresaBase):
     id_empresa: int
     class Config:
@@ -20,14 +26,23 @@ class Empresa(EmpresaBase):
 
 class UsuarioBase(BaseModel):
     correo: str
-    contraseña: str
     nombre: str
-    rol: str = 'usuario'
 
+# `rol` is only accepted from an admin token; when it is left out, new users get the default role
+# and existing users keep theirs.
 class UsuarioCreate(UsuarioBase):
-    pass
+    contraseña: str
+    rol: str | None = None
+
+class UsuarioUpdate(BaseModel):
+    correo: str | None = None
+    contraseña: str | None = None
+    nombre: str | None = None
+    rol: str | None = None
 
+# Responses and cached rows never carry the password hash.
 class Usuario(UsuarioBase):
+    rol: str
     id_usuario: int
     class Config:
         orm_mode = True
@@ -35,3 +50,16 @@ class Usuario(UsuarioBase):
 class LoginRequest(BaseModel):
     correo: str
     contraseña: str
+
+class LoginResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    usuario: Usuario
+
+class Cambio(BaseModel):
+    id: int
+    recurso: str
+    operacion: str
+    id_objeto: int
+    datos: dict
+    creado: datetime
@@ -0,0 +1,79 @@
+"""Change feed outbox
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+Creates `cambios` and seeds it with an upsert of every existing empresa and usuario, without the
+password hash, so a replica following the feed from offset 0 starts from the full current state.
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+empresas = sa.table(
+    "empresas",
+    sa.column("id_empresa", sa.Integer),
+    sa.column("nombre", sa.String),
+    sa.column("telefono", sa.String),
+)
+usuarios = sa.table(
+    "usuarios",
+    sa.column("id_usuario", sa.Integer),
+    sa.column("correo", sa.String),
+    sa.column("nombre", sa.String),
+    sa.column("rol", sa.String),
+)
+cambios = sa.table(
+    "cambios",
+    sa.column("recurso", sa.String),
+    sa.column("operacion", sa.String),
+    sa.column("id_objeto", sa.Integer),
+    sa.column("datos", sa.JSON),
+    sa.column("creado", sa.DateTime(timezone=True)),
+)
+
+
+def _seed(conn, table, recurso: str, id_column: str):
+    creado = datetime.now(timezone.utc)
+    pk = table.c[id_column]
+    last_id = 0
+    while True:
+        rows = conn.execute(sa.select(table).where(pk > last_id).order_by(pk).limit(BATCH_SIZE)).mappings().all()
+        if not rows:
+            return
+        conn.execute(cambios.insert(), [
+            {"recurso": recurso, "operacion": "upsert", "id_objeto": row[id_column], "datos": dict(row), "creado": creado}
+            for row in rows
+        ])
+        last_id = rows[-1][id_column]
+
+
+def upgrade():
+    op.create_table(
+        "cambios",
+        sa.Column("id", sa.BigInteger().with_variant(sa.Integer(), "sqlite"), primary_key=True),
+        sa.Column("recurso", sa.String(50), nullable=False),
+        sa.Column("operacion", sa.String(10), nullable=False),
+        sa.Column("id_objeto", sa.Integer(), nullable=False),
+        sa.Column("datos", sa.JSON(), nullable=False),
+        sa.Column("creado", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_cambios_recurso_id_objeto", "cambios", ["recurso", "id_objeto", "id"])
+    conn = op.get_bind()
+    _seed(conn, empresas, "empresas", "id_empresa")
+    _seed(conn, usuarios, "usuarios", "id_usuario")
+
+
+def downgrade():
+    op.drop_index("ix_cambios_recurso_id_objeto", table_name="cambios")
+    op.drop_table("cambios")
@@ -0,0 +1,57 @@
+"""Role assignment: `rol` ends up in the login token, so clients cannot choose their own."""
+import itertools
+
+from calidad_core.auth import create_token
+
+
+_correos = itertools.count(1)
+
+
+def admin_headers() -> dict:
+    return {"Authorization": f"Bearer {create_token({'sub': '1', 'rol': 'admin'})}"}
+
+
+def nuevo_usuario(**extra) -> dict:
+    return {"correo": f"usuario{next(_correos)}@example.com", "nombre": "Usuario", "contraseña": "secreto", **extra}
+
+
+def login(client, body: dict) -> dict:
+    response = client.post("/login", json={"correo": body["correo"], "contraseña": body["contraseña"]})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_self_registration_gets_the_default_role(client):
+    assert client.post("/usuarios/", json=nuevo_usuario(rol="admin")).status_code == 403
+
+    body = nuevo_usuario()
+    response = client.post("/usuarios/", json=body)
+    assert response.status_code == 200
+    assert response.json()["rol"] == "usuario"
+    assert "contraseña" not in response.json()
+    assert login(client, body)["usuario"]["rol"] == "usuario"
+
+
+def test_users_cannot_promote_themselves(client):
+    body = nuevo_usuario()
+    id_usuario = client.post("/usuarios/", json=body).json()["id_usuario"]
+    own = {"Authorization": f"Bearer {login(client, body)['access_token']}"}
+
+    assert client.patch(f"/usuarios/{id_usuario}", json={"rol": "admin"}, headers=own).status_code == 403
+    assert client.put(f"/usuarios/{id_usuario}", json={**body, "rol": "admin"}, headers=own).status_code == 403
+    assert client.get(f"/usuarios/{id_usuario}").json()["rol"] == "usuario"
+
+
+def test_admins_assign_roles_and_updates_without_rol_keep_it(client):
+    body = nuevo_usuario(rol="admin")
+    response = client.post("/usuarios/", json=body, headers=admin_headers())
+    assert response.status_code == 200
+    id_usuario = response.json()["id_usuario"]
+
+    response = client.put(f"/usuarios/{id_usuario}", json={**body, "rol": None, "nombre": "Otro"})
+    assert response.status_code == 200
+    assert response.json()["rol"] == "admin"
+    assert client.patch(f"/usuarios/{id_usuario}", json={"nombre": "Otro más"}).json()["rol"] == "admin"
+
+    response = client.patch(f"/usuarios/{id_usuario}", json={"rol": "usuario"}, headers=admin_headers())
+    assert response.json()["rol"] == "usuario"